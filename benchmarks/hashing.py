@@ -0,0 +1,49 @@
+"""
+Serial vs process pool password hashing throughput.
+
+    python -m benchmarks.hashing -n 200 --workers 4
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth.hashers import make_password  # noqa: E402
+
+from graphql_auth.hashers import PasswordHashingPool  # noqa: E402
+
+
+def run(label, fn, passwords):
+    start = time.perf_counter()
+    fn(passwords)
+    elapsed = time.perf_counter() - start
+    print(
+        "%-10s %6d passwords in %7.2fs  %8.1f/s"
+        % (label, len(passwords), elapsed, len(passwords) / elapsed)
+    )
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", type=int, default=100, help="passwords to hash")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    passwords = ["password-%s" % i for i in range(args.n)]
+    serial = run("serial", lambda p: [make_password(x) for x in p], passwords)
+    with PasswordHashingPool(args.workers) as pool:
+        # start the processes before timing
+        pool.hash(passwords[: args.workers])
+        parallel = run("pool(%s)" % args.workers, pool.hash, passwords)
+    print("speedup    %.2fx" % (serial / parallel))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Import time of `graphql_auth.mutations` and `graphql_auth.relay`, in
+fresh interpreters after `django.setup()`, as paid on every cold start.
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --check    # exit 1 on deferred imports
+
+`--check` fails when importing the mutations also imports a module
+that must only be imported on use, e.g. `requests` for reCAPTCHA,
+or builds the model forms.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# only imported when used
+DEFERRED_MODULES = [
+    "requests",
+    "httpx",
+    "aiosmtplib",
+    "pyinstrument",
+    "cProfile",
+    "graphql_auth.schema",
+]
+
+DEFERRED_FORMS = ["RegisterForm", "UpdateAccountForm", "PasswordLessRegisterForm"]
+
+SCRIPT = """
+import json, sys, time
+import django
+django.setup()
+before = set(sys.modules)
+start = time.perf_counter()
+import %(module)s
+elapsed = time.perf_counter() - start
+import graphql_auth.forms
+print(json.dumps({
+    "ms": elapsed * 1000,
+    "modules": sorted(set(sys.modules) - before),
+    "forms": sorted(vars(graphql_auth.forms)),
+}))
+"""
+
+
+def measure(module, settings):
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    output = subprocess.check_output(
+        [sys.executable, "-c", SCRIPT % {"module": module}], env=env, cwd=ROOT
+    )
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="interpreters per module")
+    parser.add_argument("--settings", default="tests.settings")
+    parser.add_argument("--check", action="store_true", help="fail on deferred imports")
+    args = parser.parse_args()
+
+    errors = []
+    print("%-24s %10s %10s" % ("module", "ms", "modules"))
+    for module in ("graphql_auth.mutations", "graphql_auth.relay"):
+        results = [measure(module, args.settings) for _ in range(args.repeat)]
+        print(
+            "%-24s %10.1f %10d"
+            % (
+                module,
+                statistics.median(result["ms"] for result in results),
+                len(results[0]["modules"]),
+            )
+        )
+        imported = set(results[0]["modules"])
+        errors.extend(
+            "%s imports %s" % (module, name)
+            for name in DEFERRED_MODULES
+            if name in imported
+        )
+        errors.extend(
+            "%s builds %s" % (module, name)
+            for name in DEFERRED_FORMS
+            if name in results[0]["forms"]
+        )
+
+    if args.check and errors:
+        print("\nRegressions:", *errors, sep="\n", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
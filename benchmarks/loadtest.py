@@ -0,0 +1,414 @@
+"""
+Load test of the testproject schema with a configurable traffic mix.
+
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --duration 60 --concurrency 16 \\
+        --mix login=30,refresh=20,me=35,register=5,password_reset=5,verify=5
+    python -m benchmarks.loadtest --recaptcha
+
+By default the testproject is served from this process on a threaded
+WSGI server, so the SQL queries of each operation are counted. Use
+`--url` to load an already running server instead (see
+`benchmarks.settings_loadtest`), without query counts.
+
+SQLite has a single writer, so the in-process server handles one request
+at a time on it; set `LOADTEST_PGDATABASE` to load test on Postgres.
+
+Users are created up front on a database created for the run, and
+dropped at the end, never on an existing one. Emails go to the locmem
+backend, and with `--recaptcha` login is validated by a local stub
+reCAPTCHA API.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+OPERATIONS = ("login", "refresh", "me", "register", "password_reset", "verify")
+DEFAULT_MIX = "login=30,refresh=15,me=40,register=5,password_reset=5,verify=5"
+PASSWORD = "23kegbsi7g2k"
+
+
+class StubRecaptchaHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps({"success": True, "score": 0.9}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub_recaptcha():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubRecaptchaHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:%s/siteverify" % server.server_port
+
+
+def parse_mix(mix):
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                "Unknown operation '%s', choose from %s" % (name, ", ".join(OPERATIONS))
+            )
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    if not values:
+        return 0
+    index = min(len(values) - 1, int(round(fraction * (len(values) - 1))))
+    return values[index]
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.queries = defaultdict(int)
+
+    def record(self, operation, seconds, ok):
+        with self.lock:
+            self.latencies[operation].append(seconds)
+            if not ok:
+                self.errors[operation] += 1
+
+    def record_queries(self, operation, count):
+        with self.lock:
+            self.queries[operation] += count
+
+    def report(self, elapsed, count_queries):
+        header = "%-16s %7s %7s %8s %8s %8s %8s %8s %9s" % (
+            "operation", "count", "errors", "ops/s", "p50 ms",
+            "p90 ms", "p99 ms", "max ms", "queries",
+        )
+        lines = [header]
+        total = 0
+        for operation in OPERATIONS:
+            latencies = self.latencies.get(operation)
+            if not latencies:
+                continue
+            total += len(latencies)
+            queries = (
+                "%.1f" % (self.queries[operation] / len(latencies))
+                if count_queries
+                else "-"
+            )
+            lines.append(
+                "%-16s %7d %7d %8.1f %8.1f %8.1f %8.1f %8.1f %9s"
+                % (
+                    operation,
+                    len(latencies),
+                    self.errors[operation],
+                    len(latencies) / elapsed,
+                    percentile(latencies, 0.5) * 1000,
+                    percentile(latencies, 0.9) * 1000,
+                    percentile(latencies, 0.99) * 1000,
+                    max(latencies) * 1000,
+                    queries,
+                )
+            )
+        lines.append("")
+        lines.append("%d requests in %.1fs, %.1f req/s" % (total, elapsed, total / elapsed))
+        if count_queries:
+            queries = sum(self.queries.values())
+            lines.append("%d queries, %.1f queries/s" % (queries, queries / elapsed))
+        return "\n".join(lines)
+
+
+class Pool:
+    """
+    users shared by the workers
+    """
+
+    def __init__(self, usernames, activation_tokens):
+        self.lock = threading.Lock()
+        self.verified = usernames
+        self.unverified = activation_tokens
+        self.registered = 0
+
+    def pick(self):
+        return random.choice(self.verified)
+
+    def pop_activation_token(self):
+        with self.lock:
+            if self.unverified:
+                return self.unverified.pop()
+        return None
+
+    def new_username(self):
+        with self.lock:
+            self.registered += 1
+            return "loadtest_new_%d_%d" % (os.getpid(), self.registered)
+
+
+class Worker(threading.Thread):
+    def __init__(self, url, pool, stats, weights, deadline, recaptcha):
+        super().__init__(daemon=True)
+        self.url = url
+        self.pool = pool
+        self.stats = stats
+        self.operations = list(weights)
+        self.weights = list(weights.values())
+        self.deadline = deadline
+        self.recaptcha = recaptcha
+        self.token = None
+        self.refresh_token = None
+
+    def post(self, operation, query, variables=None, token=None):
+        data = json.dumps({"query": query, "variables": variables or {}}).encode()
+        request = urllib.request.Request(self.url, data=data, method="POST")
+        request.add_header("Content-Type", "application/json")
+        request.add_header("X-Loadtest-Operation", operation)
+        if token:
+            request.add_header("Authorization", "JWT %s" % token)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                result = json.loads(response.read())
+        except (OSError, ValueError):
+            result = None
+        elapsed = time.perf_counter() - start
+        ok = bool(result) and not result.get("errors")
+        self.stats.record(operation, elapsed, ok)
+        return result["data"] if ok else None
+
+    def login(self):
+        username = self.pool.pick()
+        args = "username: $username, password: $password"
+        params = "$username: String!, $password: String!"
+        variables = {"username": username, "password": PASSWORD}
+        if self.recaptcha:
+            args += ", recaptchaToken: $recaptcha"
+            params += ", $recaptcha: String!"
+            variables["recaptcha"] = "loadtest"
+        data = self.post(
+            "login",
+            "mutation (%s) { tokenAuth(%s) { success, token, refreshToken } }"
+            % (params, args),
+            variables,
+        )
+        if data and data["tokenAuth"]["success"]:
+            self.token = data["tokenAuth"]["token"]
+            self.refresh_token = data["tokenAuth"]["refreshToken"]
+
+    def refresh(self):
+        if not self.refresh_token:
+            return self.login()
+        data = self.post(
+            "refresh",
+            "mutation ($token: String!) "
+            "{ refreshToken(refreshToken: $token) { success, token, refreshToken } }",
+            {"token": self.refresh_token},
+        )
+        if data and data["refreshToken"]["success"]:
+            self.token = data["refreshToken"]["token"]
+            self.refresh_token = data["refreshToken"]["refreshToken"]
+
+    def me(self):
+        if not self.token:
+            return self.login()
+        self.post("me", "query { me { username, verified } }", token=self.token)
+
+    def register(self):
+        username = self.pool.new_username()
+        self.post(
+            "register",
+            "mutation ($email: String!, $username: String!, $password: String!) "
+            "{ register(email: $email, username: $username, password1: $password,"
+            " password2: $password) { success } }",
+            {"email": "%s@email.com" % username, "username": username, "password": PASSWORD},
+        )
+
+    def password_reset(self):
+        self.post(
+            "password_reset",
+            "mutation ($email: String!) { sendPasswordResetEmail(email: $email) "
+            "{ success } }",
+            {"email": "%s@email.com" % self.pool.pick()},
+        )
+
+    def verify(self):
+        token = self.pool.pop_activation_token()
+        if token is None:
+            return self.me()  # every account is verified
+        self.post(
+            "verify",
+            "mutation ($token: String!) { verifyAccount(token: $token) { success } }",
+            {"token": token},
+        )
+
+    def run(self):
+        while time.monotonic() < self.deadline:
+            operation = random.choices(self.operations, self.weights)[0]
+            getattr(self, operation)()
+
+
+def setup_database(users, unverified):
+    """
+    create a fresh database with the users, return their usernames
+    and the activation tokens of the unverified ones
+    """
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.db import connection
+
+    from graphql_auth.constants import TokenAction
+    from graphql_auth.models import UserStatus
+    from graphql_auth.utils import get_token
+
+    # a database of its own, see benchmarks.settings_loadtest
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False
+    )
+
+    UserModel = get_user_model()
+    password = make_password(PASSWORD)  # hash once for all
+    usernames = ["loadtest_%d" % i for i in range(users + unverified)]
+    UserModel.objects.bulk_create(
+        [
+            UserModel(username=username, email="%s@email.com" % username, password=password)
+            for username in usernames
+        ]
+    )
+    created = list(UserModel.objects.filter(username__in=usernames))
+    verified = set(usernames[:users])
+    UserStatus.objects.create_for_users(
+        [user for user in created if user.username in verified], verified=True
+    )
+    UserStatus.objects.create_for_users(
+        [user for user in created if user.username not in verified]
+    )
+    tokens = [
+        get_token(user, TokenAction.ACTIVATION)
+        for user in created
+        if user.username not in verified
+    ]
+    return usernames[:users], tokens
+
+
+def start_server(stats):
+    """
+    serve the testproject from a thread, counting the queries per operation
+    """
+    from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+    from django.core.wsgi import get_wsgi_application
+    from django.db import connection
+
+    application = get_wsgi_application()
+    # concurrent SQLite transactions fail with "database is locked"
+    lock = threading.Lock() if connection.vendor == "sqlite" else nullcontext()
+
+    def counting_application(environ, start_response):
+        operation = environ.get("HTTP_X_LOADTEST_OPERATION", "other")
+        count = 0
+
+        def counter(execute, *args):
+            nonlocal count
+            count += 1
+            return execute(*args)
+
+        with lock, connection.execute_wrapper(counter):
+            response = application(environ, start_response)
+        stats.record_queries(operation, count)
+        return response
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadedWSGIServer(("127.0.0.1", 0), QuietHandler)
+    server.daemon_threads = True
+    server.set_app(counting_application)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, "http://127.0.0.1:%s/graphql" % server.server_port
+
+
+def run(args, stats, usernames, tokens):
+    url = args.url
+    if url is None:
+        server, url = start_server(stats)
+
+    pool = Pool(usernames, tokens)
+    deadline = time.monotonic() + args.duration
+    workers = [
+        Worker(url, pool, stats, args.mix, deadline, args.recaptcha)
+        for _ in range(args.concurrency)
+    ]
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.monotonic() - start
+
+    print(stats.report(elapsed, count_queries=args.url is None))
+    if args.url is None:
+        server.shutdown()
+        server.server_close()
+    return any(stats.errors.values())
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--duration", type=float, default=20, help="seconds")
+    parser.add_argument("--concurrency", type=int, default=8, help="client threads")
+    parser.add_argument("--users", type=int, default=200, help="verified users")
+    parser.add_argument(
+        "--unverified", type=int, default=500, help="users for the verify operation"
+    )
+    parser.add_argument(
+        "--recaptcha", action="store_true", help="require a stub reCAPTCHA on login"
+    )
+    parser.add_argument("--url", help="load this server instead of an in-process one")
+    args = parser.parse_args()
+
+    if args.recaptcha:
+        stub, stub_url = start_stub_recaptcha()
+        os.environ["LOADTEST_RECAPTCHA_URL"] = stub_url
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "benchmarks.settings_loadtest")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+
+    stats = Stats()
+    old_name = connection.settings_dict["NAME"]
+    usernames, tokens = setup_database(args.users, args.unverified)
+    try:
+        failed = run(args, stats, usernames, tokens)
+    finally:
+        # kept while a separate server may still be connected to it
+        if args.url is None:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        if args.recaptcha:
+            stub.shutdown()
+            stub.server_close()
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
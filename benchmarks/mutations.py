@@ -0,0 +1,399 @@
+"""
+Query count, password hashes, wall time and memory of every mutation of `mutations` and
+`relay`, plus the `me` and `users` queries, executed like the tests do.
+
+    python -m benchmarks.mutations
+    python -m benchmarks.mutations -k register --repeat 10
+    python -m benchmarks.mutations --save     # update the baseline
+    python -m benchmarks.mutations --check    # exit 1 on regressions
+
+Runs on a test database created from `DJANGO_SETTINGS_MODULE`
+(`tests.settings`, SQLite, by default). For a local Postgres:
+
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_postgres python -m benchmarks.mutations
+
+Baselines are stored per database vendor in `benchmarks/baselines/`.
+`--check` fails when a case runs more queries, computes more password
+hashes or allocates more memory than its baseline; wall time is only checked with `--check-time`,
+as it depends on the machine.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from unittest import mock
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "tests.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.contrib.auth.models import AnonymousUser  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from graphene.test import Client  # noqa: E402
+from graphql_jwt.shortcuts import create_refresh_token  # noqa: E402
+from graphql_jwt.shortcuts import get_token as get_jwt  # noqa: E402
+
+from graphql_auth.constants import TokenAction  # noqa: E402
+from graphql_auth.utils import get_token  # noqa: E402
+from tests.schema import default_schema, relay_schema  # noqa: E402
+
+BASELINES_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+PASSWORD = "23kegbsi7g2k"
+NEW_PASSWORD = "new-23kegbsi7g2k"
+
+
+class Fixtures:
+    """
+    users and tokens for one execution, created inside its transaction
+    """
+
+    def __init__(self):
+        self.user = self.make_user(
+            "bench", verified=True, secondary_email="bench_secondary@email.com"
+        )
+        self.unverified = self.make_user("unverified")
+        self.superuser = self.make_user("admin", verified=True, is_superuser=True)
+        self.passwordless = self.make_user("passwordless", password=None)
+
+    def make_user(self, username, password=PASSWORD, verified=False, **kwargs):
+        secondary_email = kwargs.pop("secondary_email", "")
+        user = get_user_model()(
+            username=username, email="%s@email.com" % username, **kwargs
+        )
+        user.set_password(password)
+        user.save()
+        status = user.status
+        status.verified = verified
+        status.secondary_email = secondary_email
+        status.save()
+        return user
+
+    def token(self, user, action, **kwargs):
+        return get_token(user, action, **kwargs)
+
+    def jwt(self, user):
+        return get_jwt(user)
+
+    def refresh_token(self, user):
+        return create_refresh_token(user).get_token()
+
+
+class Case:
+    def __init__(self, field, args=None, fields="success, errors", user=None):
+        self.field = field
+        # callables receiving the fixtures
+        self.args = args or (lambda fx: {})
+        self.user = user
+        self.fields = fields
+
+    def render_args(self, args):
+        return ", ".join(
+            "%s: %s" % (key, json.dumps(value)) for key, value in args.items()
+        )
+
+    def query(self, fx, relay):
+        args = self.render_args(self.args(fx))
+        if relay:
+            args = "input: {%s}" % args
+        return "mutation { %s(%s) { %s } }" % (self.field, args, self.fields)
+
+    def context_user(self, fx):
+        return self.user(fx) if self.user else AnonymousUser()
+
+
+class QueryCase(Case):
+    def query(self, fx, relay):
+        return "query { %s }" % self.fields
+
+
+def logged(fx):
+    return fx.user
+
+
+MUTATIONS = [
+    Case(
+        "tokenAuth",
+        lambda fx: {"username": "bench", "password": PASSWORD},
+        "success, errors, token, refreshToken",
+    ),
+    Case("verifyToken", lambda fx: {"token": fx.jwt(fx.user)}),
+    Case(
+        "refreshToken",
+        lambda fx: {"refreshToken": fx.refresh_token(fx.user)},
+        "success, errors, token, refreshToken",
+    ),
+    Case("revokeToken", lambda fx: {"refreshToken": fx.refresh_token(fx.user)}),
+    Case(
+        "register",
+        lambda fx: {
+            "email": "new@email.com",
+            "username": "new",
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        },
+        "success, errors, token, refreshToken",
+    ),
+    Case(
+        "verifyAccount",
+        lambda fx: {"token": fx.token(fx.unverified, TokenAction.ACTIVATION)},
+    ),
+    Case("resendActivationEmail", lambda fx: {"email": "unverified@email.com"}),
+    Case("sendPasswordResetEmail", lambda fx: {"email": "bench@email.com"}),
+    Case(
+        "passwordReset",
+        lambda fx: {
+            "token": fx.token(fx.user, TokenAction.PASSWORD_RESET),
+            "newPassword1": NEW_PASSWORD,
+            "newPassword2": NEW_PASSWORD,
+        },
+    ),
+    Case(
+        "passwordSet",
+        lambda fx: {
+            "token": fx.token(fx.passwordless, TokenAction.PASSWORD_SET),
+            "newPassword1": NEW_PASSWORD,
+            "newPassword2": NEW_PASSWORD,
+        },
+    ),
+    Case(
+        "passwordChange",
+        lambda fx: {
+            "oldPassword": PASSWORD,
+            "newPassword1": NEW_PASSWORD,
+            "newPassword2": NEW_PASSWORD,
+        },
+        "success, errors, token, refreshToken",
+        user=logged,
+    ),
+    Case("updateAccount", lambda fx: {"firstName": "bench"}, user=logged),
+    Case("archiveAccount", lambda fx: {"password": PASSWORD}, user=logged),
+    Case("deleteAccount", lambda fx: {"password": PASSWORD}, user=logged),
+    Case(
+        "sendSecondaryEmailActivation",
+        lambda fx: {"email": "other@email.com", "password": PASSWORD},
+        user=logged,
+    ),
+    Case(
+        "verifySecondaryEmail",
+        lambda fx: {
+            "token": fx.token(
+                fx.user,
+                TokenAction.ACTIVATION_SECONDARY_EMAIL,
+                secondary_email="other@email.com",
+            )
+        },
+    ),
+    Case("swapEmails", lambda fx: {"password": PASSWORD}, user=logged),
+    Case("removeSecondaryEmail", lambda fx: {"password": PASSWORD}, user=logged),
+    Case(
+        "blockUser",
+        lambda fx: {"userId": fx.unverified.pk},
+        user=lambda fx: fx.superuser,
+    ),
+]
+
+QUERIES = [
+    QueryCase("me", fields="me { username, verified }", user=logged),
+    QueryCase(
+        "users", fields="users { edges { node { username, verified, archived } } }"
+    ),
+]
+
+
+def cases():
+    for case in MUTATIONS:
+        yield "default.%s" % case.field, case, default_schema, False
+        yield "relay.%s" % case.field, case, relay_schema, True
+    for case in QUERIES:
+        yield "query.%s" % case.field, case, default_schema, False
+
+
+@contextmanager
+def count_hashes():
+    """
+    count the passwords hashed by make_password and check_password,
+    from the user model methods or directly
+    """
+    from django.contrib.auth import base_user, hashers
+
+    counter = {"hashes": 0}
+
+    def counted(func):
+        def wrapper(password, *args, **kwargs):
+            if password is not None:
+                counter["hashes"] += 1
+            return func(password, *args, **kwargs)
+
+        return wrapper
+
+    with mock.patch.multiple(
+        base_user,
+        make_password=counted(hashers.make_password),
+        check_password=counted(hashers.check_password),
+    ), mock.patch.multiple(
+        hashers,
+        make_password=counted(hashers.make_password),
+        check_password=counted(hashers.check_password),
+    ):
+        yield counter
+
+
+def execute(case, schema, relay, trace=False):
+    """
+    run the case once in a rolled back transaction,
+    return (queries, hashes, seconds, peak allocated bytes)
+    """
+    with transaction.atomic():
+        fx = Fixtures()
+        request = RequestFactory().post("/graphql/")
+        request.user = case.context_user(fx)
+        query = case.query(fx, relay)
+        client = Client(schema)
+
+        with count_hashes() as hashes:
+            if trace:
+                tracemalloc.start()
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                executed = client.execute(query, context=request)
+                elapsed = time.perf_counter() - start
+            peak = 0
+            if trace:
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+        transaction.set_rollback(True)
+
+    data = executed.get("data") or {}
+    if "errors" in executed or (data.get(case.field) or {}).get("success") is False:
+        raise RuntimeError("%s failed: %s" % (case.field, executed))
+    return len(queries), hashes["hashes"], elapsed, peak
+
+
+def measure(case, schema, relay, repeat):
+    queries, hashes, _, _ = execute(case, schema, relay)  # warm up
+    times = [execute(case, schema, relay)[2] for _ in range(repeat)]
+    _, _, _, peak = execute(case, schema, relay, trace=True)
+    return {
+        "queries": queries,
+        "hashes": hashes,
+        "ms": round(statistics.median(times) * 1000, 2),
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(name, result, baseline, args):
+    """
+    return the regression messages of a case
+    """
+    if baseline is None:
+        return []
+    errors = []
+    if result["queries"] > baseline["queries"]:
+        errors.append(
+            "%s: %s queries, baseline %s"
+            % (name, result["queries"], baseline["queries"])
+        )
+    if result["hashes"] > baseline.get("hashes", result["hashes"]):
+        errors.append(
+            "%s: %s password hashes, baseline %s"
+            % (name, result["hashes"], baseline["hashes"])
+        )
+    if result["peak_kib"] > baseline["peak_kib"] * (1 + args.tolerance):
+        errors.append(
+            "%s: %s KiB peak, baseline %s"
+            % (name, result["peak_kib"], baseline["peak_kib"])
+        )
+    if args.check_time and result["ms"] > baseline["ms"] * (1 + args.time_tolerance):
+        errors.append("%s: %sms, baseline %sms" % (name, result["ms"], baseline["ms"]))
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-k", help="only run the cases containing this string")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--baseline", help="baseline file, per vendor by default")
+    parser.add_argument("--save", action="store_true", help="update the baseline")
+    parser.add_argument("--check", action="store_true", help="fail on regressions")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed relative increase of the memory peak",
+    )
+    parser.add_argument("--check-time", action="store_true")
+    parser.add_argument(
+        "--time-tolerance",
+        type=float,
+        default=0.5,
+        help="allowed relative increase of the wall time",
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        baseline_path = args.baseline or os.path.join(
+            BASELINES_DIR, "%s.json" % connection.vendor
+        )
+        baselines = {}
+        if os.path.exists(baseline_path):
+            with open(baseline_path) as f:
+                baselines = json.load(f)
+
+        results, errors = {}, []
+        print(
+            "%-40s %8s %8s %10s %10s"
+            % ("case", "queries", "hashes", "ms", "peak KiB")
+        )
+        for name, case, schema, relay in cases():
+            if args.k and args.k not in name:
+                continue
+            result = results[name] = measure(case, schema, relay, args.repeat)
+            print(
+                "%-40s %8s %8s %10s %10s"
+                % (
+                    name,
+                    result["queries"],
+                    result["hashes"],
+                    result["ms"],
+                    result["peak_kib"],
+                )
+            )
+            errors.extend(compare(name, result, baselines.get(name), args))
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    if args.save:
+        baselines.update(results)
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print("Saved %s" % baseline_path)
+
+    if args.check and errors:
+        print("\nRegressions:", *errors, sep="\n", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+The testproject settings for `benchmarks.loadtest`: emails go to the
+locmem backend, the database to a temporary SQLite file (`LOADTEST_DB`),
+or to Postgres if `LOADTEST_PGDATABASE` is set, and, if
+`LOADTEST_RECAPTCHA_URL` is set, login requires a reCAPTCHA verified by
+that stub.
+
+The database is created by the load test, dropped first if it exists,
+and dropped at the end, so `LOADTEST_DB` and `LOADTEST_PGDATABASE` must
+name a database dedicated to it. The usual `PGUSER`, `PGPASSWORD`,
+`PGHOST` and `PGPORT` variables are used to connect, but not
+`PGDATABASE`.
+
+To load test a separate server, run it with these settings:
+
+    cd testproject
+    DJANGO_SETTINGS_MODULE=benchmarks.settings_loadtest PYTHONPATH=.. \\
+        python manage.py runserver --noreload
+"""
+
+import os
+import sys
+import tempfile
+
+TESTPROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "testproject"
+)
+if TESTPROJECT_DIR not in sys.path:
+    sys.path.insert(0, TESTPROJECT_DIR)
+
+from settings import *  # noqa: F401,F403,E402
+
+DEBUG = False
+
+ALLOWED_HOSTS = ["*"]
+
+LOADTEST_DB = os.environ.get(
+    "LOADTEST_DB",
+    os.path.join(tempfile.gettempdir(), "graphql_auth_loadtest.sqlite3"),
+)
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": LOADTEST_DB,
+        "OPTIONS": {"timeout": 30},
+        # created and dropped by the load test, under the same name
+        # so that a separate server uses it too
+        "TEST": {"NAME": LOADTEST_DB},
+    }
+}
+
+if os.environ.get("LOADTEST_PGDATABASE"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ["LOADTEST_PGDATABASE"],
+        "USER": os.environ.get("PGUSER", "postgres"),
+        "PASSWORD": os.environ.get("PGPASSWORD", ""),
+        "HOST": os.environ.get("PGHOST", "localhost"),
+        "PORT": os.environ.get("PGPORT", "5432"),
+        "TEST": {"NAME": os.environ["LOADTEST_PGDATABASE"]},
+    }
+
+EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+GRAPHQL_AUTH = {}
+
+if os.environ.get("LOADTEST_RECAPTCHA_URL"):
+    GRAPHQL_AUTH.update(
+        {
+            "LOGIN_REQUIRE_RECAPTCHA": True,
+            "RECAPTCHA_SECRET_KET": "loadtest",
+            "RECAPTCHA_MIN_SCORE": 0.5,
+            "RECAPTCHA_VERIFY_URL": os.environ["LOADTEST_RECAPTCHA_URL"],
+        }
+    )
@@ -0,0 +1,19 @@
+"""
+`tests.settings` on a local Postgres, configured by the usual
+`PGDATABASE`, `PGUSER`, `PGPASSWORD`, `PGHOST` and `PGPORT` variables.
+"""
+
+import os
+
+from tests.settings import *  # noqa: F401,F403
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("PGDATABASE", "graphql_auth"),
+        "USER": os.environ.get("PGUSER", "postgres"),
+        "PASSWORD": os.environ.get("PGPASSWORD", ""),
+        "HOST": os.environ.get("PGHOST", "localhost"),
+        "PORT": os.environ.get("PGPORT", "5432"),
+    }
+}
@@ -7,3 +7,7 @@ class GraphQLAuthConfig(AppConfig):
 
     def ready(self):
         import graphql_auth.signals
+        from .settings import graphql_auth_settings
+
+        # fail on startup on invalid settings, not on first use
+        graphql_auth_settings.reload()
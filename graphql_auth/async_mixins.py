@@ -0,0 +1,269 @@
+"""
+Async versions of the login, registration and email mixins.
+
+`resolve_mutation` is a coroutine, so the schema must be executed
+with an asyncio executor, e.g. graphql-core's `AsyncioExecutor`
+under an ASGI server.
+
+reCAPTCHA and SMTP calls are awaited on the event loop, see
+`providers.avalidate_recaptcha` and `mail.asend_mail`. Django has no
+async ORM, so the database steps of each mutation are grouped into
+`sync_to_async` calls, run one at a time on the thread shared by the
+ORM. Password hashing is CPU bound and touches no connection, it runs
+in a worker thread (`thread_sensitive=False`) so that concurrent logins
+and registrations hash in parallel. Logins take the usual
+`authenticate` path when a backend other than django's `ModelBackend`
+or the JWT ones is configured.
+"""
+
+from smtplib import SMTPException
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_backends, get_user_model, hashers
+from django.contrib.auth.backends import ModelBackend
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.signing import BadSignature, SignatureExpired
+from django.db import transaction
+from django.utils.functional import Promise
+from graphql_jwt.backends import JSONWebTokenBackend
+
+from graphql_auth import providers
+from .constants import Messages
+from .exceptions import (
+    UserAlreadyVerified,
+    TokenScopeError,
+    EmailAlreadyInUse,
+)
+from .forms import EmailForm
+from .instrumentation import span
+from .mail import get_async_email_func
+from .mixins import (
+    RegisterMixin,
+    VerifyAccountMixin,
+    ResendActivationEmailMixin,
+    SendPasswordResetEmailMixin,
+    ObtainJSONWebTokenMixin,
+)
+from .models import UserStatus
+from .settings import graphql_auth_settings as app_settings
+from .shortcuts import get_user_by_email
+from .signals import user_registered
+
+UserModel = get_user_model()
+
+
+async def send_email(status, method, info, *args):
+    """
+    send with `EMAIL_ASYNC_TASK` if set,
+    otherwise await the async version of the `UserStatus` method
+    """
+    async_email_func = get_async_email_func()
+    if async_email_func:
+        await sync_to_async(async_email_func)(getattr(status, method), (info, *args))
+    else:
+        await getattr(status, "a" + method)(info, *args)
+
+
+def evaluate_refresh_token(result):
+    """
+    graphql_jwt creates the refresh token lazily, when the result is
+    serialized on the event loop, so it must be evaluated in the thread
+    """
+    refresh_token = getattr(result, "refresh_token", None)
+    if isinstance(refresh_token, Promise):
+        result.refresh_token = str(refresh_token)
+    return result
+
+
+def get_status_by_email(email):
+    return get_user_by_email(email).status
+
+
+def checks_password_only():
+    """
+    whether `authenticate` only checks the password, the backends being
+    django's `ModelBackend` and the JWT ones, skipped on login
+    """
+    return all(
+        isinstance(backend, JSONWebTokenBackend)
+        or (
+            isinstance(backend, ModelBackend)
+            and type(backend).authenticate is ModelBackend.authenticate
+        )
+        for backend in get_backends()
+    )
+
+
+def check_password(password, encoded):
+    """
+    `(valid, upgraded)`, `upgraded` being `password` hashed again
+    when the hasher settings changed, else `None`
+    """
+    upgraded = []
+
+    def setter(raw_password):
+        upgraded.append(hashers.make_password(raw_password))
+
+    valid = hashers.check_password(password, encoded, setter=setter)
+    return valid, upgraded[0] if upgraded else None
+
+
+class AsyncRegisterMixin(RegisterMixin):
+    __doc__ = RegisterMixin.__doc__
+
+    @classmethod
+    def validate(cls, kwargs):
+        f = cls.get_form(kwargs)
+        with span(cls, "form_validation"):
+            valid = f.is_valid()
+        return f, valid
+
+    @classmethod
+    def register(cls, root, info, form, password=None, **kwargs):
+        with transaction.atomic():
+            email = kwargs.get(UserModel.EMAIL_FIELD, False)
+            user = cls.create_user(form, email, password)
+        user_registered.send(sender=cls, user=user)
+        result = evaluate_refresh_token(cls.registered(root, info, user, **kwargs))
+        return result, user.status
+
+    @classmethod
+    async def resolve_mutation(cls, root, info, **kwargs):
+        """
+        the emails are sent after the user is committed,
+        a failure returns `EMAIL_FAIL` but keeps the user
+        """
+        try:
+            f, valid = await sync_to_async(cls.validate)(kwargs)
+            if not valid:
+                return cls(success=False, errors=f.errors.get_json_data())
+            password = None
+            if app_settings.ALLOW_PASSWORDLESS_REGISTRATION is False:
+                with span(cls, "hash_password"):
+                    password = await sync_to_async(
+                        hashers.make_password, thread_sensitive=False
+                    )(f.cleaned_data["password1"])
+            result, status = await sync_to_async(cls.register)(
+                root, info, f, password, **kwargs
+            )
+            if status is not None:
+                email = kwargs.get(UserModel.EMAIL_FIELD, False)
+                for method in cls.registration_emails(email):
+                    with span(cls, "email"):
+                        await send_email(status, method, info)
+            return result
+        except EmailAlreadyInUse:
+            return cls(
+                success=False, errors={UserModel.EMAIL_FIELD: Messages.EMAIL_IN_USE},
+            )
+        except SMTPException:
+            return cls(success=False, errors=Messages.EMAIL_FAIL)
+
+
+class AsyncVerifyAccountMixin(VerifyAccountMixin):
+    __doc__ = VerifyAccountMixin.__doc__
+
+    @classmethod
+    async def resolve_mutation(cls, root, info, **kwargs):
+        try:
+            token = kwargs.get("token")
+            await sync_to_async(UserStatus.verify)(token)
+            return cls(success=True)
+        except UserAlreadyVerified:
+            return cls(success=False, errors=Messages.ALREADY_VERIFIED)
+        except SignatureExpired:
+            return cls(success=False, errors=Messages.EXPIRED_TOKEN)
+        except (BadSignature, TokenScopeError):
+            return cls(success=False, errors=Messages.INVALID_TOKEN)
+
+
+class AsyncResendActivationEmailMixin(ResendActivationEmailMixin):
+    __doc__ = ResendActivationEmailMixin.__doc__
+
+    @classmethod
+    async def resolve_mutation(cls, root, info, **kwargs):
+        try:
+            email = kwargs.get("email")
+            f = EmailForm({"email": email})
+            if f.is_valid():
+                with span(cls, "user_lookup"):
+                    status = await sync_to_async(get_status_by_email)(email)
+                with span(cls, "email"):
+                    await send_email(status, "resend_activation_email", info)
+                return cls(success=True)
+            return cls(success=False, errors=f.errors.get_json_data())
+        except ObjectDoesNotExist:
+            return cls(success=True)  # even if user is not registered
+        except SMTPException:
+            return cls(success=False, errors=Messages.EMAIL_FAIL)
+        except UserAlreadyVerified:
+            return cls(success=False, errors={"email": Messages.ALREADY_VERIFIED})
+
+
+class AsyncSendPasswordResetEmailMixin(SendPasswordResetEmailMixin):
+    __doc__ = SendPasswordResetEmailMixin.__doc__
+
+    @classmethod
+    async def resolve_mutation(cls, root, info, **kwargs):
+        try:
+            email = kwargs.get("email")
+            f = EmailForm({"email": email})
+            if f.is_valid():
+                with span(cls, "user_lookup"):
+                    status = await sync_to_async(get_status_by_email)(email)
+                with span(cls, "email"):
+                    await send_email(
+                        status, "send_password_reset_email", info, [email]
+                    )
+                return cls(success=True)
+            return cls(success=False, errors=f.errors.get_json_data())
+        except ObjectDoesNotExist:
+            return cls(success=True)  # even if user is not registred
+        except SMTPException:
+            return cls(success=False, errors=Messages.EMAIL_FAIL)
+
+
+class AsyncObtainJSONWebTokenMixin(ObtainJSONWebTokenMixin):
+    __doc__ = ObtainJSONWebTokenMixin.__doc__
+
+    @classmethod
+    def login_and_evaluate(cls, root, info, user, password, next_kwargs, checked=None):
+        """
+        `checked` is the result of `check_password`, the upgraded
+        password being saved as `User.check_password` does
+        """
+        password_valid = None
+        if checked is not None:
+            password_valid, upgraded = checked
+            if upgraded is not None:
+                user.password = upgraded
+                user.save(update_fields=["password"])
+        return evaluate_refresh_token(
+            cls.login(root, info, user, password, next_kwargs, password_valid)
+        )
+
+    @classmethod
+    async def resolve_mutation(cls, root, info, **kwargs):
+        try:
+            user, password, next_kwargs = await sync_to_async(cls.get_login_user)(
+                kwargs
+            )
+
+            if app_settings.LOGIN_REQUIRE_RECAPTCHA is True:
+                recaptcha_token = kwargs.get('recaptcha_token')
+                with span(cls, "recaptcha"):
+                    res = await providers.avalidate_recaptcha(recaptcha_token)
+                cls.check_recaptcha(res)
+
+            checked = None
+            if checks_password_only():
+                with span(cls, "check_password"):
+                    checked = await sync_to_async(
+                        check_password, thread_sensitive=False
+                    )(password, user.password)
+
+            return await sync_to_async(cls.login_and_evaluate)(
+                root, info, user, password, next_kwargs, checked
+            )
+        except cls.login_errors as error:
+            return cls.login_failed(error)
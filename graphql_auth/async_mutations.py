@@ -0,0 +1,56 @@
+"""
+Async counterparts of `mutations`, see `async_mixins`.
+"""
+
+import graphene
+import graphql_jwt
+
+from .async_mixins import (
+    AsyncRegisterMixin,
+    AsyncVerifyAccountMixin,
+    AsyncResendActivationEmailMixin,
+    AsyncSendPasswordResetEmailMixin,
+    AsyncObtainJSONWebTokenMixin,
+)
+from .bases import MutationMixin, DynamicArgsMixin
+from .settings import graphql_auth_settings as app_settings
+
+
+class Register(MutationMixin, DynamicArgsMixin, AsyncRegisterMixin, graphene.Mutation):
+    __doc__ = AsyncRegisterMixin.__doc__
+
+    password_fields = app_settings.register_password_fields
+    _required_args = app_settings.register_arguments
+    _args = app_settings.register_optional_arguments
+
+
+class VerifyAccount(
+    MutationMixin, DynamicArgsMixin, AsyncVerifyAccountMixin, graphene.Mutation
+):
+    __doc__ = AsyncVerifyAccountMixin.__doc__
+    _required_args = ["token"]
+
+
+class ResendActivationEmail(
+    MutationMixin, DynamicArgsMixin, AsyncResendActivationEmailMixin, graphene.Mutation
+):
+    __doc__ = AsyncResendActivationEmailMixin.__doc__
+    _required_args = ["email"]
+
+
+class SendPasswordResetEmail(
+    MutationMixin, DynamicArgsMixin, AsyncSendPasswordResetEmailMixin, graphene.Mutation
+):
+    __doc__ = AsyncSendPasswordResetEmailMixin.__doc__
+    _required_args = ["email"]
+
+
+class ObtainJSONWebToken(
+    MutationMixin,
+    AsyncObtainJSONWebTokenMixin,
+    DynamicArgsMixin,
+    graphql_jwt.JSONWebTokenMutation,
+):
+    __doc__ = AsyncObtainJSONWebTokenMixin.__doc__
+    user = graphene.Field("graphql_auth.schema.UserNode")
+    unarchiving = graphene.Boolean(default_value=False)
@@ -0,0 +1,70 @@
+"""
+Async counterparts of `relay`, see `async_mixins`.
+"""
+
+import graphene
+import graphql_jwt
+
+from .async_mixins import (
+    AsyncRegisterMixin,
+    AsyncVerifyAccountMixin,
+    AsyncResendActivationEmailMixin,
+    AsyncSendPasswordResetEmailMixin,
+    AsyncObtainJSONWebTokenMixin,
+)
+from .bases import RelayMutationMixin, DynamicInputMixin
+from .settings import graphql_auth_settings as app_settings
+
+
+class Register(
+    RelayMutationMixin,
+    DynamicInputMixin,
+    AsyncRegisterMixin,
+    graphene.ClientIDMutation,
+):
+    __doc__ = AsyncRegisterMixin.__doc__
+
+    password_fields = app_settings.register_password_fields
+    _required_inputs = app_settings.register_arguments
+    _inputs = app_settings.register_optional_arguments
+
+
+class VerifyAccount(
+    RelayMutationMixin,
+    DynamicInputMixin,
+    AsyncVerifyAccountMixin,
+    graphene.ClientIDMutation,
+):
+    __doc__ = AsyncVerifyAccountMixin.__doc__
+    _required_inputs = ["token"]
+
+
+class ResendActivationEmail(
+    RelayMutationMixin,
+    DynamicInputMixin,
+    AsyncResendActivationEmailMixin,
+    graphene.ClientIDMutation,
+):
+    __doc__ = AsyncResendActivationEmailMixin.__doc__
+    _required_inputs = ["email"]
+
+
+class SendPasswordResetEmail(
+    RelayMutationMixin,
+    DynamicInputMixin,
+    AsyncSendPasswordResetEmailMixin,
+    graphene.ClientIDMutation,
+):
+    __doc__ = AsyncSendPasswordResetEmailMixin.__doc__
+    _required_inputs = ["email"]
+
+
+class ObtainJSONWebToken(
+    RelayMutationMixin,
+    AsyncObtainJSONWebTokenMixin,
+    DynamicInputMixin,
+    graphql_jwt.relay.JSONWebTokenMutation,
+):
+    __doc__ = AsyncObtainJSONWebTokenMixin.__doc__
+    user = graphene.Field("graphql_auth.schema.UserNode")
+    unarchiving = graphene.Boolean(default_value=False)
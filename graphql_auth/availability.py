@@ -0,0 +1,62 @@
+"""
+Cached answers to "is this username / email still free?".
+
+Used by `ValidateRegistration`, so that clients checking the fields of a
+signup form while the user types mostly hit the cache. Both answers are
+cached for `AVAILABILITY_CACHE_TIMEOUT` seconds; `Register` itself still
+checks the database and forgets the answers for the user it creates.
+"""
+
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from .models import UserStatus
+from .settings import graphql_auth_settings as app_settings
+
+UserModel = get_user_model()
+
+
+def cache_key(field, value):
+    # emails are looked up case insensitively by `UserStatus.email_is_free`,
+    # usernames as they are
+    if field == UserModel.EMAIL_FIELD:
+        value = value.lower()
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return "graphql_auth:available:%s:%s" % (field, digest)
+
+
+def username_is_free(username):
+    return not UserModel._default_manager.filter(
+        **{UserModel.USERNAME_FIELD: username}
+    ).exists()
+
+
+def is_available(field, value):
+    """
+    whether no user has `value` as username or email,
+    `field` is `UserModel.USERNAME_FIELD` or `UserModel.EMAIL_FIELD`
+    """
+    key = cache_key(field, value)
+    available = cache.get(key)
+    if available is None:
+        if field == UserModel.EMAIL_FIELD:
+            available = UserStatus.email_is_free(value)
+        else:
+            available = username_is_free(value)
+        cache.set(key, available, app_settings.AVAILABILITY_CACHE_TIMEOUT)
+    return available
+
+
+def forget(user):
+    """
+    drop the cached answers for the username and email of `user`
+    """
+    cache.delete_many(
+        [
+            cache_key(field, getattr(user, field))
+            for field in (UserModel.USERNAME_FIELD, UserModel.EMAIL_FIELD)
+            if getattr(user, field, None)
+        ]
+    )
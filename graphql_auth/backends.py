@@ -1,8 +1,14 @@
 from graphql_jwt.backends import JSONWebTokenBackend
-from graphql_jwt.shortcuts import get_user_by_token
-from graphql_jwt.utils import get_credentials
+from graphql_jwt.utils import (
+    get_credentials,
+    get_payload,
+    get_token_argument,
+    get_user_by_payload,
+)
 from graphql_jwt.exceptions import JSONWebTokenError
 
+from .middleware import REQUEST_AUTHENTICATED
+
 
 class GraphQLAuthBackend(JSONWebTokenBackend):
     """
@@ -15,17 +21,32 @@ class GraphQLAuthBackend(JSONWebTokenBackend):
     Main advantage is to let the mutation handle the
     unauthentication error. Intead of an actual error,
     we can return e.g. success=False errors=Unauthenticated
+
+    The decoded payload is kept on the request, so the
+    status claims can be read without decoding it again.
+
+    Requests already authenticated by
+    `graphql_auth.middleware.JSONWebTokenMiddleware` are skipped,
+    unless the token is sent as an argument.
     """
 
     def authenticate(self, request=None, **kwargs):
         if request is None or getattr(request, "_jwt_token_auth", False):
             return None
 
+        if getattr(request, REQUEST_AUTHENTICATED, False) and (
+            get_token_argument(request, **kwargs) is None
+        ):
+            return None
+
         token = get_credentials(request, **kwargs)
 
         try:  # +++
             if token is not None:
-                return get_user_by_token(token, request)
+                payload = get_payload(token, request)
+                user = get_user_by_payload(payload)
+                request._jwt_payload = payload
+                return user
         except JSONWebTokenError:  # +++
             pass  # +++
 
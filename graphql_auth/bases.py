@@ -1,14 +1,26 @@
-import graphene
+from collections import OrderedDict
 
+import graphene
 from django.utils.module_loading import import_string
+from graphene.utils.props import props
+from graphql_jwt.mixins import JSONWebTokenMixin
+from graphql_jwt.settings import jwt_settings
 
+from .instrumentation import timed
+from .profiling import profiled
 from .types import ExpectedErrorType
 from .settings import graphql_auth_settings as app_settings
 
-if app_settings.CUSTOM_ERROR_TYPE and isinstance(app_settings.CUSTOM_ERROR_TYPE, str):
-    OutputErrorType = import_string(app_settings.CUSTOM_ERROR_TYPE)
-else:
-    OutputErrorType = ExpectedErrorType
+
+def get_output_error_type():
+    """
+    resolved when the schema is built, not on import
+    """
+    if app_settings.CUSTOM_ERROR_TYPE and isinstance(
+        app_settings.CUSTOM_ERROR_TYPE, str
+    ):
+        return import_string(app_settings.CUSTOM_ERROR_TYPE)
+    return ExpectedErrorType
 
 
 class Output:
@@ -18,7 +30,7 @@ class Output:
     """
 
     success = graphene.Boolean(default_value=True)
-    errors = graphene.Field(OutputErrorType)
+    errors = graphene.Field(get_output_error_type)
 
 
 class MutationMixin:
@@ -28,7 +40,9 @@ class MutationMixin:
 
     @classmethod
     def mutate(cls, root, info, **input):
-        return cls.resolve_mutation(root, info, **input)
+        return profiled(
+            cls, timed, (cls, "total", cls.resolve_mutation, (root, info), input)
+        )
 
     @classmethod
     def parent_resolve(cls, root, info, **kwargs):
@@ -42,13 +56,33 @@ class RelayMutationMixin:
 
     @classmethod
     def mutate_and_get_payload(cls, root, info, **kwargs):
-        return cls.resolve_mutation(root, info, **kwargs)
+        return profiled(
+            cls, timed, (cls, "total", cls.resolve_mutation, (root, info), kwargs)
+        )
 
     @classmethod
     def parent_resolve(cls, root, info, **kwargs):
         return super().mutate_and_get_payload(root, info, **kwargs)
 
 
+def get_dynamic_fields(fields, required_fields, field_class):
+    """
+    build the graphene fields of `fields` and `required_fields`,
+    a dict { name: type } or a list [name,] -> defaults to String
+    """
+    result = OrderedDict()
+    for names, required in ((fields, False), (required_fields, True)):
+        if isinstance(names, dict):
+            for key in names:
+                result[key] = field_class(
+                    getattr(graphene, names[key]), required=required
+                )
+        elif isinstance(names, list):
+            for key in names:
+                result[key] = field_class(graphene.String, required=required)
+    return result
+
+
 class DynamicArgsMixin:
     """
     A class that knows how to initialize graphene arguments
@@ -58,35 +92,23 @@ class DynamicArgsMixin:
         cls._required_args
     args is dict { arg_name: arg_type }
     or list [arg_name,] -> defaults to String
+
+    The arguments are built once, when the class is created.
     """
 
     _args = {}
     _required_args = {}
 
     @classmethod
-    def Field(cls, *args, **kwargs):
-        if isinstance(cls._args, dict):
-            for key in cls._args:
-                cls._meta.arguments.update(
-                    {key: graphene.Argument(getattr(graphene, cls._args[key]))}
-                )
-        elif isinstance(cls._args, list):
-            for key in cls._args:
-                cls._meta.arguments.update({key: graphene.String()})
-
-        if isinstance(cls._required_args, dict):
-            for key in cls._required_args:
-                cls._meta.arguments.update(
-                    {
-                        key: graphene.Argument(
-                            getattr(graphene, cls._required_args[key]), required=True
-                        )
-                    }
-                )
-        elif isinstance(cls._required_args, list):
-            for key in cls._required_args:
-                cls._meta.arguments.update({key: graphene.String(required=True)})
-        return super().Field(*args, **kwargs)
+    def __init_subclass_with_meta__(cls, arguments=None, **options):
+        if not arguments:
+            input_class = getattr(cls, "Arguments", None)
+            arguments = props(input_class) if input_class else {}
+        arguments = OrderedDict(arguments)
+        arguments.update(
+            get_dynamic_fields(cls._args, cls._required_args, graphene.Argument)
+        )
+        super().__init_subclass_with_meta__(arguments=arguments, **options)
 
 
 class DynamicInputMixin:
@@ -98,36 +120,37 @@ class DynamicInputMixin:
         cls._required_inputs
     inputs is dict { input_name: input_type }
     or list [input_name,] -> defaults to String
+
+    The input is built once, when the class is created.
     """
 
     _inputs = {}
     _required_inputs = {}
 
     @classmethod
-    def Field(cls, *args, **kwargs):
-        if isinstance(cls._inputs, dict):
-            for key in cls._inputs:
-                cls._meta.arguments["input"]._meta.fields.update(
-                    {key: graphene.InputField(getattr(graphene, cls._inputs[key]))}
-                )
-        elif isinstance(cls._inputs, list):
-            for key in cls._inputs:
-                cls._meta.arguments["input"]._meta.fields.update(
-                    {key: graphene.InputField(graphene.String)}
-                )
+    def __init_subclass_with_meta__(cls, input_fields=None, **options):
+        input_fields = OrderedDict(input_fields or {})
+        input_fields.update(
+            get_dynamic_fields(cls._inputs, cls._required_inputs, graphene.InputField)
+        )
+        super().__init_subclass_with_meta__(input_fields=input_fields, **options)
 
-        if isinstance(cls._required_inputs, dict):
-            for key in cls._required_inputs:
-                cls._meta.arguments["input"]._meta.fields.update(
-                    {
-                        key: graphene.InputField(
-                            getattr(graphene, cls._required_inputs[key]), required=True
-                        )
-                    }
-                )
-        elif isinstance(cls._required_inputs, list):
-            for key in cls._required_inputs:
-                cls._meta.arguments["input"]._meta.fields.update(
-                    {key: graphene.InputField(graphene.String, required=True)}
-                )
-        return super().Field(*args, **kwargs)
+
+class JSONWebTokenFieldsMixin:
+    """
+    Add the token fields that graphql_jwt's `JSONWebTokenMixin.Field`
+    sets on every call once, when the class is created.
+    """
+
+    @classmethod
+    def __init_subclass_with_meta__(cls, **options):
+        if not jwt_settings.JWT_HIDE_TOKEN_FIELDS:
+            cls.token = graphene.Field(graphene.String, required=True)
+            if jwt_settings.JWT_LONG_RUNNING_REFRESH_TOKEN:
+                cls.refresh_token = graphene.Field(graphene.String, required=True)
+        super().__init_subclass_with_meta__(**options)
+
+    @classmethod
+    def Field(cls, *args, **kwargs):
+        # skip the graphql_jwt overrides, that update _meta on every call
+        return super(JSONWebTokenMixin, cls).Field(*args, **kwargs)
@@ -0,0 +1,268 @@
+"""
+Bulk user import.
+
+Rows are plain dicts with the registration fields and an optional
+`password`, read e.g. from CSV or JSON lines with `read_rows`.
+They are validated and saved in chunks: one `IN` query per unique
+field, one `bulk_create` for the users and one for their statuses.
+"""
+
+import csv
+import json
+from itertools import islice
+from smtplib import SMTPException
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils.translation import gettext as _
+
+from .constants import Messages
+from .hashers import PasswordHashingPool
+from .mail import get_async_email_func
+from .models import UserStatus
+from .settings import graphql_auth_settings as app_settings
+
+UserModel = get_user_model()
+
+
+class ImportResult:
+    def __init__(self, created=0, errors=None):
+        self.created = created
+        # list of (line, errors) in the mutations errors format
+        self.errors = errors or []
+
+    def update(self, other):
+        self.created += other.created
+        self.errors.extend(other.errors)
+        return self
+
+
+def read_rows(file, format="csv"):
+    """
+    yield one dict per CSV row or JSON line
+    """
+    if format == "csv":
+        yield from csv.DictReader(file)
+    elif format == "jsonl":
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError("Unknown import format: '%s'" % format)
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def validation_errors(error):
+    return {
+        field: [{"message": m, "code": e.code} for e in errors for m in e]
+        for field, errors in error.error_dict.items()
+    }
+
+
+def lower_email(user):
+    """
+    the lowercased email of `user`, empty if it has none
+    """
+    return (getattr(user, UserModel.EMAIL_FIELD, None) or "").lower()
+
+
+class UserImporter:
+    """
+    Validate and create users from an iterable of rows.
+
+    Passwords are hashed in this process by default, or with a
+    `PasswordHashingPool` of `hash_workers` processes, `None`
+    meaning the number of cores.
+
+    If `send_activation_email` is set, activation emails are sent
+    after each chunk is committed, through `EMAIL_ASYNC_TASK` when
+    configured. `info` is the object given to the email functions,
+    anything with a `context` request.
+    """
+
+    def __init__(
+        self,
+        batch_size=500,
+        hash_workers=1,
+        verified=False,
+        validate_passwords=False,
+        send_activation_email=False,
+        info=None,
+    ):
+        self.batch_size = batch_size
+        self.hash_workers = hash_workers
+        self.verified = verified
+        self.validate_passwords = validate_passwords
+        self.send_activation_email = send_activation_email
+        self.info = info
+        self.required_fields = app_settings.register_required_fields
+        self.fields = app_settings.register_form_fields
+        self.check_email = UserModel.EMAIL_FIELD in self.fields
+        self.async_email_func = get_async_email_func()
+
+    def run(self, rows):
+        result = ImportResult()
+        for chunk_result in self.iter_chunks(rows):
+            result.update(chunk_result)
+        return result
+
+    def iter_chunks(self, rows):
+        """
+        import the rows chunk by chunk, yielding an `ImportResult` per chunk
+        """
+        with PasswordHashingPool(self.hash_workers) as pool:
+            numbered = enumerate(rows, start=1)
+            for chunk in chunked(numbered, self.batch_size):
+                yield self.import_chunk(chunk, pool)
+
+    def clean_row(self, row):
+        data = {f: row[f] for f in self.fields if row.get(f) not in (None, "")}
+        errors = {
+            f: [{"message": _("This field is required."), "code": "required"}]
+            for f in self.required_fields
+            if f not in data
+        }
+        user = UserModel(**data)
+        exclude = [f.name for f in UserModel._meta.fields if f.name not in data]
+        try:
+            user.clean_fields(exclude=exclude)
+            user.clean()
+        except ValidationError as e:
+            errors.update(validation_errors(e))
+        password = row.get("password") or None
+        if password and self.validate_passwords:
+            try:
+                validate_password(password, user)
+            except ValidationError as e:
+                errors["password"] = [
+                    {"message": m, "code": err.code}
+                    for err in e.error_list
+                    for m in err
+                ]
+        return user, password, errors
+
+    def taken_values(self, users):
+        """
+        usernames and lowercased emails already in use, one query each
+        """
+        username_field = UserModel.USERNAME_FIELD
+        usernames = {user.get_username() for user in users}
+        taken_usernames = set(
+            UserModel._default_manager.filter(
+                **{username_field + "__in": usernames}
+            ).values_list(username_field, flat=True)
+        )
+        taken_emails = set()
+        if self.check_email:
+            emails = {lower_email(user) for user in users} - {""}
+            taken_emails.update(
+                UserModel._default_manager.annotate(
+                    _email=Lower(UserModel.EMAIL_FIELD)
+                )
+                .filter(_email__in=emails)
+                .values_list("_email", flat=True)
+            )
+            taken_emails.update(
+                UserStatus._default_manager.annotate(_email=Lower("secondary_email"))
+                .filter(_email__in=emails)
+                .values_list("_email", flat=True)
+            )
+        return taken_usernames, taken_emails
+
+    def import_chunk(self, chunk, pool):
+        result = ImportResult()
+        cleaned = []
+        for line, row in chunk:
+            user, password, errors = self.clean_row(row)
+            if errors:
+                result.errors.append((line, errors))
+            else:
+                cleaned.append((line, user, password))
+
+        taken_usernames, taken_emails = self.taken_values([c[1] for c in cleaned])
+        unique_error = {
+            UserModel.USERNAME_FIELD: [
+                {
+                    "message": _("A user with that username already exists."),
+                    "code": "unique",
+                }
+            ]
+        }
+        accepted = []
+        for line, user, password in cleaned:
+            username = user.get_username()
+            email = self.check_email and lower_email(user)
+            if username in taken_usernames:
+                result.errors.append((line, unique_error))
+            elif email and email in taken_emails:
+                result.errors.append(
+                    (line, {UserModel.EMAIL_FIELD: Messages.EMAIL_IN_USE})
+                )
+            else:
+                # also catches duplicates inside the chunk
+                taken_usernames.add(username)
+                if email:
+                    taken_emails.add(email)
+                accepted.append((line, user, password))
+
+        if not accepted:
+            return result
+
+        lines, users, passwords = zip(*accepted)
+        for user, password_hash in zip(users, pool.hash(passwords)):
+            user.password = password_hash
+
+        with transaction.atomic():
+            UserModel._default_manager.bulk_create(users)
+            users = list(users)
+            if any(user.pk is None for user in users):
+                self.load_pks(users)
+            UserStatus._default_manager.create_for_users(users, verified=self.verified)
+            if self.send_activation_email and self.info is not None:
+                transaction.on_commit(
+                    lambda: self.send_emails(zip(lines, users), result)
+                )
+        result.created = len(users)
+        return result
+
+    def load_pks(self, users):
+        username_field = UserModel.USERNAME_FIELD
+        pks = dict(
+            UserModel._default_manager.filter(
+                **{username_field + "__in": [user.get_username() for user in users]}
+            ).values_list(username_field, "pk")
+        )
+        for user in users:
+            user.pk = pks[user.get_username()]
+
+    def send_emails(self, numbered_users, result):
+        for line, user in numbered_users:
+            if not getattr(user, UserModel.EMAIL_FIELD, None):
+                continue
+            try:
+                if self.async_email_func:
+                    self.async_email_func(
+                        user.status.send_activation_email, (self.info,)
+                    )
+                else:
+                    user.status.send_activation_email(self.info)
+            except SMTPException:
+                result.errors.append((line, Messages.EMAIL_FAIL))
+
+
+def import_users(rows, **options):
+    """
+    shortcut for `UserImporter(**options).run(rows)`
+    """
+    return UserImporter(**options).run(rows)
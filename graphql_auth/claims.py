@@ -0,0 +1,94 @@
+"""
+Compact user status claims embedded in the JWT payload.
+
+Enable with the `JWT_STATUS_CLAIMS` setting and point graphql_jwt
+to the payload handler:
+
+GRAPHQL_JWT = {
+    "JWT_PAYLOAD_HANDLER": "graphql_auth.claims.jwt_payload",
+}
+
+Claims are only trusted while their version matches the committed
+`UserStatus.version`, kept in the default cache, which must be shared
+by every process. On a cache miss the version is read from the
+database, never taken from the token.
+"""
+
+from django.core.cache import cache
+from graphql_jwt.utils import jwt_payload as base_jwt_payload
+
+from .constants import StatusFlag
+from .models import UserStatus
+from .settings import graphql_auth_settings as app_settings
+
+STATUS_CLAIM = "status"
+
+
+class StatusSnapshot:
+    """
+    Read only stand-in for `user.status` built from token claims.
+    """
+
+    __slots__ = ("flags", "version")
+
+    def __init__(self, flags, version):
+        self.flags = flags
+        self.version = version
+
+    @property
+    def verified(self):
+        return bool(self.flags & StatusFlag.VERIFIED)
+
+    @property
+    def archived(self):
+        return bool(self.flags & StatusFlag.ARCHIVED)
+
+    @property
+    def blocked(self):
+        return bool(self.flags & StatusFlag.BLOCKED)
+
+
+def jwt_payload(user, context=None):
+    payload = base_jwt_payload(user, context)
+    if app_settings.JWT_STATUS_CLAIMS:
+        status = user.status
+        payload[STATUS_CLAIM] = {
+            "flags": status.pack_flags(),
+            "version": status.version,
+        }
+    return payload
+
+
+def current_version(user_pk):
+    version = cache.get(UserStatus.version_cache_key(user_pk))
+    if version is None:
+        version = UserStatus.cache_version(user_pk, replace=False)
+    return version
+
+
+def get_user_status(user, context=None):
+    """
+    return the status snapshot from the token claims when they
+    are still current, otherwise `user.status`
+    """
+    if not app_settings.JWT_STATUS_CLAIMS:
+        return user.status
+
+    # evaluated first, a lazy request user sets the payload
+    user_pk = user.pk
+    cached = getattr(context, "_graphql_auth_status", None)
+    if cached is not None and cached[0] == user_pk:
+        return cached[1]
+
+    payload = getattr(context, "_jwt_payload", None)
+    claim = payload.get(STATUS_CLAIM) if payload else None
+    if (
+        isinstance(claim, dict)
+        and payload.get(user.USERNAME_FIELD) == user.get_username()
+        and current_version(user_pk) == claim.get("version")
+    ):
+        status = StatusSnapshot(claim.get("flags", 0), claim["version"])
+        if context is not None:
+            context._graphql_auth_status = (user_pk, status)
+        return status
+    return user.status
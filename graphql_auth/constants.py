@@ -31,6 +31,9 @@ class Messages:
     EMAIL_IN_USE = [
         {"message": _("A user with that email already exists."), "code": "unique"}
     ]
+    USERNAME_IN_USE = [
+        {"message": _("A user with that username already exists."), "code": "unique"}
+    ]
     SECONDARY_EMAIL_REQUIRED = [
         {
             "message": _("You need to setup a secondary email to proceed."),
@@ -56,3 +59,9 @@ class TokenAction(object):
     PASSWORD_RESET = "password_reset"
     ACTIVATION_SECONDARY_EMAIL = "activation_secondary_email"
     PASSWORD_SET = "password_set"
+
+
+class StatusFlag(object):
+    VERIFIED = 1
+    ARCHIVED = 2
+    BLOCKED = 4
@@ -1,7 +1,18 @@
 from functools import wraps
 
+from graphene.utils.thenables import maybe_thenable
+from graphql_jwt import signals
+from graphql_jwt.decorators import (
+    csrf_rotation,
+    on_token_auth_resolve,
+    refresh_expiration,
+    setup_jwt_cookie,
+)
+
+from .claims import get_user_status
 from .constants import Messages
 from .exceptions import WrongUsage
+from .utils import can_authenticate
 
 
 def login_required(fn):
@@ -11,13 +22,14 @@ def login_required(fn):
         if not user.is_authenticated:
             return cls(success=False, errors=Messages.UNAUTHENTICATED)
 
-        if user.status.blocked is True:
+        if get_user_status(user, info.context).blocked is True:
             return cls(success=False, errors=Messages.BLOCKED)
 
         return fn(cls, root, info, **kwargs)
 
     return wrapper
 
+
 def superuser_required(fn):
     @wraps(fn)
     @login_required
@@ -35,7 +47,7 @@ def verification_required(fn):
     @login_required
     def wrapper(cls, root, info, **kwargs):
         user = info.context.user
-        if not user.status.verified:
+        if not get_user_status(user, info.context).verified:
             return cls(success=False, errors=Messages.NOT_VERIFIED)
         return fn(cls, root, info, **kwargs)
 
@@ -76,3 +88,32 @@ def password_confirmation_required(fn):
         return cls(success=False, errors=errors)
 
     return wrapper
+
+
+def token_issue(fn):
+    """
+    graphql_jwt `token_auth` for a user already at hand, e.g. just
+    registered or with a new password: it issues the token and refresh
+    token of `user` without authenticating, and hashing, again.
+    `user` must still pass the backend checks of `authenticate`,
+    e.g. `is_active`.
+    """
+
+    @wraps(fn)
+    @setup_jwt_cookie
+    @csrf_rotation
+    @refresh_expiration
+    def wrapper(cls, root, info, user, **kwargs):
+        if not can_authenticate(user):
+            return cls(success=False, errors=Messages.UNAUTHENTICATED)
+
+        context = info.context
+        context._jwt_token_auth = True
+        if hasattr(context, "user"):
+            context.user = user
+
+        result = fn(cls, root, info, **kwargs)
+        signals.token_issued.send(sender=cls, request=context, user=user)
+        return maybe_thenable((context, user, result), on_token_auth_resolve)
+
+    return wrapper
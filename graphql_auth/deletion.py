@@ -0,0 +1,281 @@
+"""
+Deferred account deletion.
+
+With `DEFERRED_ACCOUNT_DELETION`, `DeleteAccount` only deactivates
+the account and sets `UserStatus.deletion_requested`. `AccountPurger`
+deletes those accounts later: the rows cascading from the user are
+deleted table by table in chunks of `batch_size`, each chunk in its
+own transaction, and the user is deleted last with what is left.
+
+An interrupted purge is resumed by the next run, the account stays
+marked until the user row itself is gone.
+
+`StaleAccountPurger` deletes, through `AccountPurger`, or anonymizes
+the accounts that never verified, or stayed archived, for a given
+number of days.
+"""
+
+import time
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import models, transaction
+from django.db.models.functions import Cast, Concat
+from django.utils import timezone
+from graphql_jwt.refresh_token.utils import get_refresh_token_model
+
+from .models import UserStatus
+from .utils import using_refresh_tokens
+
+UserModel = get_user_model()
+
+
+class PurgeProgress:
+    def __init__(self, user_pk, model, deleted, done=False):
+        self.user_pk = user_pk
+        # label of the model the chunk was deleted from
+        self.model = model
+        self.deleted = deleted
+        # the user row itself is deleted
+        self.done = done
+
+
+def cascading_relations(model):
+    """
+    reverse relations of `model` deleted along with it, but `status`,
+    which holds the deletion mark
+    """
+    return [
+        rel
+        for rel in model._meta.related_objects
+        if not rel.many_to_many
+        and rel.on_delete is models.CASCADE
+        and rel.related_model is not UserStatus
+    ]
+
+
+class AccountPurger:
+    """
+    Delete the accounts marked by `UserStatus.request_deletion`.
+
+    `iter_purge` yields a `PurgeProgress` per deleted chunk, the
+    last one of each account being the user row itself.
+    """
+
+    def __init__(self, batch_size=500):
+        self.batch_size = batch_size
+        self.relations = cascading_relations(UserModel)
+
+    def pending(self):
+        return UserModel._default_manager.filter(
+            pk__in=UserStatus._default_manager.pending_deletion().values("user")
+        ).order_by("status__deletion_requested")
+
+    def iter_purge(self, users=None):
+        """
+        purge `users`, or every pending account, yielding the progress
+        """
+        if users is None:
+            users = self.pending()
+        for user in users:
+            yield from self.purge_user(user)
+
+    def purge_user(self, user):
+        for rel in self.relations:
+            yield from self.delete_related(user, rel)
+        with transaction.atomic():
+            deleted, _ = UserModel._base_manager.filter(pk=user.pk).delete()
+        yield PurgeProgress(user.pk, UserModel._meta.label, deleted, done=True)
+
+    def delete_related(self, user, rel):
+        manager = rel.related_model._base_manager
+        queryset = manager.filter(**{rel.field.name: user}).order_by()
+        while True:
+            pks = list(queryset.values_list("pk", flat=True)[: self.batch_size])
+            if not pks:
+                return
+            with transaction.atomic():
+                deleted, _ = manager.filter(pk__in=pks).delete()
+            yield PurgeProgress(user.pk, rel.related_model._meta.label, deleted)
+
+    def run(self, users=None):
+        """
+        purge and return the number of deleted rows
+        """
+        return sum(progress.deleted for progress in self.iter_purge(users))
+
+
+class StaleAccountPurger:
+    """
+    Delete, or anonymize, the accounts not verified `unverified_days`
+    after joining, and the archived ones not logged in for
+    `archived_days`. Either one can be `None` to skip those accounts.
+
+    Candidates are selected from the user model by the `verified` and
+    `archived` columns of their status, a user without a status being
+    unverified. Staff and superusers are left alone unless
+    `include_staff`, override `protected` to keep other accounts.
+    They are processed in batches of `batch_size` pks, each batch
+    reading the next pks after the last one processed, sleeping
+    `sleep` seconds in between.
+
+    Deleted accounts go through `AccountPurger`, their related rows
+    being deleted in chunks before the user. Anonymized accounts keep
+    their rows but lose the username, email, names and password, and
+    are made inactive, a batch in one transaction.
+    """
+
+    def __init__(
+        self,
+        unverified_days=None,
+        archived_days=None,
+        anonymize=False,
+        batch_size=500,
+        sleep=0,
+        include_staff=False,
+    ):
+        self.unverified_days = unverified_days
+        self.archived_days = archived_days
+        self.anonymize = anonymize
+        self.batch_size = batch_size
+        self.sleep = sleep
+        self.include_staff = include_staff
+
+    def filters(self):
+        """
+        the user filters of each kind of stale account
+        """
+        now = timezone.now()
+        filters = {}
+        if self.unverified_days is not None:
+            cutoff = now - timedelta(days=self.unverified_days)
+            filters["unverified"] = (
+                (models.Q(status__verified=False) | models.Q(status__isnull=True))
+                & models.Q(date_joined__lt=cutoff)
+                & (models.Q(last_login=None) | models.Q(last_login__lt=cutoff))
+            )
+        if self.archived_days is not None:
+            cutoff = now - timedelta(days=self.archived_days)
+            filters["archived"] = models.Q(status__archived=True) & (
+                models.Q(last_login__lt=cutoff)
+                | models.Q(last_login=None, date_joined__lt=cutoff)
+            )
+        return filters
+
+    def protected(self):
+        """
+        the filter of the accounts never processed
+        """
+        if self.include_staff:
+            return None
+        names = {f.name for f in UserModel._meta.concrete_fields}
+        protected = [
+            models.Q(**{name: True})
+            for name in ("is_staff", "is_superuser")
+            if name in names
+        ]
+        return reduce(or_, protected) if protected else None
+
+    def candidates(self, condition):
+        # accounts waiting for purge_deleted_accounts are left to it
+        users = UserModel._base_manager.filter(condition).filter(
+            status__deletion_requested=None
+        )
+        protected = self.protected()
+        if protected is not None:
+            users = users.exclude(protected)
+        if self.anonymize:
+            users = users.filter(is_active=True)
+        return users
+
+    def report(self):
+        """
+        number of stale accounts of each kind, an account can be both
+        """
+        return {
+            kind: self.candidates(condition).count()
+            for kind, condition in self.filters().items()
+        }
+
+    def iter_batches(self):
+        """
+        process the stale accounts, yielding the size of each batch
+        """
+        filters = list(self.filters().values())
+        if not filters:
+            return
+        pks = self.candidates(reduce(or_, filters)).order_by("pk")
+        pks = pks.values_list("pk", flat=True)
+        last = None
+        while True:
+            batch = pks if last is None else pks.filter(pk__gt=last)
+            batch = list(batch[: self.batch_size])
+            if not batch:
+                return
+            if self.anonymize:
+                with transaction.atomic():
+                    self.anonymize_users(batch)
+            else:
+                self.delete_users(batch)
+            yield len(batch)
+            last = batch[-1]
+            if self.sleep:
+                time.sleep(self.sleep)
+
+    def delete_users(self, pks):
+        users = UserModel._base_manager.filter(pk__in=pks).order_by("pk")
+        for _ in AccountPurger(self.batch_size).iter_purge(users):
+            pass
+
+    def anonymous_fields(self):
+        """
+        the user fields overwritten on anonymize, override it
+        for custom user models
+        """
+        names = {f.name for f in UserModel._meta.concrete_fields}
+        fields = {
+            UserModel.USERNAME_FIELD: Concat(
+                models.Value("anonymized-"), Cast("pk", models.CharField())
+            ),
+            "password": make_password(None),
+            "is_active": False,
+        }
+        if UserModel.EMAIL_FIELD != UserModel.USERNAME_FIELD:
+            fields[UserModel.EMAIL_FIELD] = ""
+        for name in ("first_name", "last_name"):
+            if name in names:
+                fields[name] = ""
+        return fields
+
+    def anonymize_users(self, pks):
+        UserModel._base_manager.filter(pk__in=pks).update(**self.anonymous_fields())
+        UserStatus._default_manager.filter(user_id__in=pks).update(
+            secondary_email=None
+        )
+        if using_refresh_tokens():
+            get_refresh_token_model()._base_manager.filter(
+                user_id__in=pks, revoked=None
+            ).update(revoked=timezone.now())
+
+    def run(self):
+        """
+        process and return the number of stale accounts
+        """
+        return sum(self.iter_batches())
+
+
+def purge_deleted_accounts(users=None, **options):
+    """
+    shortcut for `AccountPurger(**options).run(users)`
+    """
+    return AccountPurger(**options).run(users)
+
+
+def purge_stale_accounts(**options):
+    """
+    shortcut for `StaleAccountPurger(**options).run()`
+    """
+    return StaleAccountPurger(**options).run()
@@ -1,19 +1,18 @@
+import copy
+import sys
+from functools import lru_cache, reduce
+from operator import or_
+
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm, UsernameField
-from django.contrib.auth import get_user_model
+from django.contrib.auth import get_user_model, password_validation
 from django import forms
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db.models import Count, Q
+from django.forms.utils import ErrorDict, ErrorList
 
-from .utils import flat_dict
 from .settings import graphql_auth_settings as app_settings
 
 
-class RegisterForm(UserCreationForm):
-    class Meta:
-        model = get_user_model()
-        fields = flat_dict(app_settings.REGISTER_MUTATION_FIELDS) + flat_dict(
-            app_settings.REGISTER_MUTATION_FIELDS_OPTIONAL
-        )
-
-
 class EmailForm(forms.Form):
     email = forms.EmailField(max_length=254)
 
@@ -22,32 +21,342 @@ class CustomUsernameField(UsernameField):
     required = False
 
 
-class UpdateAccountForm(UserChangeForm):
-    class Meta:
-        model = get_user_model()
-        fields = flat_dict(app_settings.UPDATE_MUTATION_FIELDS)
-        field_classes = {"username": CustomUsernameField}
+# the model forms fields are built from the settings when the class is
+# created, so they are only created on first access, see __getattr__
+
+
+def build_register_form():
+    class RegisterForm(UserCreationForm):
+        class Meta:
+            model = get_user_model()
+            fields = app_settings.register_form_fields
+
+    return RegisterForm
+
+
+def build_update_account_form():
+    class UpdateAccountForm(UserChangeForm):
+        class Meta:
+            model = get_user_model()
+            fields = app_settings.update_form_fields
+            field_classes = {"username": CustomUsernameField}
+
+    return UpdateAccountForm
+
+
+def build_password_less_register_form():
+    class PasswordLessRegisterForm(UserCreationForm):
+        """
+        A RegisterForm with optional password inputs.
+        """
+
+        class Meta:
+            model = get_user_model()
+            fields = app_settings.register_form_fields
+
+        def __init__(self, *args, **kwargs):
+            super(PasswordLessRegisterForm, self).__init__(*args, **kwargs)
+            self.fields["password1"].required = False
+            self.fields["password2"].required = False
+
+        def save(self, commit=True):
+            user = super().save(commit=False)
+            user.set_unusable_password()
+            if commit:
+                user.save()
+            return user
+
+    return PasswordLessRegisterForm
+
+
+LAZY_FORMS = {
+    "RegisterForm": build_register_form,
+    "UpdateAccountForm": build_update_account_form,
+    "PasswordLessRegisterForm": build_password_less_register_form,
+}
+
+
+def __getattr__(name):
+    if name not in LAZY_FORMS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    form = LAZY_FORMS[name]()
+    form.__module__ = __name__
+    form.__qualname__ = name
+    globals()[name] = form  # next lookups skip __getattr__
+    return form
+
+
+class LazyForm:
+    """
+    Class attribute returning the form of this module with the given
+    name, or the name returned by a callable, on access.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        name = self.name() if callable(self.name) else self.name
+        return getattr(sys.modules[__name__], name)
+
+
+@lru_cache(maxsize=None)
+def without_unique_checks(form_class):
+    """
+    subclass of the model form `form_class` skipping the unique
+    fields queries, to check them some other way
+    """
+    return type(
+        form_class.__name__, (form_class,), {"validate_unique": lambda self: None}
+    )
 
 
-class PasswordLessRegisterForm(UserCreationForm):
+class RegisterValidator:
     """
-    A RegisterForm with optional password inputs.
+    The checks of a `UserCreationForm` subclass, e.g. `RegisterForm`,
+    prepared once: the fields are not copied for each request, and the
+    unique checks run in a single query. The errors are the same as the
+    form errors. Enabled with the `REGISTER_FAST_VALIDATION` setting.
+
+    Calling it with the data returns a `RegisterValidation`, which has
+    the `is_valid`, `errors`, `cleaned_data` and `save` of the form.
     """
 
-    class Meta:
-        model = get_user_model()
-        fields = flat_dict(app_settings.REGISTER_MUTATION_FIELDS) + flat_dict(
-            app_settings.REGISTER_MUTATION_FIELDS_OPTIONAL
-        )
+    def __init__(self, form_class, passwordless=False):
+        self.form_class = form_class
+        self.model = form_class._meta.model
+        self.passwordless = passwordless
+        self.fields = dict(form_class.base_fields)
+        if passwordless:
+            for name in ("password1", "password2"):
+                self.fields[name] = copy.deepcopy(self.fields[name])
+                self.fields[name].required = False
+        self.model_fields = [
+            f for f in self.model._meta.fields if f.name in self.fields
+        ]
+        self.error_messages = form_class.error_messages
+
+    def __call__(self, data):
+        return RegisterValidation(self, data)
+
+
+class RegisterValidation:
+    def __init__(self, validator, data):
+        self.validator = validator
+        self.data = data
+        self._errors = None
+
+    @property
+    def errors(self):
+        if self._errors is None:
+            self.full_clean()
+        return self._errors
+
+    def is_valid(self):
+        return not self.errors
+
+    def add_error(self, field, error):
+        """
+        `BaseForm.add_error`
+        """
+        if not isinstance(error, ValidationError):
+            error = ValidationError(error)
+        if hasattr(error, "error_dict"):
+            error = error.error_dict
+        else:
+            error = {field or NON_FIELD_ERRORS: error.error_list}
+        for field, error_list in error.items():
+            if field not in self._errors:
+                if field == NON_FIELD_ERRORS:
+                    self._errors[field] = ErrorList(error_class="nonfield")
+                else:
+                    self._errors[field] = ErrorList()
+            self._errors[field].extend(error_list)
+            self.cleaned_data.pop(field, None)
 
-    def __init__(self, *args, **kwargs):
-        super(PasswordLessRegisterForm, self).__init__(*args, **kwargs)
-        self.fields["password1"].required = False
-        self.fields["password2"].required = False
+    def update_errors(self, error):
+        """
+        `BaseModelForm._update_errors`, the form fields messages
+        replace the model ones with the same code
+        """
+        error_dict = getattr(error, "error_dict", {NON_FIELD_ERRORS: error})
+        for field, messages in error_dict.items():
+            if field not in self.validator.fields:
+                continue
+            error_messages = self.validator.fields[field].error_messages
+            for message in messages:
+                if isinstance(message, ValidationError) and (
+                    message.code in error_messages
+                ):
+                    message.message = error_messages[message.code]
+        self.add_error(None, error)
+
+    def full_clean(self):
+        self._errors = ErrorDict()
+        self.cleaned_data = {}
+        self.clean_fields()
+        self.post_clean()
+
+    def clean_fields(self):
+        for name, field in self.validator.fields.items():
+            value = field.widget.value_from_datadict(self.data, {}, name)
+            try:
+                self.cleaned_data[name] = field.clean(value)
+                if name == "password2":
+                    self.cleaned_data[name] = self.clean_password2()
+            except ValidationError as e:
+                self.add_error(name, e)
+
+    def clean_password2(self):
+        """
+        `UserCreationForm.clean_password2`
+        """
+        password1 = self.cleaned_data.get("password1")
+        password2 = self.cleaned_data.get("password2")
+        if password1 and password2 and password1 != password2:
+            raise ValidationError(
+                self.validator.error_messages["password_mismatch"],
+                code="password_mismatch",
+            )
+        return password2
+
+    def get_validation_exclusions(self):
+        """
+        `BaseModelForm._get_validation_exclusions`
+        """
+        fields = self.validator.fields
+        exclude = []
+        for f in self.validator.model._meta.fields:
+            name = f.name
+            if name not in fields or name in self._errors:
+                exclude.append(name)
+            elif (
+                not f.blank
+                and not fields[name].required
+                and self.cleaned_data.get(name) in fields[name].empty_values
+            ):
+                exclude.append(name)
+        return exclude
+
+    def construct_instance(self):
+        """
+        `construct_instance`
+        """
+        instance = self.validator.model()
+        for f in self.validator.model_fields:
+            if not f.editable or f.name not in self.cleaned_data:
+                continue
+            value = self.cleaned_data[f.name]
+            field = self.validator.fields[f.name]
+            if (
+                f.has_default()
+                and field.widget.value_omitted_from_data(self.data, {}, f.name)
+                and value in field.empty_values
+            ):
+                continue
+            f.save_form_data(instance, value)
+        return instance
+
+    def post_clean(self):
+        """
+        `UserCreationForm._post_clean`, with the unique checks in one query
+        """
+        self.instance = self.construct_instance()
+        try:
+            self.instance.full_clean(
+                exclude=self.get_validation_exclusions(), validate_unique=False
+            )
+        except ValidationError as e:
+            self.update_errors(e)
+        self.validate_unique()
+
+        password = self.cleaned_data.get("password2")
+        if password:
+            try:
+                password_validation.validate_password(password, self.instance)
+            except ValidationError as error:
+                self.add_error("password2", error)
+
+    def validate_unique(self):
+        """
+        `BaseModelForm.validate_unique`, falling back to
+        `Model.validate_unique` when the private Model API used by
+        `unique_errors` differs in this Django version
+        """
+        exclude = self.get_validation_exclusions()
+        try:
+            errors = self.unique_errors(exclude)
+        except (AttributeError, TypeError):
+            try:
+                self.instance.validate_unique(exclude=exclude)
+            except ValidationError as e:
+                self.update_errors(e)
+            return
+        if errors:
+            self.update_errors(ValidationError(errors))
+
+    def unique_errors(self, exclude):
+        """
+        `Model._perform_unique_checks`, one COUNT per check in a single
+        query per model, which is the parent model for the fields it
+        defines with multi-table inheritance. The rows are read with
+        `_base_manager`, a default manager hiding rows would let through
+        values the database rejects. The `unique_for_date` checks are
+        `Model._perform_date_checks`.
+        """
+        instance = self.instance
+        unique_checks, date_checks = instance._get_unique_checks(exclude=exclude)
+        lookups = {}
+        for model_class, unique_check in unique_checks:
+            lookup = {}
+            for name in unique_check:
+                f = model_class._meta.get_field(name)
+                value = getattr(instance, f.attname)
+                if value is None:
+                    break
+                lookup[str(name)] = value
+            else:
+                lookups.setdefault(model_class, []).append(
+                    (unique_check, Q(**lookup))
+                )
+
+        errors = {}
+        for model_class, checks in lookups.items():
+            counts = model_class._base_manager.filter(
+                reduce(or_, (q for _, q in checks))
+            ).aggregate(
+                **{
+                    "check_%s" % i: Count("pk", filter=q)
+                    for i, (_, q) in enumerate(checks)
+                }
+            )
+            for i, (unique_check, _) in enumerate(checks):
+                if counts["check_%s" % i]:
+                    key = (
+                        unique_check[0] if len(unique_check) == 1 else NON_FIELD_ERRORS
+                    )
+                    errors.setdefault(key, []).append(
+                        instance.unique_error_message(model_class, unique_check)
+                    )
+        if date_checks:
+            for key, messages in instance._perform_date_checks(date_checks).items():
+                errors.setdefault(key, []).extend(messages)
+        return errors
 
     def save(self, commit=True):
-        user = super().save(commit=False)
-        user.set_unusable_password()
+        """
+        `UserCreationForm.save`, or `PasswordLessRegisterForm.save`
+        """
+        user = self.instance
+        if self.validator.passwordless:
+            user.set_unusable_password()
+        else:
+            user.set_password(self.cleaned_data["password1"])
         if commit:
             user.save()
         return user
+
+
+@lru_cache(maxsize=None)
+def get_register_validator(form_class, passwordless):
+    return RegisterValidator(form_class, passwordless)
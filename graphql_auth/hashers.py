@@ -0,0 +1,78 @@
+"""
+Batch password hashing.
+
+Hashing is CPU bound, so hashing many passwords at once (imports,
+migrations from legacy systems) is spread over a process pool.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+class PasswordHashingPool:
+    """
+    Run `make_password` for many passwords across `workers` processes,
+    `None` meaning the number of cores.
+
+    With a single worker, the default, passwords are hashed in this
+    process and no process is forked.
+    Use it as a context manager to reuse the processes between batches:
+
+        with PasswordHashingPool(workers=None) as pool:
+            for batch in batches:
+                hashes = pool.hash(batch)
+    """
+
+    def __init__(self, workers=1, chunksize=16):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.executor = None
+
+    def __enter__(self):
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker
+            )
+        return self
+
+    def __exit__(self, *args):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def hash(self, passwords):
+        """
+        return the hashes in the same order, `None` gives an unusable password
+        """
+        if self.executor is None:
+            return [make_password(password) for password in passwords]
+        return list(
+            self.executor.map(make_password, passwords, chunksize=self.chunksize)
+        )
+
+
+def hash_passwords(passwords, workers=1):
+    with PasswordHashingPool(workers) as pool:
+        return pool.hash(passwords)
+
+
+def bulk_set_passwords(users, passwords, workers=1, batch_size=None):
+    """
+    `set_password` for many users at once, saved with one `bulk_update`
+    """
+    users = list(users)
+    for user, password_hash in zip(users, hash_passwords(passwords, workers)):
+        user.password = password_hash
+    get_user_model()._default_manager.bulk_update(
+        users, ["password"], batch_size=batch_size
+    )
+    return users
@@ -0,0 +1,218 @@
+"""
+Stage timings of the mutations.
+
+Each mutation is timed as a whole (`total` stage) and the mixins time
+their expensive steps, e.g. `user_lookup`, `recaptcha`, `authenticate`
+on login or `form_validation`, `email` on register.
+
+Timings are sent to the `METRICS_SINK` setting, a callable (or the
+dotted path to one) receiving `(mutation, stage, duration)`, with the
+duration in seconds, and to the `mutation_stage_timed` signal.
+Without a sink nor signal receivers, `span` returns a shared no-op.
+
+    # settings.py
+    GRAPHQL_AUTH = {"METRICS_SINK": "myproject.metrics.sink"}
+
+    # myproject/metrics.py
+    from graphql_auth.instrumentation import StatsdSink
+
+    sink = StatsdSink("localhost", 8125)
+"""
+
+import inspect
+import logging
+import socket
+import threading
+from bisect import bisect_left
+from time import perf_counter
+
+from django.utils.module_loading import import_string
+
+from .settings import graphql_auth_settings as app_settings
+from .signals import mutation_stage_timed
+
+logger = logging.getLogger(__name__)
+
+_sinks = {}
+
+
+def get_sink():
+    sink = app_settings.METRICS_SINK
+    if isinstance(sink, str):
+        if sink not in _sinks:
+            _sinks[sink] = import_string(sink)
+        return _sinks[sink]
+    return sink
+
+
+class NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    __slots__ = ("mutation", "stage", "sink", "start")
+
+    def __init__(self, mutation, stage, sink):
+        self.mutation = mutation
+        self.stage = stage
+        self.sink = sink
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        emit(self.mutation, self.stage, perf_counter() - self.start, self.sink)
+
+
+def emit(mutation, stage, duration, sink):
+    name = getattr(mutation, "__name__", mutation)
+    try:
+        if sink is not None:
+            sink(name, stage, duration)
+        mutation_stage_timed.send(
+            sender=mutation, mutation=name, stage=stage, duration=duration
+        )
+    except Exception:
+        # metrics must never break the mutation
+        logger.exception("Failed to record %s.%s timing", name, stage)
+
+
+def span(mutation, stage):
+    """
+    context manager timing `stage` of `mutation` (the class or a name)
+    """
+    sink = get_sink()
+    if sink is None and not mutation_stage_timed.receivers:
+        return NOOP_SPAN
+    return Span(mutation, stage, sink)
+
+
+def timed(mutation, stage, fn, args=(), kwargs=None):
+    """
+    time `fn(*args, **kwargs)`, until completion if it returns an awaitable,
+    the arguments are passed apart so that any name can be used
+    """
+    kwargs = kwargs or {}
+    current = span(mutation, stage)
+    if current is NOOP_SPAN:
+        return fn(*args, **kwargs)
+    current.__enter__()
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException:
+        current.__exit__()
+        raise
+    if inspect.isawaitable(result):
+        return _atimed(current, result)
+    current.__exit__()
+    return result
+
+
+async def _atimed(current, awaitable):
+    with current:
+        return await awaitable
+
+
+class LoggingSink:
+    """
+    log every timing, in milliseconds
+    """
+
+    def __init__(self, logger_name="graphql_auth.metrics", level=logging.INFO):
+        self.logger = logging.getLogger(logger_name)
+        self.level = level
+
+    def __call__(self, mutation, stage, duration):
+        if self.logger.isEnabledFor(self.level):
+            self.logger.log(
+                self.level, "%s.%s %.3fms", mutation, stage, duration * 1000
+            )
+
+
+class StatsdSink:
+    """
+    send every timing as a statsd `ms` metric over UDP,
+    `<prefix>.<mutation>.<stage>`
+    """
+
+    def __init__(self, host="localhost", port=8125, prefix="graphql_auth"):
+        self.address = (host, port)
+        self.prefix = prefix
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.setblocking(False)
+
+    def format(self, mutation, stage, duration):
+        return "%s.%s.%s:%.3f|ms" % (self.prefix, mutation, stage, duration * 1000)
+
+    def __call__(self, mutation, stage, duration):
+        try:
+            self.socket.sendto(
+                self.format(mutation, stage, duration).encode(), self.address
+            )
+        except OSError:
+            pass  # statsd is fire and forget
+
+
+class PrometheusSink:
+    """
+    aggregate the timings in a histogram, `render` returns
+    it in the prometheus text format to be served by a view:
+
+        def metrics(request):
+            return HttpResponse(sink.render(), content_type=sink.content_type)
+    """
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+    default_buckets = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, name="graphql_auth_stage_duration_seconds", buckets=None):
+        self.name = name
+        self.buckets = tuple(sorted(buckets or self.default_buckets))
+        self.lock = threading.Lock()
+        # (mutation, stage) -> [bucket counts..., count, sum]
+        self.histograms = {}
+
+    def __call__(self, mutation, stage, duration):
+        index = bisect_left(self.buckets, duration)
+        with self.lock:
+            histogram = self.histograms.get((mutation, stage))
+            if histogram is None:
+                histogram = self.histograms[(mutation, stage)] = [0] * (
+                    len(self.buckets) + 2
+                )
+            if index < len(self.buckets):
+                histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += duration
+
+    def render(self):
+        lines = [
+            "# HELP %s Duration of the graphql_auth mutation stages." % self.name,
+            "# TYPE %s histogram" % self.name,
+        ]
+        with self.lock:
+            histograms = {key: list(value) for key, value in self.histograms.items()}
+        for (mutation, stage), histogram in sorted(histograms.items()):
+            labels = 'mutation="%s",stage="%s"' % (mutation, stage)
+            cumulative = 0
+            for bound, count in zip(self.buckets, histogram):
+                cumulative += count
+                lines.append(
+                    '%s_bucket{%s,le="%s"} %s' % (self.name, labels, bound, cumulative)
+                )
+            lines.append(
+                '%s_bucket{%s,le="+Inf"} %s' % (self.name, labels, histogram[-2])
+            )
+            lines.append("%s_count{%s} %s" % (self.name, labels, histogram[-2]))
+            lines.append("%s_sum{%s} %s" % (self.name, labels, histogram[-1]))
+        return "\n".join(lines) + "\n"
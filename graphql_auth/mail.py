@@ -0,0 +1,93 @@
+"""
+Email sending helpers: the `EMAIL_ASYNC_TASK` setting and async
+sending, used by the async mutations.
+
+With the SMTP email backend and `aiosmtplib` installed, the message
+is sent over an async SMTP connection, configured by the usual
+`EMAIL_*` django settings. Any other backend (locmem, console, custom)
+runs `send_mail` in a thread.
+"""
+
+from smtplib import SMTPException
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.utils.module_loading import import_string
+
+from .settings import graphql_auth_settings as app_settings
+
+SMTP_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+
+_email_tasks = {}
+
+
+def get_async_email_func():
+    """
+    the `EMAIL_ASYNC_TASK` function, imported on first use, or `None`
+    """
+    task = app_settings.EMAIL_ASYNC_TASK
+    if not task or not isinstance(task, str):
+        return None
+    if task not in _email_tasks:
+        _email_tasks[task] = import_string(task)
+    return _email_tasks[task]
+
+
+def import_aiosmtplib():
+    try:
+        import aiosmtplib
+    except ImportError:  # pragma: no cover
+        return None
+    return aiosmtplib
+
+
+def use_async_smtp():
+    return (
+        settings.EMAIL_BACKEND == SMTP_BACKEND and import_aiosmtplib() is not None
+    )
+
+
+async def asend_mail(
+    subject,
+    message,
+    from_email,
+    recipient_list,
+    fail_silently=False,
+    html_message=None,
+):
+    """
+    async `send_mail`, raise `smtplib.SMTPException` on failure
+    """
+    if not use_async_smtp():
+        return await sync_to_async(send_mail)(
+            subject,
+            message,
+            from_email,
+            recipient_list,
+            fail_silently=fail_silently,
+            html_message=html_message,
+        )
+
+    aiosmtplib = import_aiosmtplib()
+    mail = EmailMultiAlternatives(subject, message, from_email, recipient_list)
+    if html_message:
+        mail.attach_alternative(html_message, "text/html")
+    try:
+        await aiosmtplib.send(
+            mail.message(),
+            sender=mail.from_email,
+            recipients=mail.recipients(),
+            hostname=settings.EMAIL_HOST,
+            port=settings.EMAIL_PORT,
+            username=settings.EMAIL_HOST_USER or None,
+            password=settings.EMAIL_HOST_PASSWORD or None,
+            use_tls=settings.EMAIL_USE_SSL,
+            start_tls=settings.EMAIL_USE_TLS,
+            timeout=settings.EMAIL_TIMEOUT,
+        )
+    except (aiosmtplib.SMTPException, OSError) as e:
+        if fail_silently:
+            return 0
+        raise SMTPException(str(e)) from e
+    return 1
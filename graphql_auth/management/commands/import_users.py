@@ -0,0 +1,93 @@
+import json
+import os
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpRequest
+
+from ...bulk import UserImporter, read_rows
+
+
+def build_request(domain, secure=False):
+    request = HttpRequest()
+    host, _, port = domain.partition(":")
+    request.META["SERVER_NAME"] = host
+    request.META["SERVER_PORT"] = port or ("443" if secure else "80")
+    if secure:
+        request.META["wsgi.url_scheme"] = "https"
+        request.is_secure = lambda: True
+    return request
+
+
+class Command(BaseCommand):
+    help = "Imports users from a CSV or JSON lines file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSON lines file")
+        parser.add_argument(
+            "--format",
+            choices=["csv", "jsonl"],
+            help="File format, guessed from the extension by default",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--hash-workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Processes used to hash passwords, 1 hashes in this process",
+        )
+        parser.add_argument(
+            "--verified", action="store_true", help="Mark the users as verified"
+        )
+        parser.add_argument(
+            "--validate-passwords",
+            action="store_true",
+            help="Run AUTH_PASSWORD_VALIDATORS on the imported passwords",
+        )
+        parser.add_argument(
+            "--send-activation-email",
+            action="store_true",
+            help="Send activation emails, requires --domain",
+        )
+        parser.add_argument(
+            "--domain", help="Domain used on the emails, must be in ALLOWED_HOSTS"
+        )
+        parser.add_argument("--https", action="store_true")
+
+    def handle(self, path, **options):
+        file_format = options["format"]
+        if file_format is None:
+            file_format = "jsonl" if path.endswith((".jsonl", ".ndjson")) else "csv"
+
+        info = None
+        if options["send_activation_email"]:
+            if not options["domain"]:
+                raise CommandError("--send-activation-email requires --domain")
+            info = SimpleNamespace(
+                context=build_request(options["domain"], options["https"])
+            )
+
+        importer = UserImporter(
+            batch_size=options["batch_size"],
+            hash_workers=options["hash_workers"],
+            verified=options["verified"],
+            validate_passwords=options["validate_passwords"],
+            send_activation_email=options["send_activation_email"],
+            info=info,
+        )
+
+        created = failed = 0
+        with open(path, newline="") as file:
+            for result in importer.iter_chunks(read_rows(file, file_format)):
+                created += result.created
+                failed += len(result.errors)
+                for line, errors in result.errors:
+                    errors = json.dumps(errors, default=str)
+                    self.stderr.write("line %s: %s" % (line, errors))
+                self.stdout.write("%s users created, %s failed" % (created, failed))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Successfully imported %s users (%s failed)" % (created, failed)
+            )
+        )
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+
+from ...refresh_tokens import RefreshTokenPruner
+
+
+class Command(BaseCommand):
+    help = "Deletes the expired and revoked refresh tokens"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--revoked-days",
+            type=int,
+            default=0,
+            help="Keep the tokens revoked less than this many days ago",
+        )
+        parser.add_argument(
+            "--keep-revoked",
+            action="store_true",
+            help="Do not delete the revoked tokens",
+        )
+        parser.add_argument(
+            "--max-sessions",
+            type=int,
+            help="Revoke the live tokens of each user but the newest ones",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches",
+        )
+
+    def handle(self, **options):
+        pruner = RefreshTokenPruner(
+            batch_size=options["batch_size"],
+            revoked_days=None if options["keep_revoked"] else options["revoked_days"],
+            max_sessions=options["max_sessions"],
+            sleep=options["sleep"],
+        )
+
+        counts = {}
+        for kind, count in pruner.iter_prune():
+            counts[kind] = counts.get(kind, 0) + count
+            if options["verbosity"] > 1:
+                self.stdout.write("%s %s tokens" % (counts[kind], kind))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Successfully pruned %s expired and %s revoked tokens, "
+                "revoked %s sessions"
+                % (
+                    counts.get("expired", 0),
+                    counts.get("revoked", 0),
+                    counts.get("sessions", 0),
+                )
+            )
+        )
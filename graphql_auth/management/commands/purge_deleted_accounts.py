@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from ...deletion import AccountPurger
+
+
+class Command(BaseCommand):
+    help = "Deletes the accounts waiting for a deferred deletion"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Related rows deleted per transaction",
+        )
+        parser.add_argument(
+            "--limit", type=int, help="Maximum number of accounts to purge"
+        )
+
+    def handle(self, **options):
+        purger = AccountPurger(batch_size=options["batch_size"])
+        users = purger.pending()
+        if options["limit"] is not None:
+            users = users[: options["limit"]]
+
+        accounts = rows = user_rows = 0
+        for progress in purger.iter_purge(users):
+            rows += progress.deleted
+            user_rows += progress.deleted
+            if progress.done:
+                accounts += 1
+                self.stdout.write(
+                    "user %s purged, %s rows deleted" % (progress.user_pk, user_rows)
+                )
+                user_rows = 0
+            elif options["verbosity"] > 1:
+                self.stdout.write(
+                    "user %s: %s %s rows deleted"
+                    % (progress.user_pk, progress.deleted, progress.model)
+                )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Successfully purged %s accounts (%s rows)" % (accounts, rows)
+            )
+        )
@@ -0,0 +1,71 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...deletion import StaleAccountPurger
+
+
+class Command(BaseCommand):
+    help = "Deletes or anonymizes the long unverified and archived accounts"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--unverified-days",
+            type=int,
+            help="Process the accounts not verified this many days after joining",
+        )
+        parser.add_argument(
+            "--archived-days",
+            type=int,
+            help="Process the archived accounts not logged in for this many days",
+        )
+        parser.add_argument(
+            "--anonymize",
+            action="store_true",
+            help="Anonymize and deactivate the accounts instead of deleting them",
+        )
+        parser.add_argument(
+            "--include-staff",
+            action="store_true",
+            help="Process the staff and superuser accounts too",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0,
+            help="Seconds to wait between batches",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the number of accounts to process",
+        )
+
+    def handle(self, **options):
+        if options["unverified_days"] is None and options["archived_days"] is None:
+            raise CommandError("Give --unverified-days, --archived-days or both")
+
+        purger = StaleAccountPurger(
+            unverified_days=options["unverified_days"],
+            archived_days=options["archived_days"],
+            anonymize=options["anonymize"],
+            batch_size=options["batch_size"],
+            sleep=options["sleep"],
+            include_staff=options["include_staff"],
+        )
+        action = "anonymized" if options["anonymize"] else "deleted"
+
+        if options["dry_run"]:
+            for kind, count in purger.report().items():
+                self.stdout.write(
+                    "%s %s accounts would be %s" % (count, kind, action)
+                )
+            return
+
+        processed = 0
+        for size in purger.iter_batches():
+            processed += size
+            self.stdout.write("%s accounts %s" % (processed, action))
+
+        self.stdout.write(
+            self.style.SUCCESS("Successfully %s %s accounts" % (action, processed))
+        )
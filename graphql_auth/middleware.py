@@ -0,0 +1,73 @@
+"""
+Request level JWT authentication.
+
+The graphene middleware of graphql_jwt runs on every resolved field,
+this one decodes the token once per HTTP request, and only when
+`request.user` is used:
+
+MIDDLEWARE = [
+    # ...
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "graphql_auth.middleware.JSONWebTokenMiddleware",
+]
+
+`graphql_jwt.middleware.JSONWebTokenMiddleware` can then be removed
+from `GRAPHENE["MIDDLEWARE"]`, unless the token is also sent as an
+argument (`JWT_ALLOW_ARGUMENT`).
+"""
+
+from django.contrib.auth.models import AnonymousUser
+from django.utils.functional import SimpleLazyObject
+from graphql_jwt.exceptions import JSONWebTokenError
+from graphql_jwt.utils import get_http_authorization, get_payload, get_user_by_payload
+
+from .claims import get_user_status
+from .settings import graphql_auth_settings as app_settings
+
+REQUEST_AUTHENTICATED = "_graphql_auth_authenticated"
+
+
+def authenticate_request(request):
+    """
+    mark the request as authenticated and, if it has a token in its
+    header or cookie, make `request.user` lazy: the token is decoded
+    and its user loaded on first access, unless already logged in
+    """
+    setattr(request, REQUEST_AUTHENTICATED, True)
+    token = get_http_authorization(request)
+    if token is None:
+        return
+    user = getattr(request, "user", None)
+    request.user = SimpleLazyObject(lambda: get_token_user(request, token, user))
+
+
+def get_token_user(request, token, user=None):
+    """
+    the user of `token`, or `user` if it is already logged in
+    or the token is not valid
+    """
+    if user is not None and not user.is_anonymous:
+        return user
+
+    try:
+        payload = get_payload(token, request)
+        token_user = get_user_by_payload(payload)
+    except JSONWebTokenError:
+        token_user = None
+    if token_user is None:
+        return user if user is not None else AnonymousUser()
+
+    request._jwt_payload = payload
+    if app_settings.JWT_STATUS_CLAIMS:
+        # the status read from the claims is kept on the request
+        get_user_status(token_user, request)
+    return token_user
+
+
+class JSONWebTokenMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        authenticate_request(request)
+        return self.get_response(request)
@@ -0,0 +1,29 @@
+# Generated by Django 3.2.13 on 2026-10-19 00:50
+
+from django.db import migrations
+from django.db.models import F
+import graphql_auth.models
+
+FLAG_FIELDS = {"verified": 1, "archived": 2, "blocked": 4}
+
+
+def pack_flags(apps, schema_editor):
+    UserStatus = apps.get_model("graphql_auth", "UserStatus")
+    for name, flag in FLAG_FIELDS.items():
+        UserStatus.objects.filter(**{name: True}).update(flags=F("flags") + flag)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphql_auth', '0002_userstatus_blocked'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstatus',
+            name='flags',
+            field=graphql_auth.models.StatusFlagsField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(pack_flags, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.13 on 2026-10-19 00:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphql_auth', '0003_userstatus_flags'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstatus',
+            name='version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
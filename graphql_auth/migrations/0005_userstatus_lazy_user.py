@@ -0,0 +1,22 @@
+# Generated by Django 3.2.13 on 2026-10-19 00:54
+
+from django.conf import settings
+from django.db import migrations
+import django.db.models.deletion
+import graphql_auth.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('graphql_auth', '0004_userstatus_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userstatus',
+            name='user',
+            field=graphql_auth.models.UserStatusField(on_delete=django.db.models.deletion.CASCADE, related_name='status', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
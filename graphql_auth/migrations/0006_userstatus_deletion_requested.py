@@ -0,0 +1,18 @@
+# Generated by Django 3.2.13 on 2026-10-19 07:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('graphql_auth', '0005_userstatus_lazy_user'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userstatus',
+            name='deletion_requested',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
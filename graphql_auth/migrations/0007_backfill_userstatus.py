@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.db import migrations
+
+BATCH_SIZE = 1000
+
+
+def backfill_statuses(apps, schema_editor):
+    """
+    insert the missing statuses of the users created while they were
+    only made on first access
+    """
+    user_model = apps.get_model(settings.AUTH_USER_MODEL)
+    status_model = apps.get_model("graphql_auth", "UserStatus")
+    db = schema_editor.connection.alias
+    missing = (
+        user_model._base_manager.using(db)
+        .filter(status__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    while True:
+        pks = list(missing[:BATCH_SIZE])
+        if not pks:
+            return
+        status_model._base_manager.using(db).bulk_create(
+            [status_model(user_id=pk) for pk in pks], ignore_conflicts=True
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('graphql_auth', '0006_userstatus_deletion_requested'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_statuses, migrations.RunPython.noop),
+    ]
@@ -1,19 +1,20 @@
+import logging
 from smtplib import SMTPException
 
 import graphene
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import SetPasswordForm, PasswordChangeForm
+from django.contrib.auth.forms import SetPasswordForm
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.signing import BadSignature, SignatureExpired
 from django.db import transaction
-from django.utils.module_loading import import_string
-from graphql_jwt.decorators import token_auth
+from django.forms.models import model_to_dict
 from graphql_jwt.exceptions import JSONWebTokenError, JSONWebTokenExpired
 
 from graphql_auth import providers
-from .bases import Output
+from .bases import Output, JSONWebTokenFieldsMixin
 from .constants import Messages, TokenAction
 from .decorators import (
+    token_issue,
     password_confirmation_required,
     verification_required,
     secondary_email_required,
@@ -30,18 +31,24 @@ from .exceptions import (
     PasswordAlreadySetError,
     RecaptchaFailedError
 )
-from .forms import RegisterForm, EmailForm, UpdateAccountForm, PasswordLessRegisterForm
+from .availability import forget, is_available
+from .forms import EmailForm, LazyForm, get_register_validator, without_unique_checks
+from .instrumentation import span
+from .mail import get_async_email_func
 from .models import UserStatus
 from .settings import graphql_auth_settings as app_settings
 from .shortcuts import get_user_by_email, get_user_to_login, get_user_by_id
 from .signals import user_registered, user_verified
-from .utils import revoke_user_refresh_token, get_token_payload, using_refresh_tokens
+from .utils import (
+    can_authenticate,
+    revoke_user_refresh_token,
+    get_token_payload,
+    using_refresh_tokens,
+)
 
 UserModel = get_user_model()
-if app_settings.EMAIL_ASYNC_TASK and isinstance(app_settings.EMAIL_ASYNC_TASK, str):
-    async_email_func = import_string(app_settings.EMAIL_ASYNC_TASK)
-else:
-    async_email_func = None
+
+logger = logging.getLogger(__name__)
 
 
 class RegisterMixin(Output):
@@ -66,71 +73,122 @@ class RegisterMixin(Output):
     If allowed to not verified users login, return token.
     """
 
-    form = (
-        PasswordLessRegisterForm
+    form = LazyForm(
+        lambda: "PasswordLessRegisterForm"
         if app_settings.ALLOW_PASSWORDLESS_REGISTRATION
-        else RegisterForm
+        else "RegisterForm"
     )
 
     @classmethod
-    def Field(cls, *args, **kwargs):
+    def __init_subclass_with_meta__(cls, **options):
         if app_settings.ALLOW_LOGIN_NOT_VERIFIED:
             if using_refresh_tokens():
-                cls._meta.fields["refresh_token"] = graphene.Field(graphene.String)
-            cls._meta.fields["token"] = graphene.Field(graphene.String)
-        return super().Field(*args, **kwargs)
+                cls.refresh_token = graphene.Field(graphene.String)
+            cls.token = graphene.Field(graphene.String)
+        super().__init_subclass_with_meta__(**options)
 
     @classmethod
-    @token_auth
+    @token_issue
     def login_on_register(cls, root, info, **kwargs):
         return cls()
 
+    @classmethod
+    def get_form(cls, data):
+        if app_settings.REGISTER_FAST_VALIDATION:
+            return get_register_validator(
+                cls.form, app_settings.ALLOW_PASSWORDLESS_REGISTRATION
+            )(data)
+        return cls.form(data)
+
+    @classmethod
+    def create_user(cls, form, email, password=None):
+        """
+        `password` is `password1` already hashed, e.g. in a worker
+        thread by the async mutation, the form does not hash it again
+        """
+        with span(cls, "create_user"):
+            UserStatus.clean_email(email)
+            if password is None:
+                user = form.save()
+            else:
+                raw_password = form.cleaned_data["password1"]
+                # set_password(None) makes an unusable password, unhashed
+                form.cleaned_data["password1"] = None
+                user = form.save(commit=False)
+                user.password, user._password = password, raw_password
+                user.save()
+            forget(user)
+        return user
+
+    @classmethod
+    def registration_emails(cls, email):
+        """
+        names of the `UserStatus` methods sending the registration emails
+        """
+        emails = []
+        if app_settings.SEND_ACTIVATION_EMAIL is True and email:
+            emails.append("send_activation_email")
+        if (
+                app_settings.ALLOW_PASSWORDLESS_REGISTRATION is True
+                and app_settings.SEND_PASSWORD_SET_EMAIL is True
+                and email
+        ):
+            emails.append("send_password_set_email")
+        return emails
+
+    @classmethod
+    def registered(cls, root, info, user, **kwargs):
+        if app_settings.ALLOW_LOGIN_NOT_VERIFIED:
+            with span(cls, "login"):
+                payload = cls.login_on_register(root, info, user=user)
+            return_value = {}
+            for field in cls._meta.fields:
+                return_value[field] = getattr(payload, field)
+            return cls(**return_value)
+        return cls(success=True)
+
+    @classmethod
+    def send_registration_emails(cls, info, user, email):
+        """
+        send the `user_registered` signal and the registration emails,
+        called once the user is committed
+        """
+        user_registered.send(sender=cls, user=user)
+        async_email_func = get_async_email_func()
+        for method in cls.registration_emails(email):
+            with span(cls, "email"):
+                if async_email_func:
+                    async_email_func(getattr(user.status, method), (info,))
+                else:
+                    getattr(user.status, method)(info)
+
     @classmethod
     def resolve_mutation(cls, root, info, **kwargs):
+        """
+        the emails are sent on commit, outside of the transaction.
+        With no outer transaction that is before returning, and a
+        failure returns `EMAIL_FAIL` but keeps the user, otherwise
+        it is only logged
+        """
+        email_failed = []
+
+        def on_commit(user, email):
+            try:
+                cls.send_registration_emails(info, user, email)
+            except SMTPException:
+                logger.exception("Failed to send the registration emails")
+                email_failed.append(email)
+
         try:
             with transaction.atomic():
-                f = cls.form(kwargs)
-                if f.is_valid():
-                    email = kwargs.get(UserModel.EMAIL_FIELD, False)
-                    UserStatus.clean_email(email)
-                    user = f.save()
-                    send_activation = (
-                            app_settings.SEND_ACTIVATION_EMAIL is True and email
-                    )
-                    send_password_set = (
-                            app_settings.ALLOW_PASSWORDLESS_REGISTRATION is True
-                            and app_settings.SEND_PASSWORD_SET_EMAIL is True
-                            and email
-                    )
-                    if send_activation:
-                        # TODO CHECK FOR EMAIL ASYNC SETTING
-                        if async_email_func:
-                            async_email_func(user.status.send_activation_email, (info,))
-                        else:
-                            user.status.send_activation_email(info)
-
-                    if send_password_set:
-                        # TODO CHECK FOR EMAIL ASYNC SETTING
-                        if async_email_func:
-                            async_email_func(
-                                user.status.send_password_set_email, (info,)
-                            )
-                        else:
-                            user.status.send_password_set_email(info)
-
-                    user_registered.send(sender=cls, user=user)
-
-                    if app_settings.ALLOW_LOGIN_NOT_VERIFIED:
-                        payload = cls.login_on_register(
-                            root, info, password=kwargs.get("password1"), **kwargs
-                        )
-                        return_value = {}
-                        for field in cls._meta.fields:
-                            return_value[field] = getattr(payload, field)
-                        return cls(**return_value)
-                    return cls(success=True)
-                else:
+                f = cls.get_form(kwargs)
+                with span(cls, "form_validation"):
+                    valid = f.is_valid()
+                if not valid:
                     return cls(success=False, errors=f.errors.get_json_data())
+                email = kwargs.get(UserModel.EMAIL_FIELD, False)
+                user = cls.create_user(f, email)
+                transaction.on_commit(lambda: on_commit(user, email))
         except EmailAlreadyInUse:
             return cls(
                 success=False,
@@ -139,8 +197,49 @@ class RegisterMixin(Output):
                 # so we need to run UserStatus.clean_email(email)
                 errors={UserModel.EMAIL_FIELD: Messages.EMAIL_IN_USE},
             )
-        except SMTPException:
+        if email_failed:
             return cls(success=False, errors=Messages.EMAIL_FAIL)
+        return cls.registered(root, info, user, **kwargs)
+
+
+class ValidateRegistrationMixin(Output):
+    """
+    Check registration fields without registering.
+
+    Run the register validations on the given fields only,
+    e.g. while the user fills the signup form: the fields
+    and password validators, and if the username and email
+    are free. Nothing is hashed nor saved.
+
+    The username and email availability is cached for
+    a few seconds, see `AVAILABILITY_CACHE_TIMEOUT`.
+    """
+
+    form = LazyForm(lambda: RegisterMixin.form.__name__)
+
+    @classmethod
+    def resolve_mutation(cls, root, info, **kwargs):
+        f = without_unique_checks(cls.form)(kwargs)
+        with span(cls, "form_validation"):
+            f.is_valid()
+        # only report the errors of the given fields, not missing ones
+        errors = {
+            field: field_errors
+            for field, field_errors in f.errors.get_json_data().items()
+            if field in kwargs
+        }
+        for field, message in (
+            (UserModel.USERNAME_FIELD, Messages.USERNAME_IN_USE),
+            (UserModel.EMAIL_FIELD, Messages.EMAIL_IN_USE),
+        ):
+            value = f.cleaned_data.get(field)
+            if field in kwargs and value and field not in errors:
+                with span(cls, "availability"):
+                    if not is_available(field, value):
+                        errors[field] = message
+        if errors:
+            return cls(success=False, errors=errors)
+        return cls(success=True)
 
 
 class VerifyAccountMixin(Output):
@@ -217,11 +316,14 @@ class ResendActivationEmailMixin(Output):
             email = kwargs.get("email")
             f = EmailForm({"email": email})
             if f.is_valid():
-                user = get_user_by_email(email)
-                if async_email_func:
-                    async_email_func(user.status.resend_activation_email, (info,))
-                else:
-                    user.status.resend_activation_email(info)
+                with span(cls, "user_lookup"):
+                    user = get_user_by_email(email)
+                with span(cls, "email"):
+                    async_email_func = get_async_email_func()
+                    if async_email_func:
+                        async_email_func(user.status.resend_activation_email, (info,))
+                    else:
+                        user.status.resend_activation_email(info)
                 return cls(success=True)
             return cls(success=False, errors=f.errors.get_json_data())
         except ObjectDoesNotExist:
@@ -251,13 +353,16 @@ class SendPasswordResetEmailMixin(Output):
             email = kwargs.get("email")
             f = EmailForm({"email": email})
             if f.is_valid():
-                user = get_user_by_email(email)
-                if async_email_func:
-                    async_email_func(
-                        user.status.send_password_reset_email, (info, [email])
-                    )
-                else:
-                    user.status.send_password_reset_email(info, [email])
+                with span(cls, "user_lookup"):
+                    user = get_user_by_email(email)
+                with span(cls, "email"):
+                    async_email_func = get_async_email_func()
+                    if async_email_func:
+                        async_email_func(
+                            user.status.send_password_reset_email, (info, [email])
+                        )
+                    else:
+                        user.status.send_password_reset_email(info, [email])
                 return cls(success=True)
             return cls(success=False, errors=f.errors.get_json_data())
         except ObjectDoesNotExist:
@@ -267,6 +372,7 @@ class SendPasswordResetEmailMixin(Output):
         except UserNotVerified:
             user = get_user_by_email(email)
             try:
+                async_email_func = get_async_email_func()
                 if async_email_func:
                     async_email_func(user.status.resend_activation_email, (info,))
                 else:
@@ -300,24 +406,30 @@ class PasswordResetMixin(Output):
             token = kwargs.pop("token")
             password1 = kwargs.get('new_password1')
 
-            payload = get_token_payload(
-                token,
-                TokenAction.PASSWORD_RESET,
-                app_settings.EXPIRATION_PASSWORD_RESET_TOKEN,
-            )
-            user = UserModel._default_manager.get(**payload)
+            with span(cls, "user_lookup"):
+                payload = get_token_payload(
+                    token,
+                    TokenAction.PASSWORD_RESET,
+                    app_settings.EXPIRATION_PASSWORD_RESET_TOKEN,
+                )
+                user = UserModel._default_manager.get(**payload)
 
             if user.status.blocked is True:
                 raise UserBlocked
 
             f = cls.form(user, kwargs)
-            if f.is_valid():
+            with span(cls, "form_validation"):
+                valid = f.is_valid()
+            if valid:
 
-                if user.check_password(password1):
-                    raise PasswordAlreadySetError
+                with span(cls, "check_password"):
+                    if user.check_password(password1):
+                        raise PasswordAlreadySetError
 
-                revoke_user_refresh_token(user)
-                user = f.save()
+                with span(cls, "revoke_tokens"):
+                    revoke_user_refresh_token(user)
+                with span(cls, "save"):
+                    user = f.save()
 
                 if user.status.verified is False:
                     user.status.verified = True
@@ -355,19 +467,24 @@ class PasswordSetMixin(Output):
     def resolve_mutation(cls, root, info, **kwargs):
         try:
             token = kwargs.pop("token")
-            payload = get_token_payload(
-                token,
-                TokenAction.PASSWORD_SET,
-                app_settings.EXPIRATION_PASSWORD_SET_TOKEN,
-            )
-            user = UserModel._default_manager.get(**payload)
+            with span(cls, "user_lookup"):
+                payload = get_token_payload(
+                    token,
+                    TokenAction.PASSWORD_SET,
+                    app_settings.EXPIRATION_PASSWORD_SET_TOKEN,
+                )
+                user = UserModel._default_manager.get(**payload)
             f = cls.form(user, kwargs)
-            if f.is_valid():
+            with span(cls, "form_validation"):
+                valid = f.is_valid()
+            if valid:
                 # Check if user has already set a password
                 if user.has_usable_password():
                     raise PasswordAlreadySetError
-                revoke_user_refresh_token(user)
-                user = f.save()
+                with span(cls, "revoke_tokens"):
+                    revoke_user_refresh_token(user)
+                with span(cls, "save"):
+                    user = f.save()
 
                 if user.status.verified is False:
                     user.status.verified = True
@@ -383,7 +500,7 @@ class PasswordSetMixin(Output):
             return cls(success=False, errors=Messages.PASSWORD_ALREADY_SET)
 
 
-class ObtainJSONWebTokenMixin(Output):
+class ObtainJSONWebTokenMixin(JSONWebTokenFieldsMixin, Output):
     """
     Obtain JSON web token for given user.
 
@@ -398,81 +515,144 @@ class ObtainJSONWebTokenMixin(Output):
     return `unarchiving=True` on output.
     """
 
+    # login arguments, built by DynamicArgsMixin or DynamicInputMixin
+    _args = _inputs = app_settings.login_arguments
+    _required_args = _required_inputs = ["password"] + (
+        ["recaptcha_token"] if app_settings.LOGIN_REQUIRE_RECAPTCHA is True else []
+    )
+
+    login_errors = (
+        JSONWebTokenError,
+        ObjectDoesNotExist,
+        InvalidCredentials,
+        UserNotVerified,
+        UserBlocked,
+        RecaptchaFailedError,
+    )
+
     @classmethod
     def resolve(cls, root, info, **kwargs):
         unarchiving = kwargs.get("unarchiving", False)
         return cls(user=info.context.user, unarchiving=unarchiving)
 
     @classmethod
-    def resolve_mutation(cls, root, info, **kwargs):
-        if not any(field in kwargs for field in app_settings.LOGIN_ALLOWED_FIELDS):
+    @token_issue
+    def login_checked(cls, root, info, **kwargs):
+        return cls.resolve(root, info, **kwargs)
+
+    @classmethod
+    def can_authenticate(cls, user):
+        """
+        `ModelBackend.authenticate` once the password is checked
+        """
+        return can_authenticate(user)
+
+    @classmethod
+    def get_login_user(cls, kwargs):
+        """
+        return the user, its password and the kwargs to pass to `parent_resolve`
+        """
+        if app_settings.login_fields.isdisjoint(kwargs):
             raise WrongUsage(
                 "Must login with password and one of the following fields %s."
                 % (app_settings.LOGIN_ALLOWED_FIELDS)
             )
 
-        try:
-            next_kwargs = None
-            USERNAME_FIELD = UserModel.USERNAME_FIELD
-            unarchiving = False
-
-            # extract USERNAME_FIELD to use in query
-            if USERNAME_FIELD in kwargs:
-                query_kwargs = {USERNAME_FIELD: kwargs[USERNAME_FIELD]}
-                next_kwargs = kwargs
-                password = kwargs.get("password")
-            else:  # use what is left to query
-                password = kwargs.pop("password")
-                query_field, query_value = kwargs.popitem()
-                query_kwargs = {query_field: query_value}
+        next_kwargs = None
+        USERNAME_FIELD = UserModel.USERNAME_FIELD
 
-            user = get_user_to_login(**query_kwargs)
+        # extract USERNAME_FIELD to use in query
+        if USERNAME_FIELD in kwargs:
+            query_kwargs = {USERNAME_FIELD: kwargs[USERNAME_FIELD]}
+            next_kwargs = kwargs
+            password = kwargs.get("password")
+        else:  # use what is left to query
+            password = kwargs.pop("password")
+            query_field, query_value = kwargs.popitem()
+            query_kwargs = {query_field: query_value}
 
-            if app_settings.LOGIN_REQUIRE_RECAPTCHA is True:
-                recaptcha_token = kwargs.get('recaptcha_token')
-
-                res = providers.validate_recaptcha(recaptcha_token)
+        with span(cls, "user_lookup"):
+            user = get_user_to_login(**query_kwargs)
 
-                if res.get('success', False) is False:
-                    raise RecaptchaFailedError
-                if app_settings.RECAPTCHA_MIN_SCORE is None:
-                    raise WrongUsage(
-                        "RECAPTCHA_MIN_SCORE must be provided while using LOGIN_REQUIRE_RECAPTCHA"
-                    )
-                if res.get('score', 0) < app_settings.RECAPTCHA_MIN_SCORE:
-                    raise RecaptchaFailedError
+        if not next_kwargs:
+            next_kwargs = {
+                "password": password,
+                USERNAME_FIELD: getattr(user, USERNAME_FIELD),
+            }
+        return user, password, next_kwargs
 
-            if not next_kwargs:
-                next_kwargs = {
-                    "password": password,
-                    USERNAME_FIELD: getattr(user, USERNAME_FIELD),
-                }
+    @classmethod
+    def check_recaptcha(cls, res):
+        if res.get('success', False) is False:
+            raise RecaptchaFailedError
+        if res.get('score', 0) < app_settings.RECAPTCHA_MIN_SCORE:
+            raise RecaptchaFailedError
 
+    @classmethod
+    def login(cls, root, info, user, password, next_kwargs, password_valid=None):
+        """
+        `password_valid` is the result of checking `password` beforehand,
+        the token is then issued without authenticating again
+        """
+        unarchiving = False
+        with span(cls, "status"):
             if user.status.archived is True:  # unarchive on login
                 UserStatus.unarchive(user)
                 unarchiving = True
 
-            if (user.status.verified or app_settings.ALLOW_LOGIN_NOT_VERIFIED) and user.status.blocked is False:
-                return cls.parent_resolve(
-                    root, info, unarchiving=unarchiving, **next_kwargs
-                )
+        if (user.status.verified or app_settings.ALLOW_LOGIN_NOT_VERIFIED) and user.status.blocked is False:
+            # password hashing and token issuing,
+            # the refresh token is created when serialized
+            if password_valid is None:
+                with span(cls, "authenticate"):
+                    return cls.parent_resolve(
+                        root, info, unarchiving=unarchiving, **next_kwargs
+                    )
+            if password_valid and cls.can_authenticate(user):
+                with span(cls, "authenticate"):
+                    return cls.login_checked(
+                        root, info, user=user, unarchiving=unarchiving
+                    )
+            raise InvalidCredentials
 
-            if user.check_password(password):
-                if app_settings.ALLOW_LOGIN_NOT_VERIFIED is False and user.status.verified is False:
-                    raise UserNotVerified
-                if user.status.blocked is True:
-                    raise UserBlocked
+        if password_valid is None:
+            with span(cls, "check_password"):
+                password_valid = user.check_password(password)
+        if password_valid:
+            if app_settings.ALLOW_LOGIN_NOT_VERIFIED is False and user.status.verified is False:
+                raise UserNotVerified
+            if user.status.blocked is True:
+                raise UserBlocked
 
-            raise InvalidCredentials
-        except (JSONWebTokenError, ObjectDoesNotExist, InvalidCredentials):
-            # adding token and refresh_token blank fields because django-graphql-jwt==0.3.4 made this fields required
-            return cls(success=False, token='', refresh_token='', errors=Messages.INVALID_CREDENTIALS)
-        except UserNotVerified:
-            return cls(success=False, token='', refresh_token='', errors=Messages.NOT_VERIFIED)
-        except UserBlocked:
-            return cls(success=False, token='', refresh_token='', errors=Messages.BLOCKED)
-        except RecaptchaFailedError:
-            return cls(success=False, token='', refresh_token='', errors=Messages.RECAPTCHA_FAILED)
+        raise InvalidCredentials
+
+    @classmethod
+    def login_failed(cls, error):
+        if isinstance(error, UserNotVerified):
+            errors = Messages.NOT_VERIFIED
+        elif isinstance(error, UserBlocked):
+            errors = Messages.BLOCKED
+        elif isinstance(error, RecaptchaFailedError):
+            errors = Messages.RECAPTCHA_FAILED
+        else:
+            errors = Messages.INVALID_CREDENTIALS
+        # adding token and refresh_token blank fields because django-graphql-jwt==0.3.4 made this fields required
+        return cls(success=False, token='', refresh_token='', errors=errors)
+
+    @classmethod
+    def resolve_mutation(cls, root, info, **kwargs):
+        try:
+            user, password, next_kwargs = cls.get_login_user(kwargs)
+
+            if app_settings.LOGIN_REQUIRE_RECAPTCHA is True:
+                recaptcha_token = kwargs.get('recaptcha_token')
+                with span(cls, "recaptcha"):
+                    res = providers.validate_recaptcha(recaptcha_token)
+                cls.check_recaptcha(res)
+
+            return cls.login(root, info, user, password, next_kwargs)
+        except cls.login_errors as error:
+            return cls.login_failed(error)
 
 
 class ArchiveOrDeleteMixin(Output):
@@ -505,12 +685,21 @@ class DeleteAccountMixin(ArchiveOrDeleteMixin):
     The behavior is defined on settings.
     Anyway user refresh tokens are revoked.
 
+    With deferred deletion the account is deactivated right away
+    and deleted later by the `purge_deleted_accounts` command.
+
     User must be verified and confirm password.
     """
 
     @classmethod
     def resolve_action(cls, user, *args, **kwargs):
-        if app_settings.ALLOW_DELETE_ACCOUNT:
+        if app_settings.ALLOW_DELETE_ACCOUNT and app_settings.DEFERRED_ACCOUNT_DELETION:
+            with transaction.atomic():
+                user.is_active = False
+                user.save(update_fields=["is_active"])
+                UserStatus.request_deletion(user)
+            revoke_user_refresh_token(user=user)
+        elif app_settings.ALLOW_DELETE_ACCOUNT:
             revoke_user_refresh_token(user=user)
             user.delete()
         else:
@@ -526,17 +715,19 @@ class PasswordChangeMixin(Output):
     A new token and refresh token are sent. User must be verified.
     """
 
-    form = PasswordChangeForm
+    # the old password is checked by password_confirmation_required,
+    # the PasswordChangeForm would hash it a second time
+    form = SetPasswordForm
 
     @classmethod
-    def Field(cls, *args, **kwargs):
+    def __init_subclass_with_meta__(cls, **options):
         if using_refresh_tokens():
-            cls._meta.fields["refresh_token"] = graphene.Field(graphene.String)
-        cls._meta.fields["token"] = graphene.Field(graphene.String)
-        return super().Field(*args, **kwargs)
+            cls.refresh_token = graphene.Field(graphene.String)
+        cls.token = graphene.Field(graphene.String)
+        super().__init_subclass_with_meta__(**options)
 
     @classmethod
-    @token_auth
+    @token_issue
     def login_on_password_change(cls, root, info, **kwargs):
         return cls()
 
@@ -550,19 +741,20 @@ class PasswordChangeMixin(Output):
         if user.status.blocked is True:
             return cls(success=False, errors=Messages.BLOCKED)
 
-        if user.check_password(new_password):
+        # the old password is confirmed, no need to hash the new one
+        if new_password == kwargs.get("old_password"):
             return cls(success=False, errors=Messages.PASSWORD_ALREADY_SET)
 
         f = cls.form(user, kwargs)
-        if f.is_valid():
-            revoke_user_refresh_token(user)
-            user = f.save()
-            payload = cls.login_on_password_change(
-                root,
-                info,
-                password=new_password,
-                **{user.USERNAME_FIELD: getattr(user, user.USERNAME_FIELD)}
-            )
+        with span(cls, "form_validation"):
+            valid = f.is_valid()
+        if valid:
+            with span(cls, "revoke_tokens"):
+                revoke_user_refresh_token(user)
+            with span(cls, "save"):
+                user = f.save()
+            with span(cls, "login"):
+                payload = cls.login_on_password_change(root, info, user=user)
             return_value = {}
             for field in cls._meta.fields:
                 return_value[field] = getattr(payload, field)
@@ -575,24 +767,33 @@ class UpdateAccountMixin(Output):
     """
     Update user model fields, defined on settings.
 
+    Only the given fields are updated, and only
+    written if they changed.
+
     User must be verified.
     """
 
-    form = UpdateAccountForm
+    form = LazyForm("UpdateAccountForm")
 
     @classmethod
     @verification_required
     def resolve_mutation(cls, root, info, **kwargs):
         user = info.context.user
-        f = cls.form(kwargs, instance=user)
-        if f.is_valid():
-            f.save()
+        # the fields not given keep their value instead of being emptied
+        data = dict(model_to_dict(user, fields=cls.form._meta.fields), **kwargs)
+        f = cls.form(data, instance=user)
+        with span(cls, "form_validation"):
+            valid = f.is_valid()
+        if valid:
+            if f.changed_data:
+                with span(cls, "save"):
+                    user.save(update_fields=f.changed_data)
             return cls(success=True)
         else:
             return cls(success=False, errors=f.errors.get_json_data())
 
 
-class RefreshTokenMixin(Output):
+class RefreshTokenMixin(JSONWebTokenFieldsMixin, Output):
     """
     Same as `grapgql_jwt` implementation, with standard output.
     """
@@ -653,12 +854,14 @@ class SendSecondaryEmailActivationMixin(Output):
             f = EmailForm({"email": email})
             if f.is_valid():
                 user = info.context.user
-                if async_email_func:
-                    async_email_func(
-                        user.status.send_secondary_email_activation, (info, email)
-                    )
-                else:
-                    user.status.send_secondary_email_activation(info, email)
+                with span(cls, "email"):
+                    async_email_func = get_async_email_func()
+                    if async_email_func:
+                        async_email_func(
+                            user.status.send_secondary_email_activation, (info, email)
+                        )
+                    else:
+                        user.status.send_secondary_email_activation(info, email)
                 return cls(success=True)
             return cls(success=False, errors=f.errors.get_json_data())
         except EmailAlreadyInUse:
@@ -1,20 +1,25 @@
 import time
 
+from asgiref.sync import sync_to_async
 from django.conf import settings as django_settings
 from django.contrib.auth import get_user_model
 from django.contrib.sites.shortcuts import get_current_site
+from django.core.cache import cache
 from django.core.mail import send_mail
 from django.db import models
 from django.db import transaction
+from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
 from django.template.loader import render_to_string
+from django.utils import timezone
 from django.utils.html import strip_tags
 
-from .constants import TokenAction
+from .constants import TokenAction, StatusFlag
 from .exceptions import (
     UserAlreadyVerified,
     EmailAlreadyInUse,
     WrongUsage,
 )
+from .mail import asend_mail
 from .settings import graphql_auth_settings as app_settings
 from .signals import user_verified
 from .utils import get_token, get_token_payload
@@ -22,12 +27,206 @@ from .utils import get_token, get_token_payload
 UserModel = get_user_model()
 
 
+class StatusFlagsField(models.PositiveSmallIntegerField):
+    """
+    Small integer column holding `StatusFlag` bits.
+
+    Supports the `has_all` and `has_any` lookups, e.g.
+    `status__flags__has_any=StatusFlag.ARCHIVED | StatusFlag.BLOCKED`.
+    """
+
+
+class FlagsLookup(models.Lookup):
+    def masked_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        sql = connection.ops.combine_expression("&", [lhs, rhs])
+        return sql, rhs, list(lhs_params) + list(rhs_params), list(rhs_params)
+
+
+@StatusFlagsField.register_lookup
+class HasAllFlags(FlagsLookup):
+    lookup_name = "has_all"
+
+    def as_sql(self, compiler, connection):
+        masked, rhs, params, rhs_params = self.masked_sql(compiler, connection)
+        return "(%s) = %s" % (masked, rhs), params + rhs_params
+
+
+@StatusFlagsField.register_lookup
+class HasAnyFlags(FlagsLookup):
+    lookup_name = "has_any"
+
+    def as_sql(self, compiler, connection):
+        masked, rhs, params, rhs_params = self.masked_sql(compiler, connection)
+        return "(%s) <> 0" % masked, params
+
+
+class LazyStatusDescriptor(ReverseOneToOneDescriptor):
+    """
+    `user.status` accessor returning a default, unsaved status when
+    the row is missing, e.g. for users made with `bulk_create`.
+    Reading does not write, the row is inserted on its first save.
+    """
+
+    def __get__(self, instance, cls=None):
+        try:
+            return super().__get__(instance, cls)
+        except self.RelatedObjectDoesNotExist:
+            if instance.pk is None:
+                raise
+        # also caches the status on the user
+        return self.related.related_model(user=instance)
+
+
+class UserStatusField(models.OneToOneField):
+    related_accessor_class = LazyStatusDescriptor
+
+
+class UserStatusQuerySet(models.QuerySet):
+    def for_user(self, user):
+        status, _ = self.get_or_create(user=user)
+        return status
+
+    def create_for_users(self, users, batch_size=None, **fields):
+        """
+        insert the statuses of many users in one statement,
+        skipping users that already have one
+        """
+        statuses = [self.model(user=user, **fields) for user in users]
+        for status in statuses:
+            status.flags = status.pack_flags()
+        return self.bulk_create(
+            statuses, batch_size=batch_size, ignore_conflicts=True
+        )
+
+    def with_flags(self, flags):
+        """
+        statuses that have all the given flags set
+        """
+        return self.filter(flags__has_all=flags)
+
+    def with_any_flags(self, flags):
+        """
+        statuses that have at least one of the given flags set
+        """
+        return self.filter(flags__has_any=flags)
+
+    def without_flags(self, flags):
+        """
+        statuses that have none of the given flags set
+        """
+        return self.exclude(flags__has_any=flags)
+
+    def pending_deletion(self):
+        """
+        statuses of the accounts waiting for `purge_deleted_accounts`,
+        oldest request first
+        """
+        return self.filter(deletion_requested__isnull=False).order_by(
+            "deletion_requested"
+        )
+
+    def update(self, **kwargs):
+        """
+        also recompute `flags` and bump `version` when a boolean flag
+        column is updated, `flags` in the same UPDATE when the new
+        values are plain booleans
+        """
+        changed = UserStatus.FLAG_FIELDS.keys() & kwargs.keys()
+        if not changed or "flags" in kwargs:
+            return super().update(**kwargs)
+        kwargs["version"] = models.F("version") + 1
+        with transaction.atomic(using=self.db):
+            statuses = list(self.values_list("pk", "user_id"))
+            if all(isinstance(kwargs[name], bool) for name in changed):
+                rows = super().update(flags=packed_flags(kwargs), **kwargs)
+            else:
+                rows = super().update(**kwargs)
+                pks = [pk for pk, _ in statuses]
+                self.model._default_manager.filter(pk__in=pks).sync_flags()
+            forget_versions(user_id for _, user_id in statuses)
+        return rows
+
+    update.alters_data = True
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = tuple(objs)
+        if not UserStatus.FLAG_FIELDS.keys() & set(fields) or "flags" in fields:
+            return super().bulk_update(objs, fields, batch_size=batch_size)
+        for obj in objs:
+            obj.flags = obj.pack_flags()
+        with transaction.atomic(using=self.db):
+            rows = super().bulk_update(
+                objs, list(fields) + ["flags"], batch_size=batch_size
+            )
+            self.model._default_manager.filter(
+                pk__in=[obj.pk for obj in objs]
+            ).update(version=models.F("version") + 1)
+            forget_versions(obj.user_id for obj in objs)
+        return rows
+
+    bulk_update.alters_data = True
+
+    def sync_flags(self):
+        """
+        recompute `flags` from the boolean columns in a single UPDATE,
+        needed after raw SQL writes to those columns, `update()` and
+        `bulk_update()` already keep it in sync.
+
+        `version` is not bumped, the status claims are packed from
+        the boolean columns, so bump it yourself after the raw SQL.
+        """
+        return self.update(flags=packed_flags({}))
+
+
+def forget_versions(user_ids):
+    """
+    drop the cached status versions once the transaction commits,
+    so that the claims of the tokens already issued are not trusted
+    """
+    if app_settings.JWT_STATUS_CLAIMS:
+        keys = [UserStatus.version_cache_key(user_id) for user_id in user_ids]
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def packed_flags(values):
+    """
+    expression packing the boolean flag columns into `flags`,
+    taking the booleans in `values` instead of their columns
+    """
+    return sum(
+        models.Value(flag if values[name] else 0)
+        if name in values
+        else models.Case(
+            models.When(**{name: True}, then=models.Value(flag)),
+            default=models.Value(0),
+            output_field=models.IntegerField(),
+        )
+        for name, flag in UserStatus.FLAG_FIELDS.items()
+    )
+
+
 class UserStatus(models.Model):
     """
     A helper model that handles user account stuff.
+
+    `verified`, `archived` and `blocked` are also packed into
+    `flags`, kept in sync on every `save` and by the queryset
+    `update` and `bulk_update`. Call `sync_flags` after writing
+    those columns with raw SQL.
+
+    `version` is bumped by the database whenever a flag column is
+    written, and invalidates the status claims of issued tokens.
     """
 
-    user = models.OneToOneField(
+    FLAG_FIELDS = {
+        "verified": StatusFlag.VERIFIED,
+        "archived": StatusFlag.ARCHIVED,
+        "blocked": StatusFlag.BLOCKED,
+    }
+
+    user = UserStatusField(
         django_settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="status"
     )
     verified = models.BooleanField(default=False)
@@ -36,25 +235,129 @@ class UserStatus(models.Model):
 
     blocked = models.BooleanField(default=False)
 
+    # set by DeleteAccount with DEFERRED_ACCOUNT_DELETION,
+    # the account is removed later by purge_deleted_accounts
+    deletion_requested = models.DateTimeField(blank=True, null=True, db_index=True)
+
+    flags = StatusFlagsField(default=0, db_index=True, editable=False)
+    version = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = UserStatusQuerySet.as_manager()
+
     def __str__(self):
         return "%s - status" % (self.user)
 
-    def send(self, subject, template, context, recipient_list=None):
+    def save(self, *args, **kwargs):
+        if self._state.adding or self.pk is None:
+            # the default status of `user.status` is inserted whole
+            kwargs.pop("update_fields", None)
+            self.flags = self.pack_flags()
+            self.version += 1
+            super().save(*args, **kwargs)
+        else:
+            update_fields = kwargs.get("update_fields")
+            changed = (
+                self.FLAG_FIELDS.keys()
+                if update_fields is None
+                else self.FLAG_FIELDS.keys() & set(update_fields)
+            )
+            if not changed:
+                return super().save(*args, **kwargs)
+            # computed by the database, so that a stale instance
+            # neither overwrites the other flags nor reuses a version
+            self.flags = packed_flags({name: getattr(self, name) for name in changed})
+            self.version = models.F("version") + 1
+            if update_fields is not None:
+                kwargs["update_fields"] = set(update_fields) | {"flags", "version"}
+            super().save(*args, **kwargs)
+            self.flags, self.version = (
+                type(self)
+                ._base_manager.using(kwargs.get("using") or self._state.db)
+                .values_list("flags", "version")
+                .get(pk=self.pk)
+            )
+
+        if app_settings.JWT_STATUS_CLAIMS:
+            # read once committed, the callbacks of concurrent saves
+            # may run in any order but all of them cache the last version
+            user_id, using = self.user_id, kwargs.get("using") or self._state.db
+            transaction.on_commit(
+                lambda: type(self).cache_version(user_id, using), using=using
+            )
+
+    @staticmethod
+    def version_cache_key(user_pk):
+        return "graphql_auth:status_version:%s" % user_pk
+
+    @classmethod
+    def cache_version(cls, user_pk, using=None, replace=True):
+        """
+        read the committed `version` of the status of `user_pk` from the
+        database, cache and return it, `replace=False` keeps a version
+        cached meanwhile
+        """
+        version = (
+            cls._base_manager.using(using)
+            .filter(user_id=user_pk)
+            .values_list("version", flat=True)
+            .first()
+        )
+        if version is not None:
+            key = cls.version_cache_key(user_pk)
+            if replace:
+                cache.set(key, version)
+            else:
+                cache.add(key, version)
+        return version
+
+    def pack_flags(self):
+        return sum(
+            flag for name, flag in self.FLAG_FIELDS.items() if getattr(self, name)
+        )
+
+    def has_flags(self, flags):
+        return self.pack_flags() & flags == flags
+
+    def has_any_flags(self, flags):
+        return bool(self.pack_flags() & flags)
+
+    def render_email(self, subject, template, context, recipient_list=None):
+        """
+        return the `send_mail` kwargs
+        """
         _subject = render_to_string(subject, context).replace("\n", " ").strip()
         html_message = render_to_string(template, context)
         message = strip_tags(html_message)
 
-        return send_mail(
+        return dict(
             subject=_subject,
             from_email=app_settings.EMAIL_FROM,
             message=message,
             html_message=html_message,
             recipient_list=(
-                    recipient_list or [getattr(self.user, UserModel.EMAIL_FIELD)]
+                recipient_list or [getattr(self.user, UserModel.EMAIL_FIELD)]
             ),
             fail_silently=False,
         )
 
+    def send(self, subject, template, context, recipient_list=None):
+        return send_mail(
+            **self.render_email(subject, template, context, recipient_list)
+        )
+
+    async def asend(self, get_email, info, *args, **kwargs):
+        """
+        async version of the `send_*` methods, `get_email` returns
+        the `send` arguments and is run in a thread with the rendering,
+        as both may query the database.
+        """
+
+        def render():
+            subject, template, context = get_email(info)
+            return self.render_email(subject, template, context, *args, **kwargs)
+
+        return await asend_mail(**await sync_to_async(render)())
+
     def get_email_context(self, info, path, action, **kwargs):
         token = get_token(self.user, action, **kwargs)
         site = get_current_site(info.context)
@@ -71,15 +374,15 @@ class UserStatus(models.Model):
             **app_settings.EMAIL_TEMPLATE_VARIABLES,
         }
 
-    def send_activation_email(self, info, *args, **kwargs):
+    def activation_email(self, info):
         email_context = self.get_email_context(
             info, app_settings.ACTIVATION_PATH_ON_EMAIL, TokenAction.ACTIVATION
         )
         template = app_settings.EMAIL_TEMPLATE_ACTIVATION
         subject = app_settings.EMAIL_SUBJECT_ACTIVATION
-        return self.send(subject, template, email_context, *args, **kwargs)
+        return subject, template, email_context
 
-    def resend_activation_email(self, info, *args, **kwargs):
+    def activation_resend_email(self, info):
         if self.verified is True:
             raise UserAlreadyVerified
         email_context = self.get_email_context(
@@ -87,23 +390,47 @@ class UserStatus(models.Model):
         )
         template = app_settings.EMAIL_TEMPLATE_ACTIVATION_RESEND
         subject = app_settings.EMAIL_SUBJECT_ACTIVATION_RESEND
-        return self.send(subject, template, email_context, *args, **kwargs)
+        return subject, template, email_context
 
-    def send_password_set_email(self, info, *args, **kwargs):
+    def password_set_email(self, info):
         email_context = self.get_email_context(
             info, app_settings.PASSWORD_SET_PATH_ON_EMAIL, TokenAction.PASSWORD_SET
         )
         template = app_settings.EMAIL_TEMPLATE_PASSWORD_SET
         subject = app_settings.EMAIL_SUBJECT_PASSWORD_SET
-        return self.send(subject, template, email_context, *args, **kwargs)
+        return subject, template, email_context
 
-    def send_password_reset_email(self, info, *args, **kwargs):
+    def password_reset_email(self, info):
         email_context = self.get_email_context(
             info, app_settings.PASSWORD_RESET_PATH_ON_EMAIL, TokenAction.PASSWORD_RESET
         )
         template = app_settings.EMAIL_TEMPLATE_PASSWORD_RESET
         subject = app_settings.EMAIL_SUBJECT_PASSWORD_RESET
-        return self.send(subject, template, email_context, *args, **kwargs)
+        return subject, template, email_context
+
+    def send_activation_email(self, info, *args, **kwargs):
+        return self.send(*self.activation_email(info), *args, **kwargs)
+
+    def resend_activation_email(self, info, *args, **kwargs):
+        return self.send(*self.activation_resend_email(info), *args, **kwargs)
+
+    def send_password_set_email(self, info, *args, **kwargs):
+        return self.send(*self.password_set_email(info), *args, **kwargs)
+
+    def send_password_reset_email(self, info, *args, **kwargs):
+        return self.send(*self.password_reset_email(info), *args, **kwargs)
+
+    async def asend_activation_email(self, info, *args, **kwargs):
+        return await self.asend(self.activation_email, info, *args, **kwargs)
+
+    async def aresend_activation_email(self, info, *args, **kwargs):
+        return await self.asend(self.activation_resend_email, info, *args, **kwargs)
+
+    async def asend_password_set_email(self, info, *args, **kwargs):
+        return await self.asend(self.password_set_email, info, *args, **kwargs)
+
+    async def asend_password_reset_email(self, info, *args, **kwargs):
+        return await self.asend(self.password_reset_email, info, *args, **kwargs)
 
     def send_secondary_email_activation(self, info, email):
         if not self.email_is_free(email):
@@ -120,17 +447,13 @@ class UserStatus(models.Model):
 
     @classmethod
     def email_is_free(cls, email):
-        try:
-            UserModel._default_manager.get(**{UserModel.EMAIL_FIELD + '__iexact': email})
-            return False
-        except Exception:
-            pass
-        try:
-            UserStatus._default_manager.get(secondary_email=email)
+        if UserModel._default_manager.filter(
+            **{UserModel.EMAIL_FIELD + "__iexact": email}
+        ).exists():
             return False
-        except Exception:
-            pass
-        return True
+        return not UserStatus._default_manager.filter(
+            secondary_email__iexact=email
+        ).exists()
 
     @classmethod
     def clean_email(cls, email=False):
@@ -144,7 +467,7 @@ class UserStatus(models.Model):
             token, TokenAction.ACTIVATION, app_settings.EXPIRATION_ACTIVATION_TOKEN
         )
         user = UserModel._default_manager.get(**payload)
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         if user_status.verified is False:
             user_status.verified = True
             user_status.save(update_fields=["verified"])
@@ -163,34 +486,41 @@ class UserStatus(models.Model):
         if not cls.email_is_free(secondary_email):
             raise EmailAlreadyInUse
         user = UserModel._default_manager.get(**payload)
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         user_status.secondary_email = secondary_email
         user_status.save(update_fields=["secondary_email"])
 
     @classmethod
     def unarchive(cls, user):
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         if user_status.archived is True:
             user_status.archived = False
             user_status.save(update_fields=["archived"])
 
     @classmethod
     def archive(cls, user):
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         if user_status.archived is False:
             user_status.archived = True
             user_status.save(update_fields=["archived"])
 
+    @classmethod
+    def request_deletion(cls, user):
+        user_status = cls.objects.for_user(user)
+        if user_status.deletion_requested is None:
+            user_status.deletion_requested = timezone.now()
+            user_status.save(update_fields=["deletion_requested"])
+
     @classmethod
     def block(cls, user):
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         if user_status.blocked is False:
             user_status.blocked = True
             user_status.save(update_fields=["blocked"])
 
     @classmethod
     def unblock(cls, user):
-        user_status = cls.objects.get(user=user)
+        user_status = cls.objects.for_user(user)
         if user_status.blocked is True:
             user_status.blocked = False
             user_status.save(update_fields=["blocked"])
@@ -4,6 +4,7 @@ import graphql_jwt
 from .bases import MutationMixin, DynamicArgsMixin
 from .mixins import (
     RegisterMixin,
+    ValidateRegistrationMixin,
     VerifyAccountMixin,
     ResendActivationEmailMixin,
     SendPasswordResetEmailMixin,
@@ -23,23 +24,22 @@ from .mixins import (
     RemoveSecondaryEmailMixin,
     BlockUserMixin
 )
-from .schema import UserNode
 from .settings import graphql_auth_settings as app_settings
-from .utils import normalize_fields
 
 
 class Register(MutationMixin, DynamicArgsMixin, RegisterMixin, graphene.Mutation):
     __doc__ = RegisterMixin.__doc__
 
-    password_fields = (
-        []
-        if app_settings.ALLOW_PASSWORDLESS_REGISTRATION
-        else ["password1", "password2"]
-    )
-    _required_args = normalize_fields(
-        app_settings.REGISTER_MUTATION_FIELDS, password_fields
-    )
-    _args = app_settings.REGISTER_MUTATION_FIELDS_OPTIONAL
+    password_fields = app_settings.register_password_fields
+    _required_args = app_settings.register_arguments
+    _args = app_settings.register_optional_arguments
+
+
+class ValidateRegistration(
+    MutationMixin, DynamicArgsMixin, ValidateRegistrationMixin, graphene.Mutation
+):
+    __doc__ = ValidateRegistrationMixin.__doc__
+    _args = app_settings.validate_registration_arguments
 
 
 class VerifyAccount(
@@ -105,24 +105,15 @@ class PasswordReset(
 
 
 class ObtainJSONWebToken(
-    MutationMixin, ObtainJSONWebTokenMixin, graphql_jwt.JSONWebTokenMutation
+    MutationMixin,
+    ObtainJSONWebTokenMixin,
+    DynamicArgsMixin,
+    graphql_jwt.JSONWebTokenMutation,
 ):
     __doc__ = ObtainJSONWebTokenMixin.__doc__
-    user = graphene.Field(UserNode)
+    user = graphene.Field("graphql_auth.schema.UserNode")
     unarchiving = graphene.Boolean(default_value=False)
 
-    @classmethod
-    def Field(cls, *args, **kwargs):
-        cls._meta.arguments.update({"password": graphene.String(required=True)})
-
-        if app_settings.LOGIN_REQUIRE_RECAPTCHA is True:
-            cls._meta.arguments.update(
-                {"recaptcha_token": graphene.String(required=True)}
-            )
-        for field in app_settings.LOGIN_ALLOWED_FIELDS:
-            cls._meta.arguments.update({field: graphene.String()})
-        return super(graphql_jwt.JSONWebTokenMutation, cls).Field(*args, **kwargs)
-
 
 class ArchiveAccount(
     MutationMixin, ArchiveAccountMixin, DynamicArgsMixin, graphene.Mutation
@@ -149,7 +140,7 @@ class UpdateAccount(
     MutationMixin, DynamicArgsMixin, UpdateAccountMixin, graphene.Mutation
 ):
     __doc__ = UpdateAccountMixin.__doc__
-    _args = app_settings.UPDATE_MUTATION_FIELDS
+    _args = app_settings.update_arguments
 
 
 class VerifyToken(MutationMixin, VerifyTokenMixin, graphql_jwt.Verify):
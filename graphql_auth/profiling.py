@@ -0,0 +1,289 @@
+"""
+Opt-in profiling of the mutations.
+
+A random `PROFILE_SAMPLE_RATE` fraction of the mutation executions is
+profiled, and with `PROFILE_SLOW_THRESHOLD` every execution is profiled
+but only kept when it takes longer than the threshold, in seconds.
+Profiles are written to `PROFILE_DIR` as collapsed stacks, one
+`frame;frame;frame weight` line per stack, the input of flamegraph.pl,
+speedscope or inferno:
+
+    GRAPHQL_AUTH = {
+        "PROFILE_SAMPLE_RATE": 0.01,
+        "PROFILE_SLOW_THRESHOLD": 1.0,
+        "PROFILE_DIR": "/var/log/graphql_auth/profiles",
+    }
+
+`PROFILER` is `cprofile` (default) or `pyinstrument`, which must be
+installed. cProfile only records callers and callees, so its stacks are
+rebuilt by splitting the time of each function between its callers,
+weights are microseconds. pyinstrument samples the real stacks, with a
+lower overhead, which suits `PROFILE_SLOW_THRESHOLD` better.
+
+Coroutine mutations are profiled while they run only, the profiler is
+paused while they wait and the event loop runs other tasks.
+"""
+
+import inspect
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+from .exceptions import WrongUsage
+from .settings import graphql_auth_settings as app_settings
+
+logger = logging.getLogger(__name__)
+
+# one profile at a time per thread, nested mutations belong to the outer one
+_local = threading.local()
+
+MAX_DEPTH = 100
+
+
+def should_profile():
+    """
+    return the reason to profile this execution, "slow" meaning that it
+    is only kept above the threshold, or `None`
+    """
+    if getattr(_local, "active", False):
+        return None
+    rate = app_settings.PROFILE_SAMPLE_RATE
+    if rate and random.random() < rate:
+        return "sampled"
+    if app_settings.PROFILE_SLOW_THRESHOLD is not None:
+        return "slow"
+    return None
+
+
+def get_profile_dir():
+    return app_settings.PROFILE_DIR or os.path.join(
+        tempfile.gettempdir(), "graphql_auth_profiles"
+    )
+
+
+class CProfileProfiler:
+    def __init__(self):
+        import cProfile
+
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def collapsed(self):
+        import pstats
+
+        stats = pstats.Stats(self.profile).stats
+        children = {}
+        for func, (_, _, _, _, callers) in stats.items():
+            for caller, (_, _, _, ct) in callers.items():
+                children.setdefault(caller, []).append((func, ct))
+        roots = [
+            func
+            for func, (_, _, _, _, callers) in stats.items()
+            if not any(caller in stats for caller in callers)
+        ]
+        stacks = {}
+
+        def walk(func, stack, weight):
+            _, _, tt, ct, _ = stats[func]
+            stack = stack + (frame_label(*func),)
+            stacks[stack] = stacks.get(stack, 0) + tt * weight
+            if len(stack) >= MAX_DEPTH:
+                return
+            for child, edge_ct in children.get(func, ()):
+                child_ct = stats[child][3]
+                if child in visiting or not child_ct:
+                    continue  # recursion
+                visiting.add(child)
+                walk(child, stack, weight * edge_ct / child_ct)
+                visiting.discard(child)
+
+        for root in roots:
+            visiting = {root}
+            walk(root, (), 1)
+        return {
+            stack: int(seconds * 1000000)
+            for stack, seconds in stacks.items()
+            if seconds * 1000000 >= 1
+        }
+
+
+class PyinstrumentProfiler:
+    def __init__(self):
+        import pyinstrument
+
+        self.pyinstrument = pyinstrument
+        # one session per start, an awaited mutation is profiled in steps
+        self.sessions = []
+
+    def start(self):
+        self.profiler = self.pyinstrument.Profiler(interval=0.0005)
+        self.profiler.start()
+
+    def stop(self):
+        self.profiler.stop()
+        self.sessions.append(self.profiler.last_session)
+
+    def collapsed(self):
+        stacks = {}
+        frame_records = (
+            record for session in self.sessions for record in session.frame_records
+        )
+        for identifiers, seconds in frame_records:
+            stack = tuple(
+                frame_label(*parse_identifier(identifier))
+                for identifier in identifiers
+                if not identifier.startswith("\x01")  # frame attributes
+            )
+            stacks[stack] = stacks.get(stack, 0) + seconds
+        return {
+            stack: int(seconds * 1000000) for stack, seconds in stacks.items()
+        }
+
+
+PROFILERS = {"cprofile": CProfileProfiler, "pyinstrument": PyinstrumentProfiler}
+
+
+def get_profiler():
+    name = app_settings.PROFILER
+    if name not in PROFILERS:
+        raise WrongUsage(
+            "PROFILER must be one of %s, not '%s'" % (", ".join(PROFILERS), name)
+        )
+    try:
+        return PROFILERS[name]()
+    except ImportError:
+        raise WrongUsage("%s must be installed to use it as PROFILER" % name)
+
+
+def parse_identifier(identifier):
+    # "function\x00filename\x00lineno"
+    name, filename, lineno = (identifier.split("\x00") + ["", ""])[:3]
+    return filename, lineno, name
+
+
+def frame_label(filename, lineno, name):
+    # ";" separates the frames of collapsed stacks
+    return ("%s (%s:%s)" % (name, filename, lineno)).replace(";", ",")
+
+
+def dump(mutation, profiler, duration, reason):
+    name = getattr(mutation, "__name__", mutation)
+    directory = get_profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(
+        directory,
+        "%s-%s-%dms-%s-%s.collapsed"
+        % (
+            name,
+            time.strftime("%Y%m%dT%H%M%S"),
+            duration * 1000,
+            reason,
+            threading.get_ident(),
+        ),
+    )
+    with open(path, "w") as f:
+        for stack, weight in sorted(profiler.collapsed().items()):
+            f.write("%s %d\n" % (";".join(stack), weight))
+    logger.info("%s profile (%.0fms) written to %s", name, duration * 1000, path)
+    return path
+
+
+class Profile:
+    def __init__(self, mutation, reason):
+        self.mutation = mutation
+        self.reason = reason
+        self.profiler = get_profiler()
+
+    def __enter__(self):
+        _local.active = True
+        self.start = time.perf_counter()
+        self.profiler.start()
+        return self
+
+    def pause(self):
+        self.profiler.stop()
+        _local.active = False
+
+    def resume(self):
+        _local.active = True
+        self.profiler.start()
+
+    def __exit__(self, *args):
+        self.profiler.stop()
+        duration = time.perf_counter() - self.start
+        _local.active = False
+        threshold = app_settings.PROFILE_SLOW_THRESHOLD
+        if self.reason == "slow" and duration < threshold:
+            return
+        try:
+            dump(self.mutation, self.profiler, duration, self.reason)
+        except Exception:
+            # profiling must never break the mutation
+            logger.exception("Failed to write the %s profile", self.mutation)
+
+
+def profiled(mutation, fn, args=(), kwargs=None):
+    """
+    call `fn(*args, **kwargs)`, profiling it if it is sampled or
+    may be slow, until completion if it returns an awaitable
+    """
+    kwargs = kwargs or {}
+    reason = should_profile()
+    if reason is None:
+        return fn(*args, **kwargs)
+    profile = Profile(mutation, reason)
+    profile.__enter__()
+    try:
+        result = fn(*args, **kwargs)
+    except BaseException:
+        profile.__exit__()
+        raise
+    if inspect.isawaitable(result):
+        return _aprofiled(profile, result)
+    profile.__exit__()
+    return result
+
+
+class ProfiledSteps:
+    """
+    await `awaitable` profiling its steps only: the profile is paused
+    while it waits, when the event loop runs the other tasks, which
+    may be profiled themselves
+    """
+
+    def __init__(self, profile, awaitable):
+        self.profile = profile
+        self.awaitable = awaitable
+
+    def __await__(self):
+        steps = self.awaitable.__await__()
+        value, error = None, None
+        while True:
+            try:
+                if error is None:
+                    yielded = steps.send(value)
+                else:
+                    yielded = steps.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            self.profile.pause()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as e:
+                value, error = None, e
+            self.profile.resume()
+
+
+async def _aprofiled(profile, awaitable):
+    try:
+        return await ProfiledSteps(profile, awaitable)
+    finally:
+        profile.__exit__()
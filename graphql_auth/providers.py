@@ -1,16 +1,103 @@
-import requests
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
 
 from .exceptions import WrongUsage
 from .settings import graphql_auth_settings as app_settings
 
+# requests and httpx are only imported once a recaptcha is validated,
+# most projects never do it
+# one keep-alive session for the sync provider
+_session = None
 
-def validate_recaptcha(token=''):
+# per event loop (client, semaphore), as both are bound to the loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_recaptcha_payload(token):
     if app_settings.RECAPTCHA_SECRET_KET is None:
         raise WrongUsage(
             "RECAPTCHA_SECRET_KET must be provided while using LOGIN_REQUIRE_RECAPTCHA"
         )
+    return {"secret": app_settings.RECAPTCHA_SECRET_KET, "response": token}
+
+
+def get_session():
+    global _session
+    if _session is None:
+        import requests
+
+        _session = requests.Session()
+    return _session
+
+
+def validate_recaptcha(token=''):
+    payload = get_recaptcha_payload(token)
+    res = get_session().post(
+        app_settings.RECAPTCHA_VERIFY_URL,
+        data=payload,
+        timeout=app_settings.RECAPTCHA_TIMEOUT,
+    )
+    return res.json()
+
+
+def import_httpx():
+    try:
+        import httpx
+    except ImportError:  # pragma: no cover
+        return None
+    return httpx
+
+
+def get_async_client():
+    """
+    return the `httpx.AsyncClient` and the semaphore of the running loop,
+    the client is `None` without httpx
+    """
+    loop = asyncio.get_event_loop()
+    try:
+        return _async_clients[loop]
+    except KeyError:
+        pass
+    max_concurrency = app_settings.RECAPTCHA_MAX_CONCURRENCY
+    client = None
+    httpx = import_httpx()
+    if httpx is not None:
+        client = httpx.AsyncClient(
+            timeout=app_settings.RECAPTCHA_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+        )
+    _async_clients[loop] = client, asyncio.Semaphore(max_concurrency)
+    return _async_clients[loop]
+
+
+async def aclose_async_client():
+    """
+    close the connections of the running loop client, e.g. on ASGI shutdown
+    """
+    client, _ = _async_clients.pop(asyncio.get_event_loop(), (None, None))
+    if client is not None:
+        await client.aclose()
+
+
+async def avalidate_recaptcha(token=''):
+    """
+    async `validate_recaptcha`, sharing one keep-alive `httpx` client
+    per event loop. At most `RECAPTCHA_MAX_CONCURRENCY` requests are
+    in flight, the others wait for a free slot on the loop.
 
-    payload = {"secret": app_settings.RECAPTCHA_SECRET_KET, "response": token}
-    url = f'https://www.google.com/recaptcha/api/siteverify'
-    res = requests.post(url, data=payload)
+    Without httpx, `validate_recaptcha` is run in a thread.
+    """
+    client, semaphore = get_async_client()
+    async with semaphore:
+        if client is None:
+            return await sync_to_async(validate_recaptcha, thread_sensitive=False)(
+                token
+            )
+        payload = get_recaptcha_payload(token)
+        res = await client.post(app_settings.RECAPTCHA_VERIFY_URL, data=payload)
     return res.json()
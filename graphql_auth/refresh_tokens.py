@@ -0,0 +1,127 @@
+"""
+Refresh token pruning.
+
+With `JWT_LONG_RUNNING_REFRESH_TOKEN` every login inserts a row that is
+only ever marked revoked. `RefreshTokenPruner` deletes the expired and
+the revoked rows, and revokes the oldest sessions of users above a cap.
+
+Rows are deleted in batches of `batch_size` selected by primary key
+range, the next batch starting after the last pk of the previous one,
+so that the table is walked once along its primary key index.
+"""
+
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from graphql_jwt.refresh_token.utils import get_refresh_token_model
+from graphql_jwt.settings import jwt_settings
+
+
+class RefreshTokenPruner:
+    """
+    Prune the refresh token table.
+
+    - tokens older than `JWT_REFRESH_EXPIRATION_DELTA` are deleted
+    - tokens revoked more than `revoked_days` ago are deleted,
+      `None` keeps them
+    - with `max_sessions`, the live tokens of each user beyond the
+      `max_sessions` newest ones are revoked
+
+    `iter_prune` yields `(kind, count)` per batch, `kind` being one of
+    `"sessions"`, `"expired"` and `"revoked"`.
+    """
+
+    def __init__(self, batch_size=1000, revoked_days=0, max_sessions=None, sleep=0):
+        self.batch_size = batch_size
+        self.revoked_days = revoked_days
+        self.max_sessions = max_sessions
+        self.sleep = sleep
+        self.model = get_refresh_token_model()
+
+    def expired(self):
+        cutoff = timezone.now() - jwt_settings.JWT_REFRESH_EXPIRATION_DELTA
+        return self.model._base_manager.filter(created__lt=cutoff)
+
+    def revoked(self):
+        cutoff = timezone.now() - timedelta(days=self.revoked_days)
+        return self.model._base_manager.filter(revoked__lt=cutoff)
+
+    def live(self):
+        cutoff = timezone.now() - jwt_settings.JWT_REFRESH_EXPIRATION_DELTA
+        return self.model._base_manager.filter(revoked=None, created__gte=cutoff)
+
+    def iter_prune(self):
+        if self.max_sessions is not None:
+            yield from self.limit_sessions()
+        yield from self.delete_batches(self.expired(), "expired")
+        if self.revoked_days is not None:
+            yield from self.delete_batches(self.revoked(), "revoked")
+
+    def delete_batches(self, queryset, kind):
+        pks = queryset.order_by("pk").values_list("pk", flat=True)
+        last = None
+        while True:
+            batch = pks if last is None else pks.filter(pk__gt=last)
+            batch = list(batch[: self.batch_size])
+            if not batch:
+                return
+            with transaction.atomic():
+                deleted, _ = self.model._base_manager.filter(pk__in=batch).delete()
+            yield kind, deleted
+            last = batch[-1]
+            if self.sleep:
+                time.sleep(self.sleep)
+
+    def limit_sessions(self):
+        """
+        revoke the oldest live tokens of the users above `max_sessions`,
+        yielding the count of each user
+        """
+        user_ids = list(
+            self.live()
+            .order_by()
+            .values("user_id")
+            .annotate(sessions=Count("pk"))
+            .filter(sessions__gt=self.max_sessions)
+            .values_list("user_id", flat=True)
+        )
+        for user_id in user_ids:
+            yield "sessions", limit_sessions(user_id, self.max_sessions)
+
+    def run(self):
+        """
+        prune and return the number of deleted or revoked tokens of each kind
+        """
+        counts = {}
+        for kind, count in self.iter_prune():
+            counts[kind] = counts.get(kind, 0) + count
+        return counts
+
+
+def limit_sessions(user_id, max_sessions):
+    """
+    revoke the live refresh tokens of a user but the `max_sessions`
+    newest ones, and return how many were revoked
+    """
+    pruner = RefreshTokenPruner()
+    stale = list(
+        pruner.live()
+        .filter(user_id=user_id)
+        .order_by("-created", "-pk")
+        .values_list("pk", flat=True)[max_sessions:]
+    )
+    if not stale:
+        return 0
+    return pruner.model._base_manager.filter(pk__in=stale).update(
+        revoked=timezone.now()
+    )
+
+
+def prune_refresh_tokens(**options):
+    """
+    shortcut for `RefreshTokenPruner(**options).run()`
+    """
+    return RefreshTokenPruner(**options).run()
@@ -4,6 +4,7 @@ import graphql_jwt
 from .bases import RelayMutationMixin, DynamicInputMixin
 from .mixins import (
     RegisterMixin,
+    ValidateRegistrationMixin,
     VerifyAccountMixin,
     ResendActivationEmailMixin,
     SendPasswordResetEmailMixin,
@@ -23,9 +24,7 @@ from .mixins import (
     RemoveSecondaryEmailMixin,
     BlockUserMixin
 )
-from .schema import UserNode
 from .settings import graphql_auth_settings as app_settings
-from .utils import normalize_fields
 
 
 class Register(
@@ -33,16 +32,19 @@ class Register(
 ):
     __doc__ = RegisterMixin.__doc__
 
-    password_fields = (
-        []
-        if app_settings.ALLOW_PASSWORDLESS_REGISTRATION
-        else ["password1", "password2"]
-    )
+    password_fields = app_settings.register_password_fields
+    _required_inputs = app_settings.register_arguments
+    _inputs = app_settings.register_optional_arguments
 
-    _required_inputs = normalize_fields(
-        app_settings.REGISTER_MUTATION_FIELDS, password_fields
-    )
-    _inputs = app_settings.REGISTER_MUTATION_FIELDS_OPTIONAL
+
+class ValidateRegistration(
+    RelayMutationMixin,
+    DynamicInputMixin,
+    ValidateRegistrationMixin,
+    graphene.ClientIDMutation,
+):
+    __doc__ = ValidateRegistrationMixin.__doc__
+    _inputs = app_settings.validate_registration_arguments
 
 
 class VerifyAccount(
@@ -124,29 +126,15 @@ class PasswordReset(
 
 
 class ObtainJSONWebToken(
-    RelayMutationMixin, ObtainJSONWebTokenMixin, graphql_jwt.relay.JSONWebTokenMutation
+    RelayMutationMixin,
+    ObtainJSONWebTokenMixin,
+    DynamicInputMixin,
+    graphql_jwt.relay.JSONWebTokenMutation,
 ):
     __doc__ = ObtainJSONWebTokenMixin.__doc__
-    user = graphene.Field(UserNode)
+    user = graphene.Field("graphql_auth.schema.UserNode")
     unarchiving = graphene.Boolean(default_value=False)
 
-    @classmethod
-    def Field(cls, *args, **kwargs):
-        cls._meta.arguments["input"]._meta.fields.update(
-            {"password": graphene.InputField(graphene.String, required=True)}
-        )
-
-        if app_settings.LOGIN_REQUIRE_RECAPTCHA is True:
-            cls._meta.arguments["input"]._meta.fields.update(
-                {"recaptcha_token": graphene.InputField(graphene.String, required=True)}
-            )
-
-        for field in app_settings.LOGIN_ALLOWED_FIELDS:
-            cls._meta.arguments["input"]._meta.fields.update(
-                {field: graphene.InputField(graphene.String)}
-            )
-        return super(graphql_jwt.relay.JSONWebTokenMutation, cls).Field(*args, **kwargs)
-
 
 class ArchiveAccount(
     RelayMutationMixin,
@@ -179,7 +167,7 @@ class UpdateAccount(
     RelayMutationMixin, DynamicInputMixin, UpdateAccountMixin, graphene.ClientIDMutation
 ):
     __doc__ = UpdateAccountMixin.__doc__
-    _inputs = app_settings.UPDATE_MUTATION_FIELDS
+    _inputs = app_settings.update_arguments
 
 
 class VerifyToken(
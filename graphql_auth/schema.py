@@ -3,6 +3,7 @@ from django.contrib.auth import get_user_model
 from graphene_django.filter.fields import DjangoFilterConnectionField
 from graphene_django.types import DjangoObjectType
 
+from .claims import get_user_status
 from .settings import graphql_auth_settings as app_settings
 
 
@@ -46,6 +47,9 @@ class MeQuery(graphene.ObjectType):
 
     def resolve_me(self, info):
         user = info.context.user
-        if user.is_authenticated and user.status.blocked is not True:
+        if (
+            user.is_authenticated
+            and get_user_status(user, info.context).blocked is not True
+        ):
             return user
         return None
@@ -11,10 +11,14 @@ back to the defaults.
 """
 
 from django.conf import settings as django_settings
+from django.core.exceptions import ImproperlyConfigured
 from django.test.signals import setting_changed
 
+from collections.abc import Callable
 from datetime import timedelta
 
+from .utils import flat_dict, normalize_fields
+
 # Copied shamelessly from Graphene / Django REST Framework
 
 DEFAULTS = {
@@ -70,6 +74,9 @@ DEFAULTS = {
     },
     # turn is_active to False instead
     "ALLOW_DELETE_ACCOUNT": False,
+    # with ALLOW_DELETE_ACCOUNT, only deactivate the account and leave
+    # the delete to the purge_deleted_accounts command
+    "DEFERRED_ACCOUNT_DELETION": False,
     # string path for email function wrapper, see the testproject example
     "EMAIL_ASYNC_TASK": False,
     # mutation error type
@@ -81,52 +88,207 @@ DEFAULTS = {
     "LOGIN_REQUIRE_RECAPTCHA": False,
     "RECAPTCHA_SECRET_KET": None,
     "RECAPTCHA_MIN_SCORE": None,
+    "RECAPTCHA_VERIFY_URL": "https://www.google.com/recaptcha/api/siteverify",
+    # seconds to wait for the recaptcha api, and the maximum
+    # number of requests in flight per event loop on async login
+    "RECAPTCHA_TIMEOUT": 10,
+    "RECAPTCHA_MAX_CONCURRENCY": 100,
+    # validate register with forms.RegisterValidator instead of the form
+    "REGISTER_FAST_VALIDATION": False,
+    # seconds to cache the username and email availability
+    # answers of ValidateRegistration
+    "AVAILABILITY_CACHE_TIMEOUT": 10,
+    # trust verified/blocked/archived claims embedded in the jwt
+    # by graphql_auth.claims.jwt_payload
+    "JWT_STATUS_CLAIMS": False,
+    # callable or dotted path receiving (mutation, stage, duration),
+    # see graphql_auth.instrumentation
+    "METRICS_SINK": None,
+    # profile a fraction of the mutations, or the ones slower than
+    # the threshold in seconds, see graphql_auth.profiling
+    "PROFILE_SAMPLE_RATE": 0,
+    "PROFILE_SLOW_THRESHOLD": None,
+    "PROFILE_DIR": None,
+    "PROFILER": "cprofile",
+}
+
+
+# accepted types of the settings whose default does not tell them,
+# the others must be instances of the type of their default
+TYPES = {
+    "LOGIN_ALLOWED_FIELDS": (list, tuple),
+    "REGISTER_MUTATION_FIELDS": (list, tuple, dict),
+    "REGISTER_MUTATION_FIELDS_OPTIONAL": (list, tuple, dict),
+    "UPDATE_MUTATION_FIELDS": (list, tuple, dict),
+    "EXPIRATION_ACTIVATION_TOKEN": (timedelta, int, float),
+    "EXPIRATION_PASSWORD_RESET_TOKEN": (timedelta, int, float),
+    "EXPIRATION_SECONDARY_EMAIL_ACTIVATION_TOKEN": (timedelta, int, float),
+    "EXPIRATION_PASSWORD_SET_TOKEN": (timedelta, int, float),
+    "USER_NODE_EXCLUDE_FIELDS": (list, tuple),
+    "USER_NODE_FILTER_FIELDS": (list, tuple, dict),
+    "EMAIL_ASYNC_TASK": (bool, str, type(None)),
+    "CUSTOM_ERROR_TYPE": (str, type(None)),
+    "RECAPTCHA_SECRET_KET": (str, type(None)),
+    "RECAPTCHA_MIN_SCORE": (int, float, type(None)),
+    "RECAPTCHA_TIMEOUT": (int, float),
+    "AVAILABILITY_CACHE_TIMEOUT": (int, float),
+    "METRICS_SINK": (str, type(None), Callable),
+    "PROFILE_SAMPLE_RATE": (int, float),
+    "PROFILE_SLOW_THRESHOLD": (int, float, type(None)),
+    "PROFILE_DIR": (str, type(None)),
 }
 
 
+def check_settings(user_settings, defaults):
+    """
+    raise `ImproperlyConfigured` on unknown settings or values of the wrong type
+    """
+    for name, value in user_settings.items():
+        if name not in defaults:
+            raise ImproperlyConfigured("Invalid graphql_auth setting: '%s'" % name)
+        types = TYPES.get(name, type(defaults[name]))
+        if not isinstance(value, types):
+            if not isinstance(types, tuple):
+                types = (types,)
+            raise ImproperlyConfigured(
+                "GRAPHQL_AUTH['%s'] must be %s, not %s"
+                % (
+                    name,
+                    " or ".join(getattr(t, "__name__", str(t)) for t in types),
+                    type(value).__name__,
+                )
+            )
+
+
+def as_fields(dict_or_list):
+    """
+    copy of a fields setting, a dict or a list
+    """
+    return dict(dict_or_list) if isinstance(dict_or_list, dict) else list(dict_or_list)
+
+
+def check_shared_cache():
+    """
+    the status versions trusted by `JWT_STATUS_CLAIMS` are kept in the
+    default cache, every process must see the same values
+    """
+    from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+    from django.core.cache.backends.dummy import DummyCache
+    from django.core.cache.backends.locmem import LocMemCache
+
+    if isinstance(caches[DEFAULT_CACHE_ALIAS], (DummyCache, LocMemCache)):
+        raise ImproperlyConfigured(
+            "JWT_STATUS_CLAIMS requires a default cache shared by every process, "
+            "not %s" % type(caches[DEFAULT_CACHE_ALIAS]).__name__
+        )
+
+
+def compile_settings(values):
+    """
+    check the settings depending on each other and return the
+    values derived from them, so they are not built on each request
+    """
+    import graphene
+
+    if not values["LOGIN_ALLOWED_FIELDS"]:
+        raise ImproperlyConfigured("GRAPHQL_AUTH['LOGIN_ALLOWED_FIELDS'] is empty")
+    if values["JWT_STATUS_CLAIMS"]:
+        check_shared_cache()
+    if values["LOGIN_REQUIRE_RECAPTCHA"] and values["RECAPTCHA_MIN_SCORE"] is None:
+        raise ImproperlyConfigured(
+            "RECAPTCHA_MIN_SCORE must be provided while using LOGIN_REQUIRE_RECAPTCHA"
+        )
+    for name in (
+        "REGISTER_MUTATION_FIELDS",
+        "REGISTER_MUTATION_FIELDS_OPTIONAL",
+        "UPDATE_MUTATION_FIELDS",
+    ):
+        if isinstance(values[name], dict):
+            for field, type_name in values[name].items():
+                if not hasattr(graphene, type_name):
+                    raise ImproperlyConfigured(
+                        "GRAPHQL_AUTH['%s']['%s']: '%s' is not a graphene type"
+                        % (name, field, type_name)
+                    )
+
+    register_fields = as_fields(values["REGISTER_MUTATION_FIELDS"])
+    register_optional_fields = as_fields(values["REGISTER_MUTATION_FIELDS_OPTIONAL"])
+    password_fields = (
+        [] if values["ALLOW_PASSWORDLESS_REGISTRATION"] else ["password1", "password2"]
+    )
+    return {
+        "login_fields": frozenset(values["LOGIN_ALLOWED_FIELDS"]),
+        "login_arguments": list(values["LOGIN_ALLOWED_FIELDS"]),
+        "register_password_fields": password_fields,
+        "register_arguments": normalize_fields(register_fields, password_fields),
+        "register_optional_arguments": register_optional_fields,
+        "register_required_fields": flat_dict(register_fields),
+        "register_form_fields": flat_dict(register_fields)
+        + flat_dict(register_optional_fields),
+        "validate_registration_arguments": dict(
+            (field, fields[field] if isinstance(fields, dict) else "String")
+            for fields in (register_fields, password_fields, register_optional_fields)
+            for field in fields
+        ),
+        "update_arguments": as_fields(values["UPDATE_MUTATION_FIELDS"]),
+        "update_form_fields": flat_dict(as_fields(values["UPDATE_MUTATION_FIELDS"])),
+    }
+
+
 class GraphQLAuthSettings(object):
     """
     A settings object, that allows API settings to be accessed as properties.
     For example:
         from graphql_auth.settings import settings
         print(settings)
+
+    The settings are checked and loaded at once, on first access or
+    `reload`, as plain instance attributes. `reload` swaps them in one
+    step, so every module holding this object sees the new values.
+
+    The lowercase attributes are derived from the settings, see
+    `compile_settings`.
     """
 
     def __init__(self, user_settings=None, defaults=None):
-        if user_settings:
-            self._user_settings = user_settings
-        self.defaults = defaults or DEFAULTS
+        self.__dict__.update(
+            _user_settings=user_settings, defaults=defaults or DEFAULTS
+        )
 
     @property
     def user_settings(self):
-        if not hasattr(self, "_user_settings"):
-            self._user_settings = getattr(django_settings, "GRAPHQL_AUTH", {})
+        if self._user_settings is None:
+            return getattr(django_settings, "GRAPHQL_AUTH", {})
         return self._user_settings
 
+    def reload(self, user_settings=None):
+        defaults = self.defaults
+        if user_settings is None:
+            user_settings = getattr(django_settings, "GRAPHQL_AUTH", {})
+        check_settings(user_settings, defaults)
+        values = dict(defaults, **user_settings)
+        values.update(compile_settings(values))
+        values.update(_user_settings=user_settings, defaults=defaults, _loaded=True)
+        self.__dict__ = values
+
     def __getattr__(self, attr):
-        if attr not in self.defaults:
+        # only called for missing attributes, load the settings if not done yet
+        if attr.startswith("_") or attr == "defaults" or "defaults" not in vars(self):
+            raise AttributeError(attr)
+        if not self.__dict__.get("_loaded"):
+            self.reload(self._user_settings)
+        if attr not in vars(self):
             raise AttributeError("Invalid graphql_auth setting: '%s'" % attr)
-
-        try:
-            # Check if present in user settings
-            val = self.user_settings[attr]
-        except KeyError:
-            # Fall back to defaults
-            val = self.defaults[attr]
-
-        # Cache the result
-        setattr(self, attr, val)
-        return val
+        return self.__dict__[attr]
 
 
 graphql_auth_settings = GraphQLAuthSettings(None, DEFAULTS)
 
 
 def reload_graphql_auth_settings(*args, **kwargs):
-    global graphql_auth_settings
     setting, value = kwargs["setting"], kwargs["value"]
     if setting == "GRAPHQL_AUTH":
-        graphql_auth_settings = GraphQLAuthSettings(value, DEFAULTS)
+        graphql_auth_settings.reload(value or {})
 
 
 setting_changed.connect(reload_graphql_auth_settings)
@@ -1,16 +1,30 @@
-from django.db.models.signals import post_save
 from django.conf import settings as django_settings
-
+from django.db import IntegrityError, transaction
+from django.db.models.signals import post_save
 from django.dispatch import Signal, receiver
 
 
+user_registered = Signal()
+user_verified = Signal()
+# sent with mutation, stage and duration by graphql_auth.instrumentation
+mutation_stage_timed = Signal()
+
+
 @receiver(post_save, sender=django_settings.AUTH_USER_MODEL)
-def create_user_status(sender, instance, created, **kwargs):
+def create_user_status(sender, instance, created, raw=False, **kwargs):
+    """
+    insert the status of new users, fixtures or a receiver connected
+    before this one may already hold it
+    """
     if created:
         from .models import UserStatus
 
-        UserStatus._default_manager.get_or_create(user=instance)
-
-
-user_registered = Signal()
-user_verified = Signal()
+        manager = UserStatus._default_manager
+        if raw:
+            manager.get_or_create(user=instance)
+            return
+        try:
+            with transaction.atomic(using=manager.db):
+                manager.create(user=instance)
+        except IntegrityError:
+            pass
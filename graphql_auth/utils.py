@@ -1,6 +1,7 @@
 import warnings
 from django.core import signing
-from django.contrib.auth import get_user_model
+from django.contrib.auth import get_backends, get_user_model
+from django.contrib.auth.backends import ModelBackend
 from django.conf import settings as django_settings
 from django.core.signing import BadSignature
 
@@ -43,9 +44,21 @@ def using_refresh_tokens():
     return False
 
 
+def can_authenticate(user):
+    """
+    `ModelBackend.authenticate` once the password is checked,
+    e.g. `is_active`
+    """
+    return any(
+        backend.user_can_authenticate(user)
+        for backend in get_backends()
+        if isinstance(backend, ModelBackend)
+    )
+
+
 def revoke_user_refresh_token(user):
     if using_refresh_tokens():
-        refresh_tokens = user.refresh_tokens.all()
+        refresh_tokens = user.refresh_tokens.filter(revoked__isnull=True)
         for refresh_token in refresh_tokens:
             try:
                 refresh_token.revoke()
@@ -67,8 +80,6 @@ def normalize_fields(dict_or_list, extra_list):
     other fields on mutations
     """
     if isinstance(dict_or_list, dict):
-        for i in extra_list:
-            dict_or_list[i] = "String"
-        return dict_or_list
+        return dict(dict_or_list, **{i: "String" for i in extra_list})
     else:
         return dict_or_list + extra_list
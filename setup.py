@@ -23,6 +23,10 @@ tests_require = [
 
 dev_requires = ["black==19.3b0", "flake8==3.7.7"] + tests_require
 
+async_requires = ["httpx", "aiosmtplib"]
+
+profiling_requires = ["pyinstrument"]
+
 setup(
     name="django-graphql-auth",
     version=get_version("graphql_auth"),
@@ -40,7 +44,7 @@ setup(
             ("Issues", "https://github.com/PedroBern/django-graphql-auth/issues"),
         )
     ),
-    packages=find_packages(exclude=["tests*"]),
+    packages=find_packages(exclude=["tests*", "benchmarks*"]),
     install_requires=[
         "Django>=2.2.0,<=3.2.13",
         "django-graphql-jwt==0.3.4",
@@ -48,6 +52,7 @@ setup(
         "graphene_django==2.15.0",
         "graphene==2.1.9",
         "PyJWT>=2,<3",
+        "asgiref>=3.3",
     ],
     tests_require=tests_require,
     classifiers=[
@@ -67,5 +72,10 @@ setup(
     keywords="api graphql rest relay graphene auth",
     zip_safe=False,
     include_package_data=True,
-    extras_require={"test": tests_require, "dev": dev_requires},
+    extras_require={
+        "test": tests_require,
+        "dev": dev_requires,
+        "async": async_requires,
+        "profiling": profiling_requires,
+    },
 )
@@ -6,6 +6,7 @@ from graphql_auth import mutations
 
 class AuthMutation(graphene.ObjectType):
     register = mutations.Register.Field()
+    validate_registration = mutations.ValidateRegistration.Field()
     verify_account = mutations.VerifyAccount.Field()
     resend_activation_email = mutations.ResendActivationEmail.Field()
     send_password_reset_email = mutations.SendPasswordResetEmail.Field()
@@ -1,3 +1,5 @@
+import sys
+
 import django
 
 import pytest
@@ -7,3 +9,15 @@ def skipif_django_21():
     return pytest.mark.skipif(
         django.get_version() < "2.2", reason="the custom model depends on 2.2"
     )
+
+
+def skipif_django_31():
+    return pytest.mark.skipif(
+        django.VERSION < (3, 2), reason="captureOnCommitCallbacks is new in 3.2"
+    )
+
+
+def skipif_python_37():
+    return pytest.mark.skipif(
+        sys.version_info < (3, 8), reason="mock.AsyncMock is new in 3.8"
+    )
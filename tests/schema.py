@@ -2,7 +2,7 @@ import graphene
 import graphql_jwt
 from graphene_django.filter.fields import DjangoFilterConnectionField
 
-from graphql_auth import mutations, relay
+from graphql_auth import async_mutations, async_relay, mutations, relay
 from graphql_auth.schema import MeQuery, UserQuery
 
 from .types import UserType
@@ -24,6 +24,7 @@ class AuthMutation(graphene.ObjectType):
     refresh_token = mutations.RefreshToken.Field()
     revoke_token = mutations.RevokeToken.Field()
     register = mutations.Register.Field()
+    validate_registration = mutations.ValidateRegistration.Field()
     verify_account = mutations.VerifyAccount.Field()
     update_account = mutations.UpdateAccount.Field()
     resend_activation_email = mutations.ResendActivationEmail.Field()
@@ -46,6 +47,7 @@ class AuthRelayMutation(graphene.ObjectType):
     refresh_token = relay.RefreshToken.Field()
     revoke_token = relay.RevokeToken.Field()
     register = relay.Register.Field()
+    validate_registration = relay.ValidateRegistration.Field()
     verify_account = relay.VerifyAccount.Field()
     update_account = relay.UpdateAccount.Field()
     resend_activation_email = relay.ResendActivationEmail.Field()
@@ -62,6 +64,22 @@ class AuthRelayMutation(graphene.ObjectType):
     block_user = relay.BlockUser.Field()
 
 
+class AsyncAuthMutation(graphene.ObjectType):
+    token_auth = async_mutations.ObtainJSONWebToken.Field()
+    register = async_mutations.Register.Field()
+    verify_account = async_mutations.VerifyAccount.Field()
+    resend_activation_email = async_mutations.ResendActivationEmail.Field()
+    send_password_reset_email = async_mutations.SendPasswordResetEmail.Field()
+
+
+class AsyncAuthRelayMutation(graphene.ObjectType):
+    token_auth = async_relay.ObtainJSONWebToken.Field()
+    register = async_relay.Register.Field()
+    verify_account = async_relay.VerifyAccount.Field()
+    resend_activation_email = async_relay.ResendActivationEmail.Field()
+    send_password_reset_email = async_relay.SendPasswordResetEmail.Field()
+
+
 class Query(UserQuery, MeQuery, PublicUserQuery, graphene.ObjectType):
     pass
 
@@ -76,3 +94,5 @@ class RelayMutation(AuthRelayMutation, graphene.ObjectType):
 
 relay_schema = graphene.Schema(query=Query, mutation=RelayMutation)
 default_schema = graphene.Schema(query=Query, mutation=Mutation)
+async_schema = graphene.Schema(query=Query, mutation=AsyncAuthMutation)
+async_relay_schema = graphene.Schema(query=Query, mutation=AsyncAuthRelayMutation)
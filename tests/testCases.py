@@ -1,15 +1,17 @@
+import asyncio
 import pprint
 import re
 
+from asgiref.sync import async_to_sync
+
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import AnonymousUser
 from django.test import RequestFactory, TestCase
 from graphene.test import Client
 from graphene.types.schema import Schema
+from graphql.execution.executors.asyncio import AsyncioExecutor
 
-from graphql_auth.models import UserStatus
-
-from .schema import default_schema, relay_schema
+from .schema import async_relay_schema, async_schema, default_schema, relay_schema
 
 
 class TestBase(TestCase):
@@ -45,7 +47,7 @@ class TestBase(TestCase):
         user = get_user_model().objects.create(*args, **kwargs)
         user.set_password(password or self.default_password)
         user.save()
-        user_status = UserStatus._default_manager.get(user=user)
+        user_status = user.status
         user_status.verified = verified
         user_status.archived = archived
         user_status.blocked = blocked
@@ -90,3 +92,31 @@ class DefaultTestCase(TestBase):
     def make_request(self, *args, **kwargs):
         client = Client(default_schema)
         return super().make_request(client=client, *args, **kwargs)
+
+
+class AsyncClient(Client):
+    """
+    execute on an event loop with the asyncio executor, like an ASGI server
+    """
+
+    def execute(self, *args, **kwargs):
+        async def execute():
+            executor = AsyncioExecutor(loop=asyncio.get_event_loop())
+            executed = await self.schema.execute(
+                *args, executor=executor, return_promise=True, **kwargs
+            )
+            return self.format_result(executed)
+
+        return async_to_sync(execute)()
+
+
+class AsyncTestCase(TestBase):
+    def make_request(self, *args, **kwargs):
+        client = AsyncClient(async_schema)
+        return super().make_request(client=client, *args, **kwargs)
+
+
+class AsyncRelayTestCase(TestBase):
+    def make_request(self, *args, **kwargs):
+        client = AsyncClient(async_relay_schema)
+        return super().make_request(client=client, *args, **kwargs)
@@ -1,9 +1,15 @@
-from graphql_auth import settings
+from unittest import mock
 
-from django.test import TestCase
+from graphql_auth import mixins, settings
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
 
 
 class AppSettingsTestCase(TestCase):
+    def setUp(self):
+        self.addCleanup(settings.graphql_auth_settings.reload)
+
     def test_reload_settings(self):
         self.assertTrue(settings.graphql_auth_settings.ALLOW_LOGIN_NOT_VERIFIED)
         user_settings = {"ALLOW_LOGIN_NOT_VERIFIED": False}
@@ -11,3 +17,90 @@ class AppSettingsTestCase(TestCase):
             setting="GRAPHQL_AUTH", value=user_settings
         )
         self.assertFalse(settings.graphql_auth_settings.ALLOW_LOGIN_NOT_VERIFIED)
+
+    def test_reload_updates_module_references(self):
+        with override_settings(GRAPHQL_AUTH={"ALLOW_LOGIN_NOT_VERIFIED": False}):
+            self.assertFalse(mixins.app_settings.ALLOW_LOGIN_NOT_VERIFIED)
+        self.assertTrue(mixins.app_settings.ALLOW_LOGIN_NOT_VERIFIED)
+
+    def test_settings_are_instance_attributes(self):
+        self.assertIn(
+            "ALLOW_LOGIN_NOT_VERIFIED", vars(settings.graphql_auth_settings)
+        )
+        with mock.patch.object(
+            settings.graphql_auth_settings, "ALLOW_LOGIN_NOT_VERIFIED", False
+        ):
+            self.assertFalse(mixins.app_settings.ALLOW_LOGIN_NOT_VERIFIED)
+        self.assertTrue(mixins.app_settings.ALLOW_LOGIN_NOT_VERIFIED)
+
+    def test_invalid_setting(self):
+        with self.assertRaises(AttributeError):
+            settings.graphql_auth_settings.NOT_A_SETTING
+        with self.assertRaisesMessage(ImproperlyConfigured, "NOT_A_SETTING"):
+            settings.graphql_auth_settings.reload({"NOT_A_SETTING": True})
+
+    def test_invalid_setting_type(self):
+        for name, value in (
+            ("ALLOW_LOGIN_NOT_VERIFIED", "no"),
+            ("LOGIN_ALLOWED_FIELDS", "email"),
+            ("RECAPTCHA_MIN_SCORE", "0.5"),
+        ):
+            with self.subTest(name=name):
+                with self.assertRaisesMessage(ImproperlyConfigured, name):
+                    settings.graphql_auth_settings.reload({name: value})
+        # a failed reload keeps the previous settings
+        self.assertTrue(settings.graphql_auth_settings.ALLOW_LOGIN_NOT_VERIFIED)
+
+    def test_status_claims_require_a_shared_cache(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "LocMemCache"):
+            settings.graphql_auth_settings.reload({"JWT_STATUS_CLAIMS": True})
+        shared = {
+            "default": {
+                "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+                "LOCATION": "cache",
+            }
+        }
+        with override_settings(CACHES=shared):
+            settings.graphql_auth_settings.reload({"JWT_STATUS_CLAIMS": True})
+        self.assertTrue(settings.graphql_auth_settings.JWT_STATUS_CLAIMS)
+
+    def test_valid_setting_types(self):
+        settings.graphql_auth_settings.reload(
+            {
+                "RECAPTCHA_MIN_SCORE": 0.5,
+                "EMAIL_ASYNC_TASK": "path.to.task",
+                "METRICS_SINK": print,
+                "REGISTER_MUTATION_FIELDS": {"email": "String"},
+            }
+        )
+        self.assertEqual(settings.graphql_auth_settings.RECAPTCHA_MIN_SCORE, 0.5)
+
+    def test_derived_settings(self):
+        settings.graphql_auth_settings.reload(
+            {
+                "LOGIN_ALLOWED_FIELDS": ("email",),
+                "REGISTER_MUTATION_FIELDS": {"email": "String"},
+                "REGISTER_MUTATION_FIELDS_OPTIONAL": ["first_name"],
+            }
+        )
+        app_settings = settings.graphql_auth_settings
+        self.assertEqual(app_settings.login_fields, frozenset(["email"]))
+        self.assertEqual(app_settings.login_arguments, ["email"])
+        self.assertEqual(
+            app_settings.register_arguments,
+            {"email": "String", "password1": "String", "password2": "String"},
+        )
+        self.assertEqual(app_settings.register_required_fields, ["email"])
+        self.assertEqual(app_settings.register_form_fields, ["email", "first_name"])
+        # the setting itself is left untouched
+        self.assertEqual(app_settings.REGISTER_MUTATION_FIELDS, {"email": "String"})
+
+    def test_dependent_settings(self):
+        for user_settings, message in (
+            ({"LOGIN_ALLOWED_FIELDS": []}, "LOGIN_ALLOWED_FIELDS"),
+            ({"LOGIN_REQUIRE_RECAPTCHA": True}, "RECAPTCHA_MIN_SCORE"),
+            ({"UPDATE_MUTATION_FIELDS": {"first_name": "Str"}}, "'Str'"),
+        ):
+            with self.subTest(message=message):
+                with self.assertRaisesMessage(ImproperlyConfigured, message):
+                    settings.graphql_auth_settings.reload(user_settings)
@@ -0,0 +1,227 @@
+import asyncio
+import threading
+from smtplib import SMTPException
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model, hashers
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import AnonymousUser
+from django.core import mail
+from django.test import RequestFactory, override_settings
+from graphql.execution.executors.asyncio import AsyncioExecutor
+
+from graphql_auth.async_mixins import checks_password_only
+from graphql_auth.constants import Messages
+
+from . import (
+    test_login,
+    test_login_recaptcha,
+    test_register,
+    test_resend_activation_email,
+    test_send_password_reset_email,
+    test_verify_account,
+)
+from .decorators import skipif_python_37
+from .schema import async_schema
+from .testCases import AsyncRelayTestCase, AsyncTestCase, TestBase
+
+
+def send_fail(fn):
+    """
+    `asend_mail` raising, the test is skipped without `AsyncMock`
+    """
+    patch = mock.patch(
+        "graphql_auth.models.asend_mail",
+        getattr(mock, "AsyncMock", mock.MagicMock)(side_effect=SMTPException),
+    )
+    return skipif_python_37()(patch(fn))
+
+
+# run the sync mutations test cases against the async schemas
+
+
+class AsyncLoginTestCase(test_login.LoginTestCaseMixin, AsyncTestCase):
+    get_query = test_login.LoginTestCase.get_query
+
+
+class AsyncLoginRelayTestCase(test_login.LoginTestCaseMixin, AsyncRelayTestCase):
+    get_query = test_login.LoginRelayTestCase.get_query
+
+
+class AsyncLoginWithRecaptchaTestCase(
+    test_login_recaptcha.LoginWithRecaptchaTestCaseMixin, AsyncTestCase
+):
+    get_query = test_login_recaptcha.LoginTestCase.get_query
+
+
+class AsyncRegisterTestCase(test_register.RegisterTestCaseMixin, AsyncTestCase):
+    register_query = test_register.RegisterTestCase.register_query
+    register_query_b = test_register.RegisterTestCase.register_query_b
+    verify_query = test_register.RegisterTestCase.verify_query
+
+    def test_register_sends_email(self):
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["test@email.com"])
+
+    @send_fail
+    def test_register_email_send_fail(self):
+        """
+        the user is committed before the email is sent
+        """
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
+        self.assertEqual(len(get_user_model().objects.all()), 1)
+
+
+class AsyncRegisterRelayTestCase(
+    test_register.RegisterTestCaseMixin, AsyncRelayTestCase
+):
+    register_query = test_register.RegisterRelayTestCase.register_query
+    register_query_b = test_register.RegisterRelayTestCase.register_query_b
+    verify_query = test_register.RegisterRelayTestCase.verify_query
+
+    @send_fail
+    def test_register_email_send_fail(self):
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
+        self.assertEqual(len(get_user_model().objects.all()), 1)
+
+
+class AsyncVerifyAccountTestCase(
+    test_verify_account.VerifyAccountCaseMixin, AsyncTestCase
+):
+    verify_query = test_verify_account.VerifyAccountCase.verify_query
+
+
+class AsyncResendActivationEmailTestCase(
+    test_resend_activation_email.ResendActivationEmailTestCaseMixin, AsyncTestCase
+):
+    get_query = test_resend_activation_email.ResendActivationEmailTestCase.get_query
+
+    def test_resend_email_valid_email(self):
+        super().test_resend_email_valid_email()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["gaa@email.com"])
+
+    @send_fail
+    def test_resend_email_fail_to_send_email(self):
+        executed = self.make_request(self.get_query("gaa@email.com"))
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
+
+
+class AsyncSendPasswordResetEmailTestCase(
+    test_send_password_reset_email.SendPasswordResetEmailTestCaseMixin, AsyncTestCase
+):
+    get_query = (
+        test_send_password_reset_email.SendPasswordResetEmailTestCase.get_query
+    )
+
+    def test_send_to_secondary_email(self):
+        super().test_send_to_secondary_email()
+        self.assertEqual(mail.outbox[0].to, ["secondary@email.com"])
+
+    @send_fail
+    def test_send_email_fail_to_send_email(self):
+        executed = self.make_request(self.get_query("bar@email.com"))
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
+
+
+def in_parallel(fn):
+    """
+    `fn` waiting for a second concurrent call, so it fails unless two
+    calls run in separate threads at the same time
+    """
+    barrier = threading.Barrier(2, timeout=5)
+
+    def wrapper(*args, **kwargs):
+        barrier.wait()
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+class AsyncPasswordHashingTestCase(TestBase):
+    """
+    the hashing of concurrent mutations is not serialized on the thread
+    shared by the database calls
+    """
+
+    def execute_concurrently(self, *queries):
+        async def execute(query):
+            request = RequestFactory().post("/graphql/")
+            request.user = AnonymousUser()
+            executor = AsyncioExecutor(loop=asyncio.get_event_loop())
+            executed = await async_schema.execute(
+                query, context=request, executor=executor, return_promise=True
+            )
+            self.assertFalse(executed.errors)
+            return executed.data
+
+        async def execute_all():
+            return await asyncio.gather(*(execute(query) for query in queries))
+
+        return async_to_sync(execute_all)()
+
+    def test_logins_check_passwords_in_parallel(self):
+        for username in ("foo", "bar"):
+            self.register_user(
+                email="%s@email.com" % username, username=username, verified=True
+            )
+        query = """
+        mutation {
+            tokenAuth(username: "%s", password: "%s")
+            { success, errors, token }
+        }
+        """
+        with mock.patch.object(
+            hashers, "check_password", in_parallel(hashers.check_password)
+        ):
+            results = self.execute_concurrently(
+                query % ("foo", self.default_password),
+                query % ("bar", self.default_password),
+            )
+        for result in results:
+            self.assertTrue(result["tokenAuth"]["success"])
+            self.assertTrue(result["tokenAuth"]["token"])
+
+    def test_registrations_hash_passwords_in_parallel(self):
+        query = """
+        mutation {
+            register(
+                email: "%s@email.com",
+                username: "%s",
+                password1: "akssdgfbwkc",
+                password2: "akssdgfbwkc"
+            )
+            { success, errors }
+        }
+        """
+        with mock.patch.object(
+            hashers, "make_password", in_parallel(hashers.make_password)
+        ):
+            results = self.execute_concurrently(
+                query % ("foo", "foo"), query % ("bar", "bar")
+            )
+        for result in results:
+            self.assertTrue(result["register"]["success"])
+        for user in get_user_model().objects.all():
+            self.assertTrue(user.check_password("akssdgfbwkc"))
+
+    def test_custom_backends_authenticate(self):
+        self.assertTrue(checks_password_only())
+        with override_settings(
+            AUTHENTICATION_BACKENDS=["tests.test_async_mutations.CustomBackend"]
+        ):
+            self.assertFalse(checks_password_only())
+
+
+class CustomBackend(ModelBackend):
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        return super().authenticate(request, username, password, **kwargs)
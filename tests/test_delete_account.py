@@ -1,15 +1,22 @@
+import io
+from unittest import mock
+
 import django
 from pytest import mark
 
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 from django.conf import settings
+from django.core.management import call_command
+from graphql_jwt.refresh_token.shortcuts import create_refresh_token
 
 from .testCases import RelayTestCase, DefaultTestCase
 from .decorators import skipif_django_21
 
 from graphql_auth.constants import Messages
+from graphql_auth.deletion import AccountPurger, purge_deleted_accounts
 from graphql_auth.models import UserStatus
+from graphql_auth.settings import graphql_auth_settings
 
 
 class DeleteAccountTestCaseMixin:
@@ -165,3 +172,67 @@ class DeleteAccountRelayTestCase(DeleteAccountTestCaseMixin, RelayTestCase):
         """ % (
             password or self.default_password,
         )
+
+
+class DeferredDeleteAccountTestCase(DefaultTestCase):
+    def setUp(self):
+        self.user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+        self.other = self.register_user(
+            email="bar@email.com", username="bar", verified=True
+        )
+        for user in (self.user, self.user, self.user, self.other):
+            create_refresh_token(user)
+
+    def delete_account(self):
+        query = """
+            mutation {
+              deleteAccount(password: "%s") {
+                success, errors
+              }
+            }
+        """ % (
+            self.default_password,
+        )
+        with mock.patch.object(
+            graphql_auth_settings, "ALLOW_DELETE_ACCOUNT", True
+        ), mock.patch.object(graphql_auth_settings, "DEFERRED_ACCOUNT_DELETION", True):
+            return self.make_request(query, {"user": self.user})
+
+    def test_deactivates_and_marks_the_account(self):
+        executed = self.delete_account()
+        self.assertEqual(executed["success"], True)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
+        self.assertIsNotNone(self.user.status.deletion_requested)
+        self.assertFalse(self.user.refresh_tokens.filter(revoked=None).exists())
+        self.assertEqual(
+            list(UserStatus.objects.pending_deletion()), [self.user.status]
+        )
+
+    def test_purge(self):
+        self.delete_account()
+        progress = list(AccountPurger(batch_size=2).iter_purge())
+        self.assertEqual(
+            [(p.model, p.deleted, p.done) for p in progress],
+            [
+                ("refresh_token.RefreshToken", 2, False),
+                ("refresh_token.RefreshToken", 1, False),
+                (settings.AUTH_USER_MODEL, 2, True),
+            ],
+        )
+        self.assertFalse(
+            get_user_model().objects.filter(pk=self.user.pk).exists()
+        )
+        self.assertFalse(UserStatus.objects.filter(user_id=self.user.pk).exists())
+        self.assertEqual(self.other.refresh_tokens.count(), 1)
+        self.assertEqual(purge_deleted_accounts(), 0)
+
+    def test_purge_command(self):
+        self.delete_account()
+        out = io.StringIO()
+        call_command("purge_deleted_accounts", "--batch-size", "2", stdout=out)
+        self.assertIn("user %s purged, 5 rows deleted" % self.user.pk, out.getvalue())
+        self.assertIn("Successfully purged 1 accounts", out.getvalue())
+        self.assertTrue(get_user_model().objects.filter(pk=self.other.pk).exists())
@@ -0,0 +1,32 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password
+
+from graphql_auth.hashers import PasswordHashingPool, bulk_set_passwords
+
+from .testCases import TestBase
+
+
+class HashersTestCase(TestBase):
+    def test_pool_keeps_order(self):
+        passwords = ["first-password", None, "third-password"]
+        with PasswordHashingPool(workers=2) as pool:
+            hashes = pool.hash(passwords)
+        self.assertTrue(check_password("first-password", hashes[0]))
+        self.assertFalse(check_password(None, hashes[1]))
+        self.assertTrue(check_password("third-password", hashes[2]))
+
+    def test_single_worker_hashes_in_process(self):
+        with PasswordHashingPool() as pool:
+            self.assertIsNone(pool.executor)
+            self.assertTrue(check_password("password", pool.hash(["password"])[0]))
+
+    def test_bulk_set_passwords(self):
+        users = [
+            self.register_user(email="foo@email.com", username="foo"),
+            self.register_user(email="bar@email.com", username="bar"),
+        ]
+        bulk_set_passwords(users, ["foo-password", "bar-password"], workers=2)
+        foo = get_user_model().objects.get(username="foo")
+        self.assertTrue(foo.check_password("foo-password"))
+        bar = get_user_model().objects.get(username="bar")
+        self.assertTrue(bar.check_password("bar-password"))
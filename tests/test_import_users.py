@@ -0,0 +1,153 @@
+import io
+import json
+import os
+import tempfile
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.management import call_command
+
+from graphql_auth.bulk import UserImporter, import_users, read_rows
+from graphql_auth.constants import Messages
+from graphql_auth.models import UserStatus
+
+from .decorators import skipif_django_31
+from .testCases import TestBase
+
+
+class ImportUsersTestCase(TestBase):
+    def setUp(self):
+        self.register_user(
+            email="taken@email.com",
+            username="taken",
+            secondary_email="secondary@email.com",
+        )
+
+    def test_import_users(self):
+        rows = [
+            {"username": "foo", "email": "foo@email.com", "password": "23kegbsi7g2k"},
+            {"username": "bar", "email": "bar@email.com"},
+        ]
+        result = import_users(rows, verified=True)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.errors, [])
+        foo = get_user_model().objects.get(username="foo")
+        self.assertTrue(foo.check_password("23kegbsi7g2k"))
+        self.assertTrue(foo.status.verified)
+        bar = get_user_model().objects.get(username="bar")
+        self.assertFalse(bar.has_usable_password())
+        self.assertEqual(UserStatus.objects.filter(verified=True).count(), 2)
+
+    def test_import_users_hashes_in_process_by_default(self):
+        rows = [{"username": "foo", "email": "foo@email.com", "password": "pass"}]
+        with mock.patch("graphql_auth.hashers.ProcessPoolExecutor") as executor:
+            result = import_users(rows)
+        self.assertEqual(result.created, 1)
+        executor.assert_not_called()
+
+    def test_import_users_hash_workers(self):
+        rows = [
+            {
+                "username": "user%s" % i,
+                "email": "user%s@email.com" % i,
+                "password": "pass%s-23kegbsi7g2k" % i,
+            }
+            for i in range(4)
+        ]
+        result = import_users(rows, hash_workers=2)
+        self.assertEqual(result.created, 4)
+        user = get_user_model().objects.get(username="user3")
+        self.assertTrue(user.check_password("pass3-23kegbsi7g2k"))
+
+    def test_import_users_errors(self):
+        rows = [
+            {"username": "taken", "email": "new@email.com"},
+            {"username": "new", "email": "TAKEN@email.com"},
+            {"username": "other", "email": "secondary@email.com"},
+            {"username": "invalid", "email": "not an email"},
+            {"email": "missing@email.com"},
+            {"username": "foo", "email": "foo@email.com"},
+            {"username": "foo", "email": "foo2@email.com"},
+        ]
+        result = import_users(rows, batch_size=3)
+        self.assertEqual(result.created, 1)
+        errors = dict(result.errors)
+        self.assertEqual(errors[1]["username"][0]["code"], "unique")
+        self.assertEqual(errors[2], {"email": Messages.EMAIL_IN_USE})
+        self.assertEqual(errors[3], {"email": Messages.EMAIL_IN_USE})
+        self.assertEqual(errors[4]["email"][0]["code"], "invalid")
+        self.assertEqual(errors[5]["username"][0]["code"], "required")
+        self.assertEqual(errors[7]["username"][0]["code"], "unique")
+
+    def test_import_users_without_email(self):
+        clean_row = UserImporter.clean_row
+
+        def clean_row_without_email(importer, row):
+            user, password, errors = clean_row(importer, row)
+            user.email = None  # a nullable email field
+            return user, password, errors
+
+        rows = [{"username": "foo", "email": "foo@email.com"}]
+        # the test user model has no nullable email, skip the inserts
+        with mock.patch.object(
+            UserImporter, "clean_row", clean_row_without_email
+        ), mock.patch.object(
+            get_user_model().objects, "bulk_create"
+        ) as create, mock.patch.object(
+            UserStatus.objects, "create_for_users"
+        ), mock.patch.object(
+            UserImporter, "load_pks"
+        ):
+            result = import_users(rows)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 1)
+        create.assert_called_once()
+
+    def test_import_chunk_queries(self):
+        rows = [
+            {"username": "user%s" % i, "email": "user%s@email.com" % i}
+            for i in range(50)
+        ]
+        # 3 uniqueness checks, users, pks reload, statuses, savepoint
+        with self.assertNumQueries(8):
+            result = import_users(rows, batch_size=50)
+        self.assertEqual(result.created, 50)
+
+    def test_read_rows(self):
+        csv_file = io.StringIO("username,email\nfoo,foo@email.com\n")
+        self.assertEqual(
+            list(read_rows(csv_file)), [{"username": "foo", "email": "foo@email.com"}]
+        )
+        jsonl_file = io.StringIO('{"username": "foo"}\n\n{"username": "bar"}\n')
+        self.assertEqual(
+            list(read_rows(jsonl_file, "jsonl")),
+            [{"username": "foo"}, {"username": "bar"}],
+        )
+
+    @skipif_django_31()
+    def test_command(self):
+        rows = [
+            {"username": "foo", "email": "foo@email.com", "password": "23kegbsi7g2k"},
+            {"username": "taken", "email": "bar@email.com"},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as f:
+            f.write("\n".join(json.dumps(row) for row in rows))
+        self.addCleanup(os.remove, f.name)
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command(
+                "import_users",
+                f.name,
+                hash_workers=1,
+                send_activation_email=True,
+                domain="testserver",
+                stdout=stdout,
+                stderr=stderr,
+            )
+        self.assertIn("Successfully imported 1 users (1 failed)", stdout.getvalue())
+        self.assertIn("line 2", stderr.getvalue())
+        self.assertTrue(get_user_model().objects.filter(username="foo").exists())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["foo@email.com"])
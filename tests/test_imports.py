@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.test import SimpleTestCase
+
+SCRIPT = """
+import json, sys
+import django
+django.setup()
+import graphql_auth.mutations, graphql_auth.relay
+print(json.dumps(sorted(sys.modules)))
+"""
+
+
+class LazyImportsTestCase(SimpleTestCase):
+    def test_mutations_defer_imports(self):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE="tests.settings")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        modules = json.loads(
+            subprocess.check_output([sys.executable, "-c", SCRIPT], env=env, cwd=root)
+        )
+        for module in ("requests", "graphql_auth.schema"):
+            self.assertNotIn(module, modules)
+
+    def test_forms_are_built_on_access(self):
+        from graphql_auth import forms
+
+        self.assertEqual(forms.RegisterForm.__name__, "RegisterForm")
+        self.assertIs(forms.RegisterForm, forms.RegisterForm)
+        self.assertEqual(forms.RegisterForm.__module__, "graphql_auth.forms")
@@ -0,0 +1,117 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from graphql_auth import instrumentation
+from graphql_auth.settings import graphql_auth_settings
+from graphql_auth.signals import mutation_stage_timed
+
+from .decorators import skipif_django_31
+from .testCases import DefaultTestCase
+
+
+class SpanTestCase(SimpleTestCase):
+    def test_disabled_span_is_noop(self):
+        self.assertIs(instrumentation.span("Register", "email"), instrumentation.NOOP_SPAN)
+
+    def test_sink(self):
+        sink = mock.Mock()
+        with mock.patch.object(graphql_auth_settings, "METRICS_SINK", sink):
+            with instrumentation.span("Register", "email"):
+                pass
+        mutation, stage, duration = sink.call_args[0]
+        self.assertEqual((mutation, stage), ("Register", "email"))
+        self.assertGreaterEqual(duration, 0)
+
+    def test_sink_error_is_logged(self):
+        sink = mock.Mock(side_effect=ValueError)
+        with mock.patch.object(graphql_auth_settings, "METRICS_SINK", sink):
+            with self.assertLogs("graphql_auth.instrumentation", "ERROR"):
+                with instrumentation.span("Register", "email"):
+                    pass
+
+    def test_timed_arguments(self):
+        fn = mock.Mock()
+        kwargs = {"mutation": 1, "stage": 2, "fn": 3}
+        with mock.patch.object(graphql_auth_settings, "METRICS_SINK", mock.Mock()):
+            instrumentation.timed("Register", "total", fn, ("root",), kwargs)
+        fn.assert_called_once_with("root", mutation=1, stage=2, fn=3)
+
+    def test_statsd_format(self):
+        sink = instrumentation.StatsdSink()
+        self.assertEqual(
+            sink.format("Register", "email", 0.0125),
+            "graphql_auth.Register.email:12.500|ms",
+        )
+
+    def test_prometheus_render(self):
+        sink = instrumentation.PrometheusSink(buckets=[0.1, 1])
+        sink("Register", "email", 0.05)
+        sink("Register", "email", 0.5)
+        sink("Register", "email", 5)
+        text = sink.render()
+        labels = 'mutation="Register",stage="email"'
+        self.assertIn(
+            'graphql_auth_stage_duration_seconds_bucket{%s,le="0.1"} 1' % labels, text
+        )
+        self.assertIn(
+            'graphql_auth_stage_duration_seconds_bucket{%s,le="1"} 2' % labels, text
+        )
+        self.assertIn(
+            'graphql_auth_stage_duration_seconds_bucket{%s,le="+Inf"} 3' % labels, text
+        )
+        self.assertIn("graphql_auth_stage_duration_seconds_count{%s} 3" % labels, text)
+
+
+class MutationStagesTestCase(DefaultTestCase):
+    def setUp(self):
+        self.user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+        self.stages = []
+        mutation_stage_timed.connect(self.receive)
+        self.addCleanup(mutation_stage_timed.disconnect, self.receive)
+
+    def receive(self, sender, mutation, stage, duration, **kwargs):
+        self.stages.append((mutation, stage))
+
+    def test_login_stages(self):
+        query = """
+        mutation {
+            tokenAuth(username: "foo", password: "%s")
+                { success }
+        }
+        """ % self.default_password
+        executed = self.make_request(query)
+        self.assertTrue(executed["success"])
+        self.assertEqual(
+            self.stages,
+            [
+                ("ObtainJSONWebToken", "user_lookup"),
+                ("ObtainJSONWebToken", "status"),
+                ("ObtainJSONWebToken", "authenticate"),
+                ("ObtainJSONWebToken", "total"),
+            ],
+        )
+
+    @skipif_django_31()
+    def test_register_stages(self):
+        query = """
+        mutation {
+            register(
+                email: "test@email.com",
+                username: "test",
+                password1: "akssdgfbwkc",
+                password2: "akssdgfbwkc"
+            )
+            { success }
+        }
+        """
+        # the email is sent on commit, here after the mutation
+        with self.captureOnCommitCallbacks(execute=True):
+            executed = self.make_request(query)
+        self.assertTrue(executed["success"])
+        self.assertEqual(
+            [stage for mutation, stage in self.stages],
+            ["form_validation", "create_user", "login", "total", "email"],
+        )
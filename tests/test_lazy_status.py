@@ -0,0 +1,83 @@
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.signals import post_save
+
+from graphql_auth.constants import StatusFlag
+from graphql_auth.models import UserStatus
+from graphql_auth.signals import create_user_status
+
+from .testCases import TestBase
+
+
+class LazyStatusTestCase(TestBase):
+    def test_status_is_created_on_save(self):
+        user = get_user_model().objects.create(username="foo", email="foo@email.com")
+        self.assertTrue(UserStatus.objects.filter(user=user).exists())
+
+    def test_existing_status_on_create(self):
+        def create_status(sender, instance, created, **kwargs):
+            if created:
+                UserStatus.objects.create(user=instance, verified=True)
+
+        # connected before create_user_status
+        User = get_user_model()
+        post_save.disconnect(create_user_status, sender=User)
+        post_save.connect(create_status, sender=User)
+        post_save.connect(create_user_status, sender=User)
+        self.addCleanup(post_save.disconnect, create_status, sender=User)
+        user = User.objects.create(username="foo", email="foo@email.com")
+        self.assertTrue(UserStatus.objects.get(user=user).verified)
+
+    def bulk_create_user(self):
+        get_user_model().objects.bulk_create(
+            [get_user_model()(username="foo", email="foo@email.com")]
+        )
+        return get_user_model().objects.get(username="foo")
+
+    def test_missing_status_is_not_created_on_access(self):
+        user = self.bulk_create_user()
+        self.assertFalse(user.status.verified)
+        self.assertFalse(UserStatus.objects.filter(user=user).exists())
+        with self.assertNumQueries(0):
+            user.status
+
+    def test_missing_status_is_inserted_on_save(self):
+        user = self.bulk_create_user()
+        user.status.verified = True
+        user.status.save(update_fields=["verified"])
+        status = UserStatus.objects.get(user=user)
+        self.assertTrue(status.verified)
+        self.assertEqual(status.flags, StatusFlag.VERIFIED)
+
+    def test_unsaved_user_has_no_status(self):
+        user = get_user_model()(username="foo")
+        with self.assertRaises(UserStatus.DoesNotExist):
+            user.status
+
+    def test_backfill_migration(self):
+        user = self.bulk_create_user()
+        migration = import_module("graphql_auth.migrations.0007_backfill_userstatus")
+        migration.backfill_statuses(apps, SimpleNamespace(connection=connection))
+        self.assertTrue(UserStatus.objects.filter(user=user).exists())
+        self.assertEqual(
+            UserStatus.objects.count(), get_user_model().objects.count()
+        )
+
+    def test_create_for_bulk_created_users(self):
+        get_user_model().objects.bulk_create(
+            [
+                get_user_model()(username="user%s" % i, email="user%s@email.com" % i)
+                for i in range(5)
+            ]
+        )
+        users = list(get_user_model().objects.all())
+        users[0].status.save()
+        with self.assertNumQueries(1):
+            UserStatus.objects.create_for_users(users, verified=True)
+        self.assertEqual(UserStatus.objects.count(), 5)
+        self.assertEqual(UserStatus.objects.filter(verified=True).count(), 4)
+        self.assertEqual(UserStatus.objects.with_flags(StatusFlag.VERIFIED).count(), 4)
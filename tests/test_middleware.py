@@ -0,0 +1,73 @@
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from graphene.test import Client
+from graphql_jwt.middleware import JSONWebTokenMiddleware as GrapheneMiddleware
+from graphql_jwt.shortcuts import get_token
+from graphql_jwt.utils import get_payload
+
+from graphql_auth.middleware import JSONWebTokenMiddleware
+
+from .schema import default_schema
+from .testCases import TestBase
+
+
+class MiddlewareTestCase(TestBase):
+    def setUp(self):
+        self.user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+
+    def get_request(self, token=None):
+        headers = {"HTTP_AUTHORIZATION": "JWT %s" % token} if token else {}
+        request = RequestFactory().post("/graphql/", **headers)
+        request.user = AnonymousUser()
+        JSONWebTokenMiddleware(lambda request: request)(request)
+        return request
+
+    def execute(self, request):
+        query = """
+        query {
+            users { edges { node { username, email, firstName, isActive } } }
+            me { username }
+        }
+        """
+        with mock.patch(
+            "graphql_auth.backends.get_payload", wraps=get_payload
+        ) as backend_decode:
+            executed = Client(default_schema).execute(
+                query, context=request, middleware=[GrapheneMiddleware()]
+            )
+        return executed, backend_decode.call_count
+
+    def test_authenticates_once(self):
+        request = self.get_request(get_token(self.user))
+        self.assertEqual(request.user, self.user)
+        self.assertIn("username", request._jwt_payload)
+
+        executed, decodes = self.execute(request)
+        self.assertEqual(executed["data"]["me"], {"username": "foo"})
+        self.assertEqual(decodes, 0)
+
+    def test_authenticates_lazily(self):
+        with mock.patch(
+            "graphql_auth.middleware.get_payload", wraps=get_payload
+        ) as decode:
+            request = self.get_request(get_token(self.user))
+            self.assertEqual(decode.call_count, 0)
+            self.assertEqual(request.user.pk, self.user.pk)
+            self.assertEqual(decode.call_count, 1)
+
+    def test_invalid_token(self):
+        request = self.get_request("invalid")
+        self.assertTrue(request.user.is_anonymous)
+
+        executed, decodes = self.execute(request)
+        self.assertIsNone(executed["data"]["me"])
+        self.assertEqual(decodes, 0)
+
+    def test_no_token(self):
+        request = self.get_request()
+        self.assertTrue(request.user.is_anonymous)
+        self.assertFalse(hasattr(request, "_jwt_payload"))
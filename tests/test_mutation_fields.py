@@ -0,0 +1,55 @@
+import graphene
+from django.test import SimpleTestCase
+
+from graphql_auth import mutations, relay
+
+
+class MutationFieldsTestCase(SimpleTestCase):
+    """
+    arguments and output fields are built when the class is created,
+    mounting a mutation does not change them
+    """
+
+    def assertFieldUnchanged(self, mutation, get_state):
+        before = get_state(mutation)
+        first = mutation.Field()
+        second = mutation.Field(name="other")
+        self.assertEqual(get_state(mutation), before)
+        self.assertEqual(list(first.args), list(second.args))
+
+    def test_arguments(self):
+        self.assertEqual(
+            list(mutations.Register._meta.arguments),
+            ["email", "username", "password1", "password2"],
+        )
+        for mutation in (
+            mutations.Register,
+            mutations.ObtainJSONWebToken,
+            mutations.PasswordChange,
+            mutations.RefreshToken,
+        ):
+            self.assertFieldUnchanged(
+                mutation,
+                lambda m: (list(m._meta.arguments), list(m._meta.fields)),
+            )
+
+    def test_login_arguments(self):
+        arguments = mutations.ObtainJSONWebToken._meta.arguments
+        self.assertEqual(list(arguments), ["email", "username", "password"])
+        self.assertIsInstance(arguments["password"].type, graphene.NonNull)
+
+    def test_relay_input(self):
+        for mutation in (relay.Register, relay.ObtainJSONWebToken):
+            self.assertFieldUnchanged(
+                mutation,
+                lambda m: list(m._meta.arguments["input"]._meta.fields),
+            )
+        self.assertIn(
+            "password", relay.ObtainJSONWebToken._meta.arguments["input"]._meta.fields
+        )
+
+    def test_token_fields(self):
+        self.assertIn("token", mutations.PasswordChange._meta.fields)
+        self.assertIn("refresh_token", mutations.PasswordChange._meta.fields)
+        self.assertIn("token", mutations.ObtainJSONWebToken._meta.fields)
+        self.assertIn("refresh_token", mutations.RefreshToken._meta.fields)
@@ -1,6 +1,9 @@
-from django.contrib.auth import get_user_model
+from unittest import mock
+
+from django.contrib.auth import base_user, get_user_model, hashers
 
 from graphql_jwt.refresh_token.models import RefreshToken
+from graphql_jwt.utils import get_payload
 
 from .testCases import RelayTestCase, DefaultTestCase
 
@@ -32,6 +35,39 @@ class PasswordChangeTestCaseMixin:
         self.user.refresh_from_db()
         self.assertFalse(self.old_pass == self.user.password)
 
+    @mock.patch("graphql_jwt.decorators.authenticate")
+    def test_password_change_issues_token_without_authenticate(self, authenticate):
+        variables = {"user": self.user}
+        executed = self.make_request(self.get_query(), variables)
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(get_payload(executed["token"])["username"], "gaa")
+        authenticate.assert_not_called()
+
+    def test_password_change_no_token_for_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+        variables = {"user": self.user}
+        executed = self.make_request(self.get_query(), variables)
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.UNAUTHENTICATED)
+        self.assertFalse(executed["token"])
+        self.assertFalse(executed["refreshToken"])
+
+    def test_password_change_hashes_once(self):
+        """
+        the old password is checked once and the new one hashed once
+        """
+        variables = {"user": self.user}
+        with mock.patch.object(
+            base_user, "check_password", wraps=hashers.check_password
+        ) as check, mock.patch.object(
+            base_user, "make_password", wraps=hashers.make_password
+        ) as make:
+            executed = self.make_request(self.get_query(), variables)
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(check.call_count, 1)
+        self.assertEqual(make.call_count, 1)
+
     def test_setting_same_password(self):
         """
         set same password
@@ -0,0 +1,134 @@
+import asyncio
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from graphql_auth import profiling
+from graphql_auth.exceptions import WrongUsage
+from graphql_auth.settings import graphql_auth_settings
+
+from .testCases import DefaultTestCase
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+def outer():
+    return fib(10)
+
+
+class ProfilerTestCase(SimpleTestCase):
+    def test_cprofile_collapsed_stacks(self):
+        profiler = profiling.CProfileProfiler()
+        profiler.start()
+        outer()
+        profiler.stop()
+        stacks = profiler.collapsed()
+        self.assertTrue(
+            any(
+                stack[-2].startswith("outer (") and stack[-1].startswith("fib (")
+                for stack in stacks
+                if len(stack) > 1
+            )
+        )
+        self.assertTrue(all(";" not in frame for stack in stacks for frame in stack))
+
+    def test_unknown_profiler(self):
+        with mock.patch.object(graphql_auth_settings, "PROFILER", "perf"):
+            with self.assertRaises(WrongUsage):
+                profiling.get_profiler()
+
+    def test_disabled(self):
+        self.assertIsNone(profiling.should_profile())
+
+    @mock.patch.object(graphql_auth_settings, "PROFILE_SAMPLE_RATE", 1)
+    @mock.patch("graphql_auth.profiling.dump")
+    def test_arguments(self, dump):
+        fn = mock.Mock()
+        profiling.profiled("Register", fn, ("root",), {"mutation": 1, "fn": 2})
+        fn.assert_called_once_with("root", mutation=1, fn=2)
+        dump.assert_called_once()
+
+    @mock.patch.object(graphql_auth_settings, "PROFILE_SAMPLE_RATE", 1)
+    @mock.patch("graphql_auth.profiling.dump")
+    def test_coroutine_is_paused_while_waiting(self, dump):
+        active = []
+
+        def is_active():
+            active.append(getattr(profiling._local, "active", False))
+
+        async def mutation():
+            is_active()
+            await asyncio.sleep(0)
+            is_active()
+            return "result"
+
+        async def other():
+            is_active()
+
+        async def run():
+            return await asyncio.gather(
+                profiling.profiled("Register", mutation), other()
+            )
+
+        self.assertEqual(async_to_sync(run)(), ["result", None])
+        # the other task runs while the mutation waits
+        self.assertEqual(active, [True, False, True])
+        dump.assert_called_once()
+
+
+class ProfiledMutationTestCase(DefaultTestCase):
+    def setUp(self):
+        self.user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        patcher = mock.patch.object(
+            graphql_auth_settings, "PROFILE_DIR", self.directory
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self):
+        query = """
+        mutation {
+            tokenAuth(username: "foo", password: "%s")
+                { success }
+        }
+        """ % self.default_password
+        executed = self.make_request(query)
+        self.assertTrue(executed["success"])
+
+    def test_sampled(self):
+        with mock.patch.object(graphql_auth_settings, "PROFILE_SAMPLE_RATE", 1):
+            self.login()
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 1)
+        self.assertTrue(files[0].startswith("ObtainJSONWebToken-"))
+        self.assertIn("-sampled-", files[0])
+        with open(os.path.join(self.directory, files[0])) as f:
+            self.assertIn("resolve_mutation", f.read())
+
+    def test_slow(self):
+        with mock.patch.object(graphql_auth_settings, "PROFILE_SLOW_THRESHOLD", 0):
+            self.login()
+        files = os.listdir(self.directory)
+        self.assertEqual(len(files), 1)
+        self.assertIn("-slow-", files[0])
+
+    def test_fast_is_not_written(self):
+        with mock.patch.object(graphql_auth_settings, "PROFILE_SLOW_THRESHOLD", 60):
+            self.login()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_write_error_is_logged(self):
+        with mock.patch.object(graphql_auth_settings, "PROFILE_SAMPLE_RATE", 1):
+            with mock.patch("graphql_auth.profiling.dump", side_effect=OSError):
+                with self.assertLogs("graphql_auth.profiling", "ERROR"):
+                    self.login()
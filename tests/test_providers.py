@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import time
+import weakref
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.test import SimpleTestCase
+
+from graphql_auth import providers
+from graphql_auth.settings import graphql_auth_settings
+
+
+class RecaptchaProviderTestCase(SimpleTestCase):
+    @mock.patch.object(graphql_auth_settings, "RECAPTCHA_SECRET_KET", "secret")
+    def test_validate_recaptcha_reuses_session(self):
+        session = providers.get_session()
+        response = mock.Mock(json=mock.Mock(return_value={"success": True}))
+        with mock.patch.object(session, "post", return_value=response) as post:
+            providers.validate_recaptcha("token")
+            providers.validate_recaptcha("token")
+        self.assertIs(providers.get_session(), session)
+        self.assertEqual(post.call_count, 2)
+        self.assertEqual(
+            post.call_args[1]["timeout"], graphql_auth_settings.RECAPTCHA_TIMEOUT
+        )
+
+    @mock.patch.object(providers, "import_httpx", mock.Mock(return_value=None))
+    @mock.patch.object(providers, "_async_clients", weakref.WeakKeyDictionary())
+    @mock.patch.object(graphql_auth_settings, "RECAPTCHA_MAX_CONCURRENCY", 2)
+    def test_avalidate_recaptcha_concurrency(self):
+        lock = threading.Lock()
+        running = max_running = 0
+
+        def validate_recaptcha(token):
+            nonlocal running, max_running
+            with lock:
+                running += 1
+                max_running = max(max_running, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+            return {"success": True}
+
+        async def validate_many():
+            return await asyncio.gather(
+                *[providers.avalidate_recaptcha("token") for _ in range(6)]
+            )
+
+        with mock.patch.object(providers, "validate_recaptcha", validate_recaptcha):
+            results = async_to_sync(validate_many)()
+        self.assertEqual(results, [{"success": True}] * 6)
+        self.assertEqual(max_running, 2)
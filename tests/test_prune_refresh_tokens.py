@@ -0,0 +1,81 @@
+import io
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.utils import timezone
+from graphql_jwt.refresh_token.models import RefreshToken
+from graphql_jwt.refresh_token.shortcuts import create_refresh_token
+
+from graphql_auth.refresh_tokens import (
+    RefreshTokenPruner,
+    limit_sessions,
+    prune_refresh_tokens,
+)
+from graphql_auth.utils import revoke_user_refresh_token
+
+from .testCases import TestBase
+
+
+class PruneRefreshTokensTestCase(TestBase):
+    def setUp(self):
+        self.user = self.register_user(email="foo@email.com", username="foo")
+        self.other = self.register_user(email="bar@email.com", username="bar")
+        now = timezone.now()
+        self.tokens = [create_refresh_token(self.user) for _ in range(5)]
+        for i, token in enumerate(self.tokens):
+            RefreshToken.objects.filter(pk=token.pk).update(
+                created=now - timedelta(hours=5 - i)
+            )
+        self.expired = create_refresh_token(self.user)
+        RefreshToken.objects.filter(pk=self.expired.pk).update(
+            created=now - timedelta(days=8)
+        )
+        self.revoked = create_refresh_token(self.other)
+        self.revoked.revoke()
+        self.live = create_refresh_token(self.other)
+
+    def remaining(self):
+        return set(RefreshToken.objects.values_list("pk", flat=True))
+
+    def test_prune(self):
+        pruner = RefreshTokenPruner(batch_size=1)
+        self.assertEqual(
+            list(pruner.iter_prune()), [("expired", 1), ("revoked", 1)]
+        )
+        self.assertEqual(
+            self.remaining(), {t.pk for t in self.tokens} | {self.live.pk}
+        )
+
+    def test_keep_revoked(self):
+        self.assertEqual(prune_refresh_tokens(revoked_days=None), {"expired": 1})
+        self.assertEqual(prune_refresh_tokens(revoked_days=1), {})
+        self.assertIn(self.revoked.pk, self.remaining())
+
+    def test_max_sessions(self):
+        counts = prune_refresh_tokens(max_sessions=2, revoked_days=None)
+        self.assertEqual(counts, {"sessions": 3, "expired": 1})
+        live = RefreshToken.objects.filter(revoked=None)
+        self.assertEqual(
+            set(live.values_list("pk", flat=True)),
+            {self.tokens[3].pk, self.tokens[4].pk, self.live.pk},
+        )
+
+    def test_limit_sessions(self):
+        self.assertEqual(limit_sessions(self.user.pk, 4), 1)
+        self.assertEqual(limit_sessions(self.user.pk, 4), 0)
+        self.assertIsNotNone(RefreshToken.objects.get(pk=self.tokens[0].pk).revoked)
+
+    def test_revoke_keeps_the_revoked_date(self):
+        revoked = RefreshToken.objects.get(pk=self.revoked.pk).revoked
+        revoke_user_refresh_token(self.other)
+        self.assertEqual(RefreshToken.objects.get(pk=self.revoked.pk).revoked, revoked)
+        self.assertIsNotNone(RefreshToken.objects.get(pk=self.live.pk).revoked)
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("prune_refresh_tokens", "--max-sessions", "1", stdout=out)
+        self.assertIn(
+            "Successfully pruned 1 expired and 5 revoked tokens, revoked 4 sessions",
+            out.getvalue(),
+        )
+        self.assertEqual(self.remaining(), {self.tokens[4].pk, self.live.pk})
@@ -0,0 +1,128 @@
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.utils import timezone
+from graphql_jwt.refresh_token.shortcuts import create_refresh_token
+
+from graphql_auth.deletion import (
+    AccountPurger,
+    StaleAccountPurger,
+    purge_stale_accounts,
+)
+from graphql_auth.models import UserStatus
+
+from .testCases import TestBase
+
+
+class PurgeStaleAccountsTestCase(TestBase):
+    def setUp(self):
+        old = timezone.now() - timedelta(days=100)
+        self.unverified = self.register_user(email="a@email.com", username="a")
+        self.archived = self.register_user(
+            email="b@email.com",
+            username="b",
+            verified=True,
+            archived=True,
+            secondary_email="b2@email.com",
+        )
+        self.recent_login = self.register_user(
+            email="c@email.com", username="c", archived=True
+        )
+        self.recent = self.register_user(email="d@email.com", username="d")
+        self.verified = self.register_user(
+            email="e@email.com", username="e", verified=True
+        )
+        get_user_model().objects.exclude(pk=self.recent.pk).update(date_joined=old)
+        get_user_model().objects.filter(pk=self.recent_login.pk).update(
+            last_login=timezone.now()
+        )
+        create_refresh_token(self.archived)
+
+    def remaining(self):
+        return set(get_user_model().objects.values_list("username", flat=True))
+
+    def test_report(self):
+        purger = StaleAccountPurger(unverified_days=30, archived_days=30)
+        self.assertEqual(purger.report(), {"unverified": 1, "archived": 1})
+        self.assertEqual(StaleAccountPurger(archived_days=30).report(), {"archived": 1})
+
+    def test_delete(self):
+        purger = StaleAccountPurger(unverified_days=30, archived_days=30, batch_size=1)
+        self.assertEqual(list(purger.iter_batches()), [1, 1])
+        self.assertEqual(self.remaining(), {"c", "d", "e"})
+        self.assertEqual(UserStatus.objects.count(), 3)
+
+    def test_delete_through_account_purger(self):
+        patch = mock.patch.object(
+            AccountPurger,
+            "purge_user",
+            autospec=True,
+            side_effect=AccountPurger.purge_user,
+        )
+        with patch as purge_user:
+            self.assertEqual(purge_stale_accounts(archived_days=30), 1)
+        self.assertEqual(purge_user.call_args[0][1].pk, self.archived.pk)
+        self.assertEqual(self.remaining(), {"a", "c", "d", "e"})
+
+    def test_user_without_status(self):
+        UserStatus.objects.filter(user=self.unverified).delete()
+        purger = StaleAccountPurger(unverified_days=30)
+        self.assertEqual(purger.report(), {"unverified": 1})
+        self.assertEqual(purger.run(), 1)
+        self.assertEqual(self.remaining(), {"b", "c", "d", "e"})
+
+    def test_skip_staff(self):
+        get_user_model().objects.filter(pk=self.unverified.pk).update(is_staff=True)
+        get_user_model().objects.filter(pk=self.archived.pk).update(is_superuser=True)
+        self.assertEqual(purge_stale_accounts(unverified_days=30, archived_days=30), 0)
+        self.assertEqual(
+            purge_stale_accounts(
+                unverified_days=30, archived_days=30, include_staff=True
+            ),
+            2,
+        )
+
+    def test_skip_pending_deletion(self):
+        UserStatus.request_deletion(self.unverified)
+        self.assertEqual(purge_stale_accounts(unverified_days=30), 0)
+
+    def test_anonymize(self):
+        processed = purge_stale_accounts(
+            unverified_days=30, archived_days=30, anonymize=True
+        )
+        self.assertEqual(processed, 2)
+        user = get_user_model().objects.get(pk=self.archived.pk)
+        self.assertEqual(user.username, "anonymized-%s" % user.pk)
+        self.assertEqual(user.email, "")
+        self.assertEqual(user.first_name, "")
+        self.assertFalse(user.is_active)
+        self.assertFalse(user.has_usable_password())
+        self.assertIsNone(user.status.secondary_email)
+        self.assertFalse(user.refresh_tokens.filter(revoked=None).exists())
+        self.assertEqual(get_user_model().objects.count(), 5)
+        # anonymized accounts are not processed again
+        self.assertEqual(
+            purge_stale_accounts(unverified_days=30, archived_days=30, anonymize=True),
+            0,
+        )
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command(
+            "purge_stale_accounts", "--unverified-days", "30", "--dry-run", stdout=out
+        )
+        self.assertIn("1 unverified accounts would be deleted", out.getvalue())
+        self.assertEqual(len(self.remaining()), 5)
+
+        out = io.StringIO()
+        call_command("purge_stale_accounts", "--unverified-days", "30", stdout=out)
+        self.assertIn("Successfully deleted 1 accounts", out.getvalue())
+        self.assertEqual(self.remaining(), {"b", "c", "d", "e"})
+
+    def test_command_requires_an_age(self):
+        with self.assertRaises(CommandError):
+            call_command("purge_stale_accounts")
@@ -4,9 +4,15 @@ from unittest import mock
 from pytest import mark
 
 from django.contrib.auth import get_user_model
+from django.core import mail
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TransactionTestCase
+from graphene.test import Client
+from graphql_jwt.utils import get_payload
 
+from .schema import default_schema
 from .testCases import RelayTestCase, DefaultTestCase
-from .decorators import skipif_django_21
+from .decorators import skipif_django_21, skipif_django_31
 
 from graphql_auth.constants import Messages
 from graphql_auth.signals import user_registered
@@ -24,6 +30,7 @@ class RegisterTestCaseMixin:
         self.assertEqual(executed["success"], False)
         self.assertTrue(executed["errors"])
 
+    @skipif_django_31()
     def test_register(self):
         """
         Register user, fail to register same user again
@@ -37,8 +44,9 @@ class RegisterTestCaseMixin:
 
         user_registered.connect(receive_signal)
 
-        # register
-        executed = self.make_request(self.register_query())
+        # register, the signal is sent on commit
+        with self.captureOnCommitCallbacks(execute=True):
+            executed = self.make_request(self.register_query())
         self.assertEqual(executed["success"], True)
         self.assertEqual(executed["errors"], None)
         self.assertTrue(executed["token"])
@@ -84,15 +92,39 @@ class RegisterTestCaseMixin:
         self.assertFalse(executed["token"])
         self.assertFalse(executed["refreshToken"])
 
+    @mock.patch("graphql_jwt.decorators.authenticate")
+    def test_register_issues_token_without_authenticate(self, authenticate):
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(get_payload(executed["token"])["username"], "username")
+        authenticate.assert_not_called()
+
+    @mock.patch(
+        "django.contrib.auth.backends.ModelBackend.user_can_authenticate",
+        mock.MagicMock(return_value=False),
+    )
+    def test_register_no_token_for_user_that_cannot_authenticate(self):
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.UNAUTHENTICATED)
+        self.assertFalse(executed["token"])
+        self.assertFalse(executed["refreshToken"])
+
+    @skipif_django_31()
     @mock.patch(
         "graphql_auth.models.UserStatus.send_activation_email",
         mock.MagicMock(side_effect=SMTPException),
     )
     def test_register_email_send_fail(self):
-        executed = self.make_request(self.register_query())
-        self.assertEqual(executed["success"], False)
-        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
-        self.assertEqual(len(get_user_model().objects.all()), 0)
+        """
+        inside a transaction, the email is sent on commit
+        and a failure is logged, the user is kept
+        """
+        with self.assertLogs("graphql_auth.mixins", "ERROR"):
+            with self.captureOnCommitCallbacks(execute=True):
+                executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(len(get_user_model().objects.all()), 1)
 
     @mark.settings_b
     @skipif_django_21()
@@ -193,3 +225,36 @@ class RegisterRelayTestCase(RegisterTestCaseMixin, RelayTestCase):
         """ % (
             token
         )
+
+
+class RegisterCommitTestCase(TransactionTestCase):
+    """
+    with no outer transaction, the emails are sent on commit,
+    before the mutation returns
+    """
+
+    query = RegisterTestCase.register_query
+
+    def register(self):
+        request = RequestFactory().post("/graphql/")
+        request.user = AnonymousUser()
+        executed = Client(default_schema).execute(
+            self.query(), context=request
+        )
+        return executed["data"]["register"]
+
+    def test_register_sends_email(self):
+        executed = self.register()
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(len(mail.outbox), 1)
+
+    @mock.patch(
+        "graphql_auth.models.UserStatus.send_activation_email",
+        mock.MagicMock(side_effect=SMTPException),
+    )
+    def test_register_email_send_fail(self):
+        with self.assertLogs("graphql_auth.mixins", "ERROR"):
+            executed = self.register()
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.EMAIL_FAIL)
+        self.assertEqual(len(get_user_model().objects.all()), 1)
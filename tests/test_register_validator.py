@@ -0,0 +1,177 @@
+from unittest import mock
+
+from pytest import mark
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.forms.models import fields_for_model
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from graphql_auth import forms
+from graphql_auth.forms import RegisterValidator
+from graphql_auth.settings import graphql_auth_settings
+
+from .testCases import DefaultTestCase
+
+PASSWORD = "akssdgfbwkc"
+
+
+class RegisterValidatorTestCase(TestCase):
+    """
+    the validator errors are the same as the form ones
+    """
+
+    cases = [
+        {},
+        {"email": "new@email.com", "username": "new"},
+        {"email": "new@email.com", "username": "new", "password1": PASSWORD},
+        {
+            "email": "invalid",
+            "username": "in valid",
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        },
+        {
+            "email": "new@email.com",
+            "username": "new",
+            "password1": PASSWORD,
+            "password2": "other" + PASSWORD,
+        },
+        {
+            "email": "new@email.com",
+            "username": "new",
+            "password1": "123",
+            "password2": "123",
+        },
+        {
+            "email": "new@email.com",
+            "username": "newnewnew",
+            "password1": "newnewnew",
+            "password2": "newnewnew",
+        },
+        {
+            "email": "foo@email.com",
+            "username": "foo",
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        },
+        {
+            "email": "new@email.com",
+            "username": "x" * 200,
+            "password1": PASSWORD,
+            "password2": PASSWORD,
+        },
+    ]
+
+    def setUp(self):
+        self.user = get_user_model().objects.create(
+            username="foo", email="foo@email.com", first_name="foo"
+        )
+
+    def assertSameErrors(self, form_class, cases, **options):
+        validator = RegisterValidator(form_class, **options)
+        for data in cases:
+            with self.subTest(data=data):
+                form = form_class(data)
+                validation = validator(data)
+                self.assertEqual(validation.is_valid(), form.is_valid())
+                self.assertEqual(
+                    validation.errors.get_json_data(), form.errors.get_json_data()
+                )
+
+    def test_register_form(self):
+        self.assertSameErrors(forms.RegisterForm, self.cases)
+
+    def test_password_less_register_form(self):
+        self.assertSameErrors(
+            forms.PasswordLessRegisterForm, self.cases, passwordless=True
+        )
+
+    @mark.settings_b
+    def test_unique_together(self):
+        form_class = forms.build_register_form()
+        form_class._meta.fields = form_class._meta.fields + [
+            "first_name",
+            "last_name",
+        ]
+        form_class.base_fields.update(
+            fields_for_model(get_user_model(), ["first_name", "last_name"])
+        )
+        self.user.last_name = "bar"
+        self.user.save()
+        self.assertSameErrors(
+            form_class,
+            [
+                dict(case, first_name="foo", last_name="bar")
+                for case in self.cases[-2:]
+            ],
+        )
+
+    def test_single_unique_query(self):
+        data = self.cases[-2]
+        validation = RegisterValidator(forms.RegisterForm)(data)
+        with CaptureQueriesContext(connection) as context:
+            self.assertFalse(validation.is_valid())
+        self.assertEqual(len(context.captured_queries), 1)
+
+    def test_unique_checks_read_every_row(self):
+        def get_queryset(manager):
+            return QuerySet(manager.model).none()
+
+        manager_class = type(get_user_model()._default_manager)
+        with mock.patch.object(manager_class, "get_queryset", get_queryset):
+            validation = RegisterValidator(forms.RegisterForm)(self.cases[-2])
+            self.assertFalse(validation.is_valid())
+        self.assertIn("username", validation.errors)
+
+    def test_private_model_api_mismatch(self):
+        with mock.patch.object(
+            forms.RegisterValidation, "unique_errors", side_effect=TypeError
+        ):
+            self.assertSameErrors(forms.RegisterForm, self.cases)
+
+    def test_save(self):
+        data = self.cases[1].copy()
+        data.update(password1=PASSWORD, password2=PASSWORD)
+        validation = RegisterValidator(forms.RegisterForm)(data)
+        self.assertTrue(validation.is_valid())
+        user = validation.save()
+        self.assertTrue(user.pk)
+        self.assertTrue(user.check_password(PASSWORD))
+
+        data.update(email="other@email.com", username="other")
+        validation = RegisterValidator(forms.RegisterForm, passwordless=True)(data)
+        self.assertTrue(validation.is_valid())
+        self.assertFalse(validation.save().has_usable_password())
+
+
+@mock.patch.object(graphql_auth_settings, "REGISTER_FAST_VALIDATION", True)
+class FastRegisterTestCase(DefaultTestCase):
+    def register_query(self, username="new", password=PASSWORD):
+        return """
+        mutation {
+            register(
+                email: "%s@email.com",
+                username: "%s",
+                password1: "%s",
+                password2: "%s"
+            )
+            { success, errors }
+        }
+        """ % (
+            username,
+            username,
+            password,
+            password,
+        )
+
+    def test_register(self):
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(get_user_model().objects.get().username, "new")
+
+        executed = self.make_request(self.register_query())
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["username"][0]["code"], "unique")
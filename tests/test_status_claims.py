@@ -0,0 +1,116 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from graphql_auth.claims import jwt_payload
+from graphql_auth.constants import Messages, StatusFlag
+from graphql_auth.models import UserStatus
+from graphql_auth.settings import graphql_auth_settings
+
+from .decorators import skipif_django_31
+from .testCases import DefaultTestCase
+
+
+@mock.patch.object(graphql_auth_settings, "JWT_STATUS_CLAIMS", True)
+class StatusClaimsTestCase(DefaultTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+
+    def get_query(self):
+        return """
+        mutation {
+            updateAccount(firstName: "firstname")
+                { success, errors }
+        }
+        """
+
+    def status_queries(self, variables):
+        with CaptureQueriesContext(connection) as context:
+            executed = self.make_request(self.get_query(), variables)
+        queries = [q for q in context.captured_queries if "userstatus" in q["sql"]]
+        return executed, queries
+
+    def test_payload_contains_status(self):
+        payload = jwt_payload(self.user)
+        self.assertEqual(
+            payload["status"],
+            {"flags": self.user.status.flags, "version": self.user.status.version},
+        )
+
+    @skipif_django_31()
+    def test_stale_instance_keeps_flags_and_version(self):
+        stale = UserStatus.objects.get(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserStatus.block(self.user)
+        blocked = UserStatus.objects.get(user=self.user)
+
+        stale.secondary_email = "bar@email.com"
+        stale.save(update_fields=["secondary_email"])
+        status = UserStatus.objects.get(user=self.user)
+        self.assertEqual(status.flags, blocked.flags)
+        self.assertEqual(status.version, blocked.version)
+
+        stale.archived = True
+        stale.save(update_fields=["archived"])
+        status = UserStatus.objects.get(user=self.user)
+        self.assertTrue(status.has_flags(StatusFlag.BLOCKED | StatusFlag.ARCHIVED))
+        self.assertEqual(status.version, blocked.version + 1)
+        self.assertEqual(stale.version, status.version)
+
+    @skipif_django_31()
+    def test_queryset_update_invalidates_claims(self):
+        payload = jwt_payload(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserStatus.objects.filter(user=self.user).update(blocked=True)
+        user = type(self.user).objects.get(pk=self.user.pk)
+        variables = {"user": user, "_jwt_payload": payload}
+        executed, queries = self.status_queries(variables)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.BLOCKED)
+
+    def test_current_claims_skip_status_query(self):
+        UserStatus.cache_version(self.user.pk)
+        user = type(self.user).objects.get(pk=self.user.pk)
+        variables = {"user": user, "_jwt_payload": jwt_payload(self.user)}
+        executed, queries = self.status_queries(variables)
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(queries, [])
+
+    @skipif_django_31()
+    def test_stale_claims_fall_back_to_database(self):
+        payload = jwt_payload(self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserStatus.block(self.user)
+        user = type(self.user).objects.get(pk=self.user.pk)
+        variables = {"user": user, "_jwt_payload": payload}
+        executed, queries = self.status_queries(variables)
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.BLOCKED)
+        self.assertTrue(queries)
+
+    def test_missing_cache_reads_the_version(self):
+        payload = jwt_payload(self.user)
+        cache.clear()
+        user = type(self.user).objects.get(pk=self.user.pk)
+        variables = {"user": user, "_jwt_payload": payload}
+        executed, queries = self.status_queries(variables)
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            cache.get(UserStatus.version_cache_key(self.user.pk)),
+            payload["status"]["version"],
+        )
+
+    def test_missing_cache_does_not_trust_stale_claims(self):
+        payload = jwt_payload(self.user)
+        # blocked by another process, its cache is not this one
+        UserStatus.block(self.user)
+        cache.clear()
+        user = type(self.user).objects.get(pk=self.user.pk)
+        variables = {"user": user, "_jwt_payload": payload}
+        executed, queries = self.status_queries(variables)
+        self.assertEqual(executed["errors"]["nonFieldErrors"], Messages.BLOCKED)
@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.db import connection, models
+
+from graphql_auth.constants import StatusFlag
+from graphql_auth.models import UserStatus
+
+from .testCases import TestBase
+
+
+class StatusFlagsTestCase(TestBase):
+    def setUp(self):
+        self.verified_user = self.register_user(
+            email="foo@email.com", username="foo", verified=True
+        )
+        self.archived_user = self.register_user(
+            email="bar@email.com", username="bar", verified=True, archived=True
+        )
+        self.blocked_user = self.register_user(
+            email="gaa@email.com", username="gaa", blocked=True
+        )
+
+    def test_flags_are_packed_on_save(self):
+        self.assertEqual(self.verified_user.status.flags, StatusFlag.VERIFIED)
+        self.assertEqual(
+            self.archived_user.status.flags, StatusFlag.VERIFIED | StatusFlag.ARCHIVED
+        )
+        self.assertEqual(self.blocked_user.status.flags, StatusFlag.BLOCKED)
+
+    def test_flags_follow_update_fields(self):
+        UserStatus.block(self.verified_user)
+        status = UserStatus.objects.get(user=self.verified_user)
+        self.assertEqual(status.flags, StatusFlag.VERIFIED | StatusFlag.BLOCKED)
+        self.assertTrue(status.has_flags(StatusFlag.VERIFIED | StatusFlag.BLOCKED))
+        self.assertFalse(status.has_flags(StatusFlag.ARCHIVED | StatusFlag.BLOCKED))
+        self.assertTrue(status.has_any_flags(StatusFlag.ARCHIVED | StatusFlag.BLOCKED))
+
+    def test_queryset_filters(self):
+        self.assertEqual(
+            set(UserStatus.objects.with_flags(StatusFlag.VERIFIED)),
+            {self.verified_user.status, self.archived_user.status},
+        )
+        self.assertEqual(
+            set(
+                UserStatus.objects.with_any_flags(
+                    StatusFlag.ARCHIVED | StatusFlag.BLOCKED
+                )
+            ),
+            {self.archived_user.status, self.blocked_user.status},
+        )
+        self.assertEqual(
+            set(UserStatus.objects.without_flags(StatusFlag.VERIFIED)),
+            {self.blocked_user.status},
+        )
+
+    def test_lookup_across_relation(self):
+        users = get_user_model().objects.filter(
+            status__flags__has_all=StatusFlag.VERIFIED | StatusFlag.ARCHIVED
+        )
+        self.assertEqual(list(users), [self.archived_user])
+
+    def test_update_keeps_flags(self):
+        UserStatus.objects.filter(user=self.verified_user).update(archived=True)
+        status = UserStatus.objects.get(user=self.verified_user)
+        self.assertEqual(status.flags, StatusFlag.VERIFIED | StatusFlag.ARCHIVED)
+
+        UserStatus.objects.filter(user=self.archived_user).update(
+            verified=models.Value(False)
+        )
+        status = UserStatus.objects.get(user=self.archived_user)
+        self.assertEqual(status.flags, StatusFlag.ARCHIVED)
+
+    def test_bulk_update_keeps_flags(self):
+        status = self.blocked_user.status
+        status.blocked = False
+        status.verified = True
+        UserStatus.objects.bulk_update([status], ["blocked", "verified"])
+        status = UserStatus.objects.get(user=self.blocked_user)
+        self.assertEqual(status.flags, StatusFlag.VERIFIED)
+
+    def test_sync_flags_after_raw_sql(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE %s SET archived = %%s" % UserStatus._meta.db_table, [True]
+            )
+        self.assertEqual(UserStatus.objects.with_flags(StatusFlag.ARCHIVED).count(), 1)
+        UserStatus.objects.sync_flags()
+        self.assertEqual(UserStatus.objects.with_flags(StatusFlag.ARCHIVED).count(), 3)
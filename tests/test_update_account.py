@@ -1,5 +1,7 @@
 from pytest import mark
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from .testCases import RelayTestCase, DefaultTestCase
 from .decorators import skipif_django_21
@@ -38,6 +40,31 @@ class UpdateAccountTestCaseMixin:
         self.user2.refresh_from_db()
         self.assertEqual(self.user2.first_name, "firstname")
 
+    def test_update_account_writes_changed_fields(self):
+        self.user2.last_name = "last"
+        self.user2.save()
+        variables = {"user": self.user2}
+        with CaptureQueriesContext(connection) as context:
+            executed = self.make_request(self.get_query(), variables)
+        self.assertEqual(executed["success"], True)
+        updates = [q["sql"] for q in context.captured_queries if "UPDATE" in q["sql"]]
+        self.assertEqual(len(updates), 1)
+        self.assertIn("first_name", updates[0])
+        self.assertNotIn("last_name", updates[0])
+        self.assertNotIn("password", updates[0])
+        self.user2.refresh_from_db()
+        self.assertEqual(self.user2.first_name, "firstname")
+        self.assertEqual(self.user2.last_name, "last")
+
+    def test_update_account_unchanged(self):
+        variables = {"user": self.user2}
+        with CaptureQueriesContext(connection) as context:
+            executed = self.make_request(self.get_query("bar"), variables)
+        self.assertEqual(executed["success"], True)
+        self.assertFalse(
+            [q for q in context.captured_queries if "UPDATE" in q["sql"]]
+        )
+
     def test_invalid_form(self):
         variables = {"user": self.user2}
         executed = self.make_request(
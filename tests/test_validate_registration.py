@@ -0,0 +1,123 @@
+from unittest import mock
+
+from django.contrib.auth import base_user
+from django.core.cache import cache
+
+from .testCases import RelayTestCase, DefaultTestCase
+
+from graphql_auth.constants import Messages
+
+
+class ValidateRegistrationTestCaseMixin:
+    def setUp(self):
+        cache.clear()
+        self.user = self.register_user(email="foo@email.com", username="foo")
+
+    def test_free_fields(self):
+        executed = self.make_request(
+            self.get_query(email="new@email.com", username="new")
+        )
+        self.assertEqual(executed["success"], True)
+        self.assertEqual(executed["errors"], None)
+
+    def test_taken_fields(self):
+        executed = self.make_request(
+            self.get_query(email="FOO@email.com", username="foo")
+        )
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["email"], Messages.EMAIL_IN_USE)
+        self.assertEqual(executed["errors"]["username"], Messages.USERNAME_IN_USE)
+
+    def test_taken_secondary_email(self):
+        self.register_user(
+            email="bar@email.com", username="bar", secondary_email="sec@email.com"
+        )
+        executed = self.make_request(self.get_query(email="sec@email.com"))
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["email"], Messages.EMAIL_IN_USE)
+
+        cache.clear()
+        executed = self.make_request(self.get_query(email="SEC@email.com"))
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(executed["errors"]["email"], Messages.EMAIL_IN_USE)
+
+    def test_username_is_case_sensitive(self):
+        executed = self.make_request(self.get_query(username="FOO"))
+        self.assertEqual(executed["success"], True)
+        executed = self.make_request(self.get_query(username="foo"))
+        self.assertEqual(executed["success"], False)
+
+    def test_only_given_fields(self):
+        executed = self.make_request(self.get_query(username="new"))
+        self.assertEqual(executed["success"], True)
+
+        executed = self.make_request(self.get_query(email="invalid"))
+        self.assertEqual(executed["success"], False)
+        self.assertEqual(list(executed["errors"]), ["email"])
+
+    def test_password_validation_without_hashing(self):
+        with mock.patch.object(
+            base_user, "make_password", wraps=base_user.make_password
+        ) as make_password:
+            executed = self.make_request(
+                self.get_query(username="new", password1="123", password2="123")
+            )
+        self.assertEqual(executed["success"], False)
+        self.assertTrue(executed["errors"]["password2"])
+        make_password.assert_not_called()
+
+    def test_cached_availability(self):
+        self.make_request(self.get_query(username="new"))
+        self.register_user(email="new@email.com", username="new")
+        # the cached answer is kept until it expires
+        executed = self.make_request(self.get_query(username="new"))
+        self.assertEqual(executed["success"], True)
+
+        cache.clear()
+        executed = self.make_request(self.get_query(username="new"))
+        self.assertEqual(executed["success"], False)
+
+    def test_register_forgets_availability(self):
+        self.make_request(self.get_query(username="new"))
+        self.make_request(self.register_query())
+        executed = self.make_request(self.get_query(username="new"))
+        self.assertEqual(executed["success"], False)
+
+    def register_query(self):
+        return self.get_query(
+            mutation="register",
+            email="new@email.com",
+            username="new",
+            password1="akssdgfbwkc",
+            password2="akssdgfbwkc",
+        )
+
+
+class ValidateRegistrationTestCase(ValidateRegistrationTestCaseMixin, DefaultTestCase):
+    def get_query(self, mutation="validateRegistration", **kwargs):
+        arguments = ", ".join('%s: "%s"' % item for item in kwargs.items())
+        return """
+        mutation {
+            %s(%s)
+                { success, errors }
+        }
+        """ % (
+            mutation,
+            arguments,
+        )
+
+
+class ValidateRegistrationRelayTestCase(
+    ValidateRegistrationTestCaseMixin, RelayTestCase
+):
+    def get_query(self, mutation="validateRegistration", **kwargs):
+        arguments = ", ".join('%s: "%s"' % item for item in kwargs.items())
+        return """
+        mutation {
+            %s(input: { %s })
+                { success, errors }
+        }
+        """ % (
+            mutation,
+            arguments,
+        )